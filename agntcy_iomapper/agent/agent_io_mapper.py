@@ -5,7 +5,8 @@ import logging
 from typing import Any, Callable, List, Optional, Union
 
 from langchain_core.language_models import BaseChatModel
-from langchain_core.runnables import Runnable
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.utils.runnable import RunnableCallable
 from llama_index.core.base.llms.base import BaseLLM
 from llama_index.core.tools import BaseTool
 from llama_index.core.workflow import (
@@ -20,10 +21,17 @@ from agntcy_iomapper.base.models import (
     FieldMetadata,
     IOMappingAgentMetadata,
 )
-from agntcy_iomapper.base.utils import extract_nested_fields, get_io_types
+from agntcy_iomapper.base.utils import (
+    compile_field_extractor,
+    extract_nested_fields,
+    get_io_types,
+    get_io_types_from_schema,
+    get_model_json_schema,
+)
 from agntcy_iomapper.imperative import (
     ImperativeIOMapper,
     ImperativeIOMapperInput,
+    ResultMode,
 )
 from agntcy_iomapper.langgraph import LangGraphIOMapper, LangGraphIOMapperConfig
 from agntcy_iomapper.llamaindex.llamaindex import (
@@ -157,6 +165,29 @@ class IOMappingAgent(BaseModel):
         )
         return imperative_io_mapper.as_runnable()
 
+    def langgraph_imperative_node(
+        self,
+        state_type: Optional[type[BaseModel]] = None,
+        result_mode: ResultMode = "json",
+    ) -> Runnable:
+        """
+        Description: Creates a reusable langgraph node performing the imperative mapping.
+        Unlike langgraph_imperative, the schemas, the input fields and the field mapping are compiled once
+        and the returned runnable maps the state it is invoked with, so a graph compiled once serves every request.
+        Args:
+            state_type: pydantic class of the state, used to compile the schemas upfront when the metadata does not
+                provide them. Without it they are inferred from the first state of each type.
+            result_mode: how the mapped data is returned, see ImperativeIOMapper
+        """
+        if not self.metadata.field_mapping:
+            raise ValueError(
+                "In order to use imperative mapping field_mapping must be provided in the metadata"
+            )
+
+        return _ImperativeStateMapper(
+            self.metadata, state_type, result_mode
+        ).as_runnable()
+
     @staticmethod
     def as_worfklow_step(workflow: Workflow) -> Callable:
         """This static method allows for the addition of a step to a LlamaIndex workflow.
@@ -185,3 +216,65 @@ class IOMappingAgent(BaseModel):
             description=description,
             can_handoff_to=can_handoff_to,
         )
+
+
+class _ImperativeStateMapper:
+    """Maps langgraph states with the imperative field mapping of the metadata.
+
+    Mappers are built once, when the metadata provides both schemas or the
+    state type is known upfront, otherwise on the first state of each type.
+    """
+
+    def __init__(
+        self,
+        metadata: IOMappingAgentMetadata,
+        state_type: Optional[type[BaseModel]],
+        result_mode: ResultMode,
+    ):
+        self.metadata = metadata
+        self.result_mode = result_mode
+        self.extract_fields = compile_field_extractor(metadata.input_fields)
+        self._mappers: dict[Optional[type], ImperativeIOMapper] = {}
+
+        if metadata.input_schema and metadata.output_schema:
+            self._mappers[None] = self._create_mapper(None)
+        elif state_type is not None:
+            self._mappers[state_type] = self._create_mapper(
+                get_model_json_schema(state_type)
+            )
+
+    def _create_mapper(self, data_schema: Optional[dict]) -> ImperativeIOMapper:
+        input_type, output_type = get_io_types_from_schema(data_schema, self.metadata)
+
+        return ImperativeIOMapper(
+            input=ImperativeIOMapperInput(
+                input=ArgumentsDescription(json_schema=input_type),
+                output=ArgumentsDescription(json_schema=output_type),
+                data=None,
+            ),
+            field_mapping=self.metadata.field_mapping,
+            result_mode=self.result_mode,
+        )
+
+    def _get_mapper(self, state: Any) -> ImperativeIOMapper:
+        mapper = self._mappers.get(None) or self._mappers.get(type(state))
+        if mapper is None:
+            data_schema = (
+                get_model_json_schema(type(state))
+                if isinstance(state, BaseModel)
+                else None
+            )
+            mapper = self._create_mapper(data_schema)
+            self._mappers[type(state)] = mapper
+        return mapper
+
+    def invoke(self, state: Any, config: Optional[RunnableConfig] = None) -> Any:
+        mapper = self._get_mapper(state)
+        data_to_be_mapped = self.extract_fields(state)
+        return mapper.map(data_to_be_mapped)
+
+    async def ainvoke(self, state: Any, config: Optional[RunnableConfig] = None) -> Any:
+        return self.invoke(state, config)
+
+    def as_runnable(self) -> RunnableCallable:
+        return RunnableCallable(self.invoke, self.ainvoke, name="extract", trace=False)
@@ -4,6 +4,12 @@
 from agntcy_iomapper.base.base import (
     BaseIOMapper,
 )
+from agntcy_iomapper.base.fingerprint import (
+    canonical_schema,
+    clear_fingerprint_memo,
+    schema_fingerprint,
+)
+from agntcy_iomapper.base.lru import CacheInfo
 from agntcy_iomapper.base.models import (
     AgentIOMapperInput,
     AgentIOMapperOutput,
@@ -14,6 +20,30 @@ from agntcy_iomapper.base.models import (
     FieldMetadata,
     IOMappingAgentMetadata,
 )
+from agntcy_iomapper.base.response_cache import (
+    InMemoryResponseCache,
+    ResponseCache,
+    ResponseCacheStats,
+    response_cache_key,
+)
+from agntcy_iomapper.base.schema_index import SchemaIndex
+from agntcy_iomapper.base.utils import (
+    ProjectedSchema,
+    SharedSchema,
+    clear_projection_cache,
+    project_schema,
+    projection_cache_info,
+    schema_from_dict,
+    schema_to_dict,
+    set_projection_cache_size,
+)
+from agntcy_iomapper.base.validation import (
+    ValidationStats,
+    ValidatorCacheInfo,
+    clear_validator_cache,
+    set_validator_cache_size,
+    validator_cache_info,
+)
 
 __all__ = [
     "ArgumentsDescription",
@@ -25,4 +55,26 @@ __all__ = [
     "AgentIOMapperInput",
     "AgentIOMapperOutput",
     "IOMappingAgentMetadata",
+    "ValidationStats",
+    "ValidatorCacheInfo",
+    "clear_validator_cache",
+    "set_validator_cache_size",
+    "validator_cache_info",
+    "CacheInfo",
+    "ProjectedSchema",
+    "SchemaIndex",
+    "clear_projection_cache",
+    "project_schema",
+    "projection_cache_info",
+    "set_projection_cache_size",
+    "canonical_schema",
+    "clear_fingerprint_memo",
+    "schema_fingerprint",
+    "SharedSchema",
+    "schema_from_dict",
+    "schema_to_dict",
+    "InMemoryResponseCache",
+    "ResponseCache",
+    "ResponseCacheStats",
+    "response_cache_key",
 ]
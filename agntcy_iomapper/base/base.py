@@ -1,21 +1,41 @@
 # Copyright AGNTCY Contributors (https://github.com/agntcy)
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
 import json
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import ClassVar, Optional
+from typing import Any, AsyncIterator, ClassVar, Iterator, Optional, Union
 
-import jsonschema
 from jinja2 import Environment
 from jinja2.sandbox import SandboxedEnvironment
+from jsonschema.exceptions import ValidationError, best_match
+from jsonschema.protocols import Validator
 
+from agntcy_iomapper.base.batch import estimate_tokens, group_inputs, plan_batches
+from agntcy_iomapper.base.json_stream import (
+    JSONStreamParser,
+    Key,
+    iter_member_errors,
+    iter_root_errors,
+)
 from agntcy_iomapper.base.models import (
     AgentIOMapperInput,
     AgentIOMapperOutput,
     BaseIOMapperConfig,
 )
+from agntcy_iomapper.base.prompt import serialize_data, serialize_schema
+from agntcy_iomapper.base.response_cache import (
+    ResponseCacheStats,
+    response_cache_key,
+)
+from agntcy_iomapper.base.validation import (
+    SampledValidator,
+    ValidationStats,
+    format_error,
+    get_validator,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -46,11 +66,48 @@ class BaseIOMapper(ABC):
         self.jinja_env = jinja_env
         self.prompt_template = None
         self.user_template = None
+        self.batch_template = None
 
         self.jinja_env_async = jinja_env_async
         self.prompt_template_async = None
         self.user_template_async = None
+        self.batch_template_async = None
         self.config = config
+        self.validator = SampledValidator(config)
+
+    @property
+    def validation_stats(self) -> ValidationStats:
+        """Counters of validated, skipped and failed input and output payloads"""
+        return self.validator.stats
+
+    @property
+    def response_cache_stats(self) -> Optional[ResponseCacheStats]:
+        """Counters of the response cache, None when there is no cache"""
+        cache = self.config.response_cache
+        return cache.stats() if cache is not None else None
+
+    def response_cache_identity(
+        self, input: AgentIOMapperInput, **kwargs
+    ) -> Optional[tuple[str, Any]]:
+        """Returns the identity of the model the input is sent to and its
+        settings, part of the response cache key. Mappers returning None,
+        like this default implementation, are not cached.
+        Args:
+            input: the mapper input
+            kwargs: the keyword arguments given to invoke
+        """
+        return None
+
+    def _get_cache_key(
+        self, input: AgentIOMapperInput, messages: list[dict[str, str]], kwargs: dict
+    ) -> Optional[str]:
+        if self.config.response_cache is None:
+            return None
+
+        identity = self.response_cache_identity(input, **kwargs)
+        if identity is None:
+            return None
+        return response_cache_key(*identity, messages)
 
     # Delay init until sync or async functions called.
     def _check_jinja_env(self, enable_async: bool):
@@ -71,6 +128,10 @@ class BaseIOMapper(ABC):
                 self.user_template_async = self.jinja_env_async.from_string(
                     self.config.message_template
                 )
+            if self.batch_template_async is None:
+                self.batch_template_async = self.jinja_env_async.from_string(
+                    self.config.batch_message_template
+                )
         else:
             if self.jinja_env is None:
                 self.jinja_env = SandboxedEnvironment(
@@ -86,18 +147,25 @@ class BaseIOMapper(ABC):
                 self.user_template = self.jinja_env.from_string(
                     self.config.message_template
                 )
+            if self.batch_template is None:
+                self.batch_template = self.jinja_env.from_string(
+                    self.config.batch_message_template
+                )
 
-    def _get_render_env(self, input: AgentIOMapperInput) -> dict[str, str]:
+    def _get_render_env(self, input: AgentIOMapperInput) -> dict[str, Any]:
         return {
             "input": input.input,
             "output": input.output,
             "data": input.data,
+            # schemas and data as rendered with the configured prompt format
+            "input_schema": serialize_schema(input.input.json_schema, self.config),
+            "output_schema": serialize_schema(input.output.json_schema, self.config),
+            "serialized_data": serialize_data(input.data, self.config),
         }
 
     def _get_output(
         self, input: AgentIOMapperInput, outputs: str
     ) -> AgentIOMapperOutput:
-
         if input.output.json_schema is None:
             # If there is no schema, quote the chars for JSON.
             return AgentIOMapperOutput.model_validate_json(
@@ -114,29 +182,21 @@ class BaseIOMapper(ABC):
         return AgentIOMapperOutput.model_validate_json(f'{{"data": {outputs} }}')
 
     def _validate_input(self, input: AgentIOMapperInput) -> None:
-        if self.config.validate_json_input and input.input.json_schema is not None:
-            jsonschema.validate(
-                instance=input.data,
-                schema=input.input.json_schema.model_dump(
-                    exclude_none=True, mode="json"
-                ),
-            )
+        self.validator.validate_input(input.data, input.input.schema_dict)
 
     def _validate_output(
         self, input: AgentIOMapperInput, output: AgentIOMapperOutput
     ) -> None:
-        if self.config.validate_json_output and input.output.json_schema is not None:
-            output_schema = input.output.json_schema.model_dump(
-                exclude_none=True, mode="json"
-            )
-            logging.debug(f"Checking output schema: {output_schema}")
-            jsonschema.validate(
-                instance=output.data,
-                schema=output_schema,
-            )
+        self.validator.validate_output(output.data, input.output.schema_dict)
 
     def _invoke(self, input: AgentIOMapperInput, **kwargs) -> AgentIOMapperOutput:
         self._validate_input(input)
+        return self._invoke_validated(input, **kwargs)
+
+    def _invoke_validated(
+        self, input: AgentIOMapperInput, **kwargs
+    ) -> AgentIOMapperOutput:
+        """Maps an input whose data was already validated"""
         self._check_jinja_env(False)
         render_env = self._get_render_env(input)
         system_prompt = self.prompt_template.render(render_env)
@@ -147,25 +207,30 @@ class BaseIOMapper(ABC):
         else:
             user_template = self.user_template
         user_prompt = user_template.render(render_env)
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
 
-        outputs = self.invoke(
-            input,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            **kwargs,
+        cache_key = self._get_cache_key(input, messages, kwargs)
+        outputs = (
+            self.config.response_cache.get(cache_key) if cache_key is not None else None
         )
-        logging.debug(f"The LLM returned: {outputs}")
+        cached = outputs is not None
+        if not cached:
+            outputs = self.invoke(input, messages=messages, **kwargs)
+            logging.debug(f"The LLM returned: {outputs}")
         output = self._get_output(input, outputs)
 
         self._validate_output(input, output)
+        if cache_key is not None and not cached and isinstance(outputs, str):
+            # only responses that parsed and validated are cached
+            self.config.response_cache.set(cache_key, outputs)
         return output
 
-    async def _ainvoke(
-        self, input: AgentIOMapperInput, **kwargs
-    ) -> AgentIOMapperOutput:
-        self._validate_input(input)
+    async def _arender_messages(
+        self, input: AgentIOMapperInput
+    ) -> list[dict[str, str]]:
         self._check_jinja_env(True)
         render_env = self._get_render_env(input)
         system_prompt = await self.prompt_template_async.render_async(render_env)
@@ -178,20 +243,404 @@ class BaseIOMapper(ABC):
         else:
             user_template_async = self.user_template_async
         user_prompt = await user_template_async.render_async(render_env)
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    async def _ainvoke(
+        self, input: AgentIOMapperInput, **kwargs
+    ) -> AgentIOMapperOutput:
+        self._validate_input(input)
+        return await self._ainvoke_validated(input, **kwargs)
+
+    async def _ainvoke_validated(
+        self, input: AgentIOMapperInput, **kwargs
+    ) -> AgentIOMapperOutput:
+        """Async version of `_invoke_validated`"""
+        if self.config.stream_output:
+            output = None
+            async for output in self._astream(input, validated=True, **kwargs):
+                pass
+            return output
+
+        messages = await self._arender_messages(input)
 
-        outputs = await self.ainvoke(
-            input,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            **kwargs,
+        cache_key = self._get_cache_key(input, messages, kwargs)
+        outputs = (
+            self.config.response_cache.get(cache_key) if cache_key is not None else None
         )
-        logging.debug(f"The LLM returned: {outputs}")
+        cached = outputs is not None
+        if not cached:
+            outputs = await self.ainvoke(input, messages=messages, **kwargs)
+            logging.debug(f"The LLM returned: {outputs}")
         output = self._get_output(input, outputs)
         self._validate_output(input, output)
+        if cache_key is not None and not cached and isinstance(outputs, str):
+            self.config.response_cache.set(cache_key, outputs)
         return output
 
+    def _get_stream_validator(self, input: AgentIOMapperInput) -> Optional[Validator]:
+        """Returns the validator of the streamed members, None when
+        validation failures must not be raised"""
+        schema = input.output.schema_dict
+        if (
+            schema is None
+            or not self.config.validate_json_output
+            or self.config.validation_policy != "always"
+        ):
+            return None
+        return get_validator(schema)
+
+    async def _astream(
+        self, input: AgentIOMapperInput, validated: bool = False, **kwargs
+    ) -> AsyncIterator[AgentIOMapperOutput]:
+        """Maps the input, parsing the response of the LLM as it is streamed.
+        With an output schema, the members of the JSON object, or the items
+        of the JSON array, are yielded as soon as they are complete. When
+        output validation is raised, they are validated then and the
+        generation is stopped on the first invalid member.
+        Args:
+            input: the input to map
+            validated: whether the input data was already validated
+            kwargs: the keyword arguments given to astream
+        Returns:
+            Outputs holding the members completed so far, then the complete
+            output
+        Raises:
+            ValidationError: a member violates the output schema
+        """
+        if not validated:
+            self._validate_input(input)
+        messages = await self._arender_messages(input)
+
+        cache_key = self._get_cache_key(input, messages, kwargs)
+        outputs = (
+            self.config.response_cache.get(cache_key) if cache_key is not None else None
+        )
+        cached = outputs is not None
+        if not cached:
+            validator = self._get_stream_validator(input)
+            parser = JSONStreamParser() if input.output.json_schema else None
+            members: dict[Key, Any] = {}
+            root_checked = None
+            chunks = []
+            stream = self.astream(input, messages=messages, **kwargs)
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    if parser is None or parser.complete:
+                        continue
+
+                    try:
+                        completed = parser.feed(chunk)
+                    except ValueError:
+                        # left to the parsing of the complete response
+                        parser = None
+                        continue
+                    if validator is not None:
+                        # the type of the root is checked once it is known
+                        root = parser.root if parser.root != root_checked else None
+                        root_checked = parser.root
+                        self._check_stream(validator, root, completed)
+                    if completed:
+                        members.update(completed)
+                        data = (
+                            dict(members)
+                            if parser.root == "{"
+                            else list(members.values())
+                        )
+                        yield AgentIOMapperOutput(data=data)
+            finally:
+                # stops the generation when the response is rejected,
+                # astream may return a plain async iterator
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            outputs = "".join(chunks)
+            logging.debug(f"The LLM returned: {outputs}")
+
+        output = self._get_output(input, outputs)
+        self._validate_output(input, output)
+        if cache_key is not None and not cached and isinstance(outputs, str):
+            self.config.response_cache.set(cache_key, outputs)
+        yield output
+
+    def _check_stream(
+        self,
+        validator: Validator,
+        root: Optional[str],
+        completed: list[tuple[Key, Any]],
+    ) -> None:
+        errors = []
+        if root is not None:
+            errors.extend(iter_root_errors(validator, root))
+        for key, value in completed:
+            errors.extend(iter_member_errors(validator, key, value))
+
+        error = best_match(errors)
+        if error is not None:
+            self.validator.record_failure("output")
+            logger.info(f"Stopping the generation: {error.message}")
+            raise error
+
+    def _validate_batch_inputs(
+        self, inputs: list[AgentIOMapperInput]
+    ) -> list[Optional[AgentIOMapperOutput]]:
+        """Returns the outputs of the inputs that failed validation, with
+        the failure in `error`, None for the others"""
+        outputs: list[Optional[AgentIOMapperOutput]] = []
+        for input in inputs:
+            try:
+                self._validate_input(input)
+                outputs.append(None)
+            except Exception as e:
+                logger.debug(f"Invalid batch input: {e}")
+                outputs.append(AgentIOMapperOutput(error=format_error(e)))
+        return outputs
+
+    def _iter_batches(
+        self,
+        inputs: list[AgentIOMapperInput],
+        outputs: list[Optional[AgentIOMapperOutput]],
+    ) -> Iterator[tuple[list[int], dict[str, Any]]]:
+        """Yields the indices of the inputs of every batch and its render
+        environment, inputs that can't be batched or that already have an
+        output are not yielded"""
+        pending = [i for i, output in enumerate(outputs) if output is None]
+        groups, _ = group_inputs([inputs[i] for i in pending])
+        for group in groups:
+            group = [pending[i] for i in group]
+            first = inputs[group[0]]
+            render_env = self._get_render_env(first)
+            # the schemas and the templates are rendered once per batch
+            fixed_tokens = estimate_tokens(
+                "".join(
+                    str(value)
+                    for value in (
+                        self.config.system_prompt_template,
+                        self.config.batch_message_template,
+                        render_env["input_schema"] or first.input.description,
+                        render_env["output_schema"] or first.output.description,
+                    )
+                )
+            )
+            records = [serialize_data(inputs[i].data, self.config) for i in group]
+            batches = plan_batches(
+                [estimate_tokens(str(record)) + 2 for record in records],
+                fixed_tokens,
+                self.config.batch_token_budget,
+                self.config.batch_max_records,
+            )
+            for batch in batches:
+                yield (
+                    group[batch.start : batch.stop],
+                    {
+                        **render_env,
+                        "data": [
+                            inputs[i].data for i in group[batch.start : batch.stop]
+                        ],
+                        "records": records[batch.start : batch.stop],
+                    },
+                )
+
+    def _get_batch_outputs(
+        self, inputs: list[AgentIOMapperInput], outputs: Any
+    ) -> list[Optional[AgentIOMapperOutput]]:
+        """Returns the output of every record of a batch response, None for
+        the records without a result or whose result fails validation"""
+        results = None
+        if isinstance(outputs, str):
+            # Check if data is returned in JSON markdown text
+            matches = self._json_search_pattern.findall(outputs)
+            try:
+                results = json.loads(matches[-1] if matches else outputs)
+            except ValueError:
+                pass
+
+        if not isinstance(results, list) or len(results) != len(inputs):
+            # results can't be matched with the records
+            logger.info("The batch response doesn't hold one result per record")
+            return [None] * len(inputs)
+
+        batch_outputs = []
+        for input, data in zip(inputs, results):
+            output = AgentIOMapperOutput(data=data)
+            try:
+                self._validate_output(input, output)
+            except ValidationError as e:
+                logger.info(f"Invalid batch result: {e.message}")
+                output = None
+            batch_outputs.append(output)
+        return batch_outputs
+
+    def _set_batch_outputs(
+        self,
+        outputs: list[Optional[AgentIOMapperOutput]],
+        indices: list[int],
+        batch_outputs: list[Optional[AgentIOMapperOutput]],
+    ) -> bool:
+        """Stores the outputs of a batch, returns whether all are valid"""
+        for i, output in zip(indices, batch_outputs):
+            outputs[i] = output
+        return all(output is not None for output in batch_outputs)
+
+    def _invoke_batch(
+        self, inputs: list[AgentIOMapperInput], **kwargs
+    ) -> list[AgentIOMapperOutput]:
+        """Maps the inputs with batched prompts, which render the schemas
+        once for several records and ask for a JSON array of results. The
+        records whose result is missing or invalid are mapped again on
+        their own, like the inputs with their own message template.
+        Validation follows the configuration, as for a single input.
+        Args:
+            inputs: the inputs to map, batched when they share their input
+                and output descriptions
+            kwargs: the keyword arguments given to invoke
+        Returns:
+            The outputs, in the order of the inputs. Records that fail carry
+            the failure in `error` instead of raising.
+        """
+        self._check_jinja_env(False)
+        outputs = self._validate_batch_inputs(inputs)
+        for indices, render_env in self._iter_batches(inputs, outputs):
+            batch_inputs = [inputs[i] for i in indices]
+            messages = [
+                {"role": "system", "content": self.prompt_template.render(render_env)},
+                {"role": "user", "content": self.batch_template.render(render_env)},
+            ]
+
+            cache_key = self._get_cache_key(batch_inputs[0], messages, kwargs)
+            response = (
+                self.config.response_cache.get(cache_key)
+                if cache_key is not None
+                else None
+            )
+            cached = response is not None
+            if not cached:
+                response = self.invoke(batch_inputs[0], messages=messages, **kwargs)
+                logging.debug(f"The LLM returned: {response}")
+            batch_outputs = self._get_batch_outputs(batch_inputs, response)
+            valid = self._set_batch_outputs(outputs, indices, batch_outputs)
+            if cache_key is not None and not cached and valid:
+                self.config.response_cache.set(cache_key, response)
+
+        for i, output in enumerate(outputs):
+            if output is None:
+                try:
+                    outputs[i] = self._invoke_validated(inputs[i], **kwargs)
+                except Exception as e:
+                    logger.debug(f"Failed to map record: {e}")
+                    outputs[i] = AgentIOMapperOutput(error=format_error(e))
+        return outputs
+
+    async def _ainvoke_batch(
+        self, inputs: list[AgentIOMapperInput], **kwargs
+    ) -> list[AgentIOMapperOutput]:
+        """Async version of `_invoke_batch`"""
+        self._check_jinja_env(True)
+        outputs = self._validate_batch_inputs(inputs)
+        for indices, render_env in self._iter_batches(inputs, outputs):
+            batch_inputs = [inputs[i] for i in indices]
+            messages = [
+                {
+                    "role": "system",
+                    "content": await self.prompt_template_async.render_async(
+                        render_env
+                    ),
+                },
+                {
+                    "role": "user",
+                    "content": await self.batch_template_async.render_async(render_env),
+                },
+            ]
+
+            cache_key = self._get_cache_key(batch_inputs[0], messages, kwargs)
+            response = (
+                self.config.response_cache.get(cache_key)
+                if cache_key is not None
+                else None
+            )
+            cached = response is not None
+            if not cached:
+                response = await self.ainvoke(
+                    batch_inputs[0], messages=messages, **kwargs
+                )
+                logging.debug(f"The LLM returned: {response}")
+            batch_outputs = self._get_batch_outputs(batch_inputs, response)
+            valid = self._set_batch_outputs(outputs, indices, batch_outputs)
+            if cache_key is not None and not cached and valid:
+                self.config.response_cache.set(cache_key, response)
+
+        for i, output in enumerate(outputs):
+            if output is None:
+                try:
+                    outputs[i] = await self._ainvoke_validated(inputs[i], **kwargs)
+                except Exception as e:
+                    logger.debug(f"Failed to map record: {e}")
+                    outputs[i] = AgentIOMapperOutput(error=format_error(e))
+        return outputs
+
+    async def abatch(
+        self,
+        inputs: list[AgentIOMapperInput],
+        max_concurrency: Optional[int] = None,
+        **kwargs,
+    ) -> list[Union[AgentIOMapperOutput, Exception]]:
+        """Maps the inputs concurrently, each with its own prompt.
+        Args:
+            inputs: the inputs to map
+            max_concurrency: the maximum number of inputs mapped at once,
+                the max_concurrency of the config when not given
+            kwargs: the keyword arguments given to invoke
+        Returns:
+            The outputs in the order of the inputs, or the exception raised
+            mapping the input
+        """
+        results: list[Union[AgentIOMapperOutput, Exception, None]] = [None] * len(
+            inputs
+        )
+        async for i, result in self.abatch_as_completed(
+            inputs, max_concurrency, **kwargs
+        ):
+            results[i] = result
+        return results
+
+    async def abatch_as_completed(
+        self,
+        inputs: list[AgentIOMapperInput],
+        max_concurrency: Optional[int] = None,
+        **kwargs,
+    ) -> AsyncIterator[tuple[int, Union[AgentIOMapperOutput, Exception]]]:
+        """Maps the inputs concurrently like `abatch`, yields the index of
+        every input with its output or exception as soon as it is mapped.
+        The inputs not mapped yet are cancelled when the iteration stops.
+        """
+        if max_concurrency is None:
+            max_concurrency = self.config.max_concurrency
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def map_input(
+            i: int, input: AgentIOMapperInput
+        ) -> tuple[int, Union[AgentIOMapperOutput, Exception]]:
+            try:
+                if semaphore is None:
+                    return i, await self._ainvoke(input, **kwargs)
+                async with semaphore:
+                    return i, await self._ainvoke(input, **kwargs)
+            except Exception as e:
+                return i, e
+
+        tasks = [
+            asyncio.ensure_future(map_input(i, input)) for i, input in enumerate(inputs)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
     @abstractmethod
     def invoke(
         self, input: AgentIOMapperInput, messages: list[dict[str, str]], **kwargs
@@ -209,3 +658,13 @@ class BaseIOMapper(ABC):
         Args:
             messages: the messages to send to the LLM
         """
+
+    async def astream(
+        self, input: AgentIOMapperInput, messages: list[dict[str, str]], **kwargs
+    ) -> AsyncIterator[str]:
+        """Streams the response of the internal model to the messages. This
+        default implementation yields the whole response of ainvoke.
+        Args:
+            messages: the messages to send to the LLM
+        """
+        yield await self.ainvoke(input, messages=messages, **kwargs)
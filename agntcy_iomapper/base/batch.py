@@ -0,0 +1,84 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Planning and parsing of batched prompts.
+
+A batched prompt renders the schemas once and lists several records, the
+LLM responds with a JSON array holding one result per record. Records are
+grouped by their input and output descriptions, then split into batches
+whose estimated prompt tokens fit the token budget of the config.
+"""
+
+import json
+from typing import Hashable, Optional
+
+from agntcy_iomapper.base.fingerprint import schema_fingerprint
+from agntcy_iomapper.base.models import AgentIOMapperInput
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of tokens of a text, about four characters per
+    token for English and JSON with common tokenizers"""
+    return len(text) // 4 + 1
+
+
+def batch_key(input: AgentIOMapperInput) -> Optional[Hashable]:
+    """Returns the key of the inputs that can share a batched prompt, None
+    when the input must be sent on its own"""
+    if input.message_template is not None:
+        # the template renders a single record
+        return None
+
+    # other fields, like the model of some adapters, must be the same too
+    extra = input.model_dump(
+        mode="json", exclude={"input", "output", "data", "message_template"}
+    )
+    return (
+        schema_fingerprint(input.input),
+        schema_fingerprint(input.output),
+        json.dumps(extra, sort_keys=True, default=str),
+    )
+
+
+def group_inputs(
+    inputs: list[AgentIOMapperInput],
+) -> tuple[list[list[int]], list[int]]:
+    """Returns the indices of the inputs grouped by batch key, in the order
+    of the inputs, and the indices of the inputs that can't be batched"""
+    groups: dict[Hashable, list[int]] = {}
+    single: list[int] = []
+    for i, input in enumerate(inputs):
+        key = batch_key(input)
+        if key is None:
+            single.append(i)
+        else:
+            groups.setdefault(key, []).append(i)
+    return list(groups.values()), single
+
+
+def plan_batches(
+    record_tokens: list[int], fixed_tokens: int, token_budget: int, max_records: int
+) -> list[range]:
+    """Splits the records into consecutive batches, each as large as the
+    token budget allows, with at least one record.
+    Args:
+        record_tokens: the estimated tokens of every record
+        fixed_tokens: the estimated tokens of the prompt without records
+        token_budget: the estimated tokens a batch prompt may take
+        max_records: the maximum number of records in a batch
+    Returns:
+        The ranges of the record indices of every batch
+    """
+    batches = []
+    start = 0
+    tokens = fixed_tokens
+    for i, record in enumerate(record_tokens):
+        if i > start and (i - start >= max_records or tokens + record > token_budget):
+            batches.append(range(start, i))
+            start = i
+            tokens = fixed_tokens
+        tokens += record
+    if start < len(record_tokens):
+        batches.append(range(start, len(record_tokens)))
+    return batches
@@ -0,0 +1,163 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Stable fingerprints of JSON schemas, used as cache keys.
+
+The fingerprint is the sha256 of a canonical form of the schema: keys are
+sorted and references are percent-decoded. `title` and `description`
+annotations can be left out, for caches whose value does not depend on
+them. Cached values such as validators and reference resolvers follow the
+raw structure of the schema, so `definitions` and `$defs` are not merged.
+
+Fingerprints of frozen Schema models, and of the ArgumentsDescription
+holding them, are memoized on the identity of the object. Dictionaries and
+other models can be modified in place, their content is hashed every time.
+"""
+
+import hashlib
+import json
+from typing import Any, Union
+from urllib.parse import unquote
+
+from openapi_pydantic import Schema
+from pydantic import BaseModel
+
+from agntcy_iomapper.base.lru import LRUCache
+from agntcy_iomapper.base.models import ArgumentsDescription
+
+_DEFAULT_MEMO_SIZE = 1024
+
+# keywords holding maps of names to schemas
+_SCHEMA_MAPS = {
+    "properties",
+    "patternProperties",
+    "$defs",
+    "definitions",
+    "dependentSchemas",
+}
+# keywords holding instances rather than schemas
+_VALUE_KEYWORDS = {"enum", "const", "default", "examples"}
+_ANNOTATIONS = {"title", "description"}
+
+SchemaLike = Union[Schema, dict[str, Any], ArgumentsDescription, None]
+
+
+def schema_as_dict(schema: Schema) -> dict[str, Any]:
+    """Dumps a Schema model as the JSON schema it stands for, keywords such
+    as `$ref` or `not` use their JSON schema name"""
+    return schema.model_dump(exclude_none=True, mode="json", by_alias=True)
+
+
+def _canonical(node: Any, ignore_annotations: bool) -> Any:
+    if isinstance(node, list):
+        return [_canonical(value, ignore_annotations) for value in node]
+    elif not isinstance(node, dict):
+        return node
+
+    canonical = {}
+    for key, value in node.items():
+        if ignore_annotations and key in _ANNOTATIONS:
+            continue
+        if key == "$ref" and isinstance(value, str):
+            canonical[key] = unquote(value)
+        elif key in _VALUE_KEYWORDS:
+            canonical[key] = value
+        elif key in _SCHEMA_MAPS and isinstance(value, dict):
+            canonical[key] = {
+                name: _canonical(sub_schema, ignore_annotations)
+                for name, sub_schema in value.items()
+            }
+        else:
+            canonical[key] = _canonical(value, ignore_annotations)
+    return canonical
+
+
+def canonical_schema(
+    schema: Union[Schema, dict[str, Any]], ignore_annotations: bool = False
+) -> Any:
+    """Returns the canonical form of the schema that fingerprints hash"""
+    if isinstance(schema, Schema):
+        schema = schema_as_dict(schema)
+    return _canonical(schema, ignore_annotations)
+
+
+def _hash(value: Any) -> str:
+    canonical = json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# (id, ignore_annotations) -> (object, version, fingerprint), the object is
+# kept alive so that its id is not reused while memoized
+_memo: LRUCache[tuple[Any, Any, str]] = LRUCache(_DEFAULT_MEMO_SIZE)
+
+
+def _is_frozen(value: Any) -> bool:
+    return isinstance(value, BaseModel) and bool(value.model_config.get("frozen"))
+
+
+def _memoizable(value: Any) -> bool:
+    """Whether the object can't change without its identities changing"""
+    if isinstance(value, ArgumentsDescription):
+        # its fields are checked by identity, see _version
+        return value.agent_manifest is None and (
+            value.json_schema is None or _is_frozen(value.json_schema)
+        )
+    return _is_frozen(value)
+
+
+def _version(value: Any) -> Any:
+    """Identities of what a memoized ArgumentsDescription fingerprint
+    depends on, so that reassigning one of its fields is noticed"""
+    if isinstance(value, ArgumentsDescription):
+        return (id(value.json_schema), value.description, id(value.agent_manifest))
+    return None
+
+
+def _compute(value: Any, ignore_annotations: bool) -> str:
+    if isinstance(value, ArgumentsDescription):
+        return _hash(
+            {
+                "json_schema": schema_fingerprint(
+                    value.json_schema, ignore_annotations
+                ),
+                "description": value.description,
+                "agent_manifest": value.agent_manifest,
+            }
+        )
+    return _hash(canonical_schema(value, ignore_annotations))
+
+
+def schema_fingerprint(schema: SchemaLike, ignore_annotations: bool = False) -> str:
+    """Returns a stable fingerprint of the schema
+    Args:
+        schema: a JSON schema as a dictionary or as a Schema model, or the
+            ArgumentsDescription holding it
+        ignore_annotations: leave `title` and `description` out
+    Returns:
+        The hex sha256 of the canonical form of the schema, equivalent
+        schemas have the same fingerprint whatever their representation
+    """
+    if schema is None:
+        return _hash(None)
+    if not _memoizable(schema):
+        return _compute(schema, ignore_annotations)
+
+    key = (id(schema), ignore_annotations)
+    entry = _memo.get_or_create(
+        key,
+        lambda: (schema, _version(schema), _compute(schema, ignore_annotations)),
+    )
+
+    version = _version(schema)
+    if entry[0] is not schema or entry[1] != version:
+        entry = (schema, version, _compute(schema, ignore_annotations))
+        _memo.put(key, entry)
+    return entry[2]
+
+
+def clear_fingerprint_memo() -> None:
+    """Forgets the memoized fingerprints and resets the counters"""
+    _memo.clear()
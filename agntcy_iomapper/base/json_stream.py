@@ -0,0 +1,195 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Incremental parsing of the JSON document of a streamed LLM response.
+
+`JSONStreamParser` is fed the chunks of the response as they arrive. It
+finds where the JSON document starts, either in a JSON markdown block or
+right at the start of the response, and reports every member of the root
+object, or item of the root array, as soon as it is complete. Each chunk is
+scanned once, the completed members alone are decoded.
+
+`iter_member_errors` checks a completed member against the schema of its
+property, so a response can be rejected before the LLM is done writing it.
+"""
+
+import json
+from typing import Any, Iterator, Optional, Union
+
+from jsonschema.exceptions import ValidationError
+from jsonschema.protocols import Validator
+
+_JSON_BLOCK = "```json\n"
+
+_CONTAINER_TYPES = {"{": "object", "[": "array"}
+
+Key = Union[str, int]
+
+
+class JSONStreamParser:
+    """Finds the members of the root JSON container of a streamed text"""
+
+    def __init__(self) -> None:
+        self.text = ""
+        # the document starts at this index of text once found
+        self.start: Optional[int] = None
+        # { or [, once the root container is open
+        self.root: Optional[str] = None
+        self.complete = False
+        self._searched = 0
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = 0
+        self._items = 0
+
+    def feed(self, chunk: str) -> list[tuple[Key, Any]]:
+        """Adds a chunk of the response
+        Args:
+            chunk: the next chunk of text
+        Returns:
+            The keys and values of the members the chunk completed, the
+            indices and values of the items for a root array
+        Raises:
+            ValueError: a completed member is not valid JSON
+        """
+        self.text += chunk
+        if self.start is None:
+            self._find_start()
+            if self.start is None:
+                return []
+            self._scanned = self.start
+        return self._scan()
+
+    def _find_start(self) -> None:
+        head = self.text.lstrip()
+        if head[:1] in _CONTAINER_TYPES:
+            self.start = len(self.text) - len(head)
+            return
+
+        # the opening of the block may span chunks
+        block = self.text.find(_JSON_BLOCK, max(self._searched - len(_JSON_BLOCK), 0))
+        self._searched = len(self.text)
+        if block >= 0:
+            self.start = block + len(_JSON_BLOCK)
+
+    def _scan(self) -> list[tuple[Key, Any]]:
+        members = []
+        text = self.text
+        for i in range(self._scanned, len(text)):
+            if self.complete:
+                break
+
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                if self._depth == 0:
+                    self.root = c
+                    self._member_start = i + 1
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._add_member(text[self._member_start : i], members)
+                    self.complete = True
+            elif c == "," and self._depth == 1:
+                self._add_member(text[self._member_start : i], members)
+                self._member_start = i + 1
+            elif self._depth == 0 and not c.isspace():
+                # not a container, like the scalar of a JSON markdown block
+                self.complete = True
+        self._scanned = len(text)
+        return members
+
+    def _add_member(self, text: str, members: list[tuple[Key, Any]]) -> None:
+        if not text.strip():
+            # empty container
+            return
+
+        if self.root == "{":
+            members.extend(json.loads(f"{{{text}}}").items())
+        else:
+            members.append((self._items, json.loads(text)))
+            self._items += 1
+
+
+def _is_type(instance_type: str, schema: Any) -> bool:
+    if not isinstance(schema, dict) or "type" not in schema:
+        return True
+    types = schema["type"]
+    return instance_type in (types if isinstance(types, list) else [types])
+
+
+def iter_root_errors(validator: Validator, root: str) -> Iterator[ValidationError]:
+    """Yields an error when the schema doesn't allow the type of the root
+    container"""
+    schema = validator.schema
+    instance_type = _CONTAINER_TYPES[root]
+    if not _is_type(instance_type, schema):
+        yield ValidationError(
+            f"{instance_type} is not of type {schema['type']!r}",
+            validator="type",
+            validator_value=schema["type"],
+            instance={} if root == "{" else [],
+            schema=schema,
+            schema_path=("type",),
+            type_checker=validator.TYPE_CHECKER,
+        )
+
+
+def iter_member_errors(
+    validator: Validator, key: Key, value: Any
+) -> Iterator[ValidationError]:
+    """Yields the errors of a completed member of the root container against
+    the subschema applying to it. Only the properties, additionalProperties
+    and items keywords of the root schema are checked, the whole document
+    still has to be validated once complete."""
+    schema = validator.schema
+    if not isinstance(schema, dict):
+        return
+
+    if isinstance(key, str):
+        properties = schema.get("properties", {})
+        if key in properties:
+            yield from _descend(validator, value, properties[key], key, "properties")
+        elif "patternProperties" not in schema:
+            additional = schema.get("additionalProperties")
+            if additional is False:
+                yield ValidationError(
+                    f"Additional properties are not allowed ({key!r} was unexpected)",
+                    validator="additionalProperties",
+                    validator_value=False,
+                    instance={key: value},
+                    schema=schema,
+                    schema_path=("additionalProperties",),
+                    type_checker=validator.TYPE_CHECKER,
+                )
+            elif isinstance(additional, dict):
+                yield from _descend(
+                    validator, value, additional, key, "additionalProperties"
+                )
+    else:
+        items = schema.get("items")
+        if isinstance(items, dict) and "prefixItems" not in schema:
+            yield from _descend(validator, value, items, key, "items")
+
+
+def _descend(
+    validator: Validator, value: Any, schema: Any, key: Key, keyword: str
+) -> Iterator[ValidationError]:
+    # errors located like the ones of the validation of the whole document
+    for error in validator.descend(
+        value, schema, path=key, schema_path=key if keyword == "properties" else None
+    ):
+        error.relative_schema_path.appendleft(keyword)
+        yield error
@@ -2,12 +2,22 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import logging
-from typing import Any, Callable, List, Optional, Union
+from typing import Any, Callable, List, Literal, Optional, Union
 
 from openapi_pydantic import Schema
-from pydantic import BaseModel, Field, model_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    InstanceOf,
+    ModelWrapValidatorHandler,
+    PrivateAttr,
+    model_validator,
+)
+from pydantic.json_schema import SkipJsonSchema
 from typing_extensions import Self
 
+from agntcy_iomapper.base.response_cache import ResponseCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +37,44 @@ class ArgumentsDescription(BaseModel):
         default=None,
         description="Agent Manifest definition as per https://agntcy.github.io/acp-spec/openapi.html#model/agentmanifest",
     )
+    # json_schema and its dictionary view
+    _schema_dict: Optional[tuple[Schema, dict[str, Any]]] = PrivateAttr(default=None)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _share_schema(cls, data: Any, handler: ModelWrapValidatorHandler[Self]) -> Self:
+        # schemas given as dictionaries are validated once and shared, the
+        # dictionary is kept as the view of the schema
+        json_schema = data.get("json_schema") if isinstance(data, dict) else None
+        if not isinstance(json_schema, dict):
+            return handler(data)
+
+        from agntcy_iomapper.base.utils import schema_from_dict
+
+        self = handler({**data, "json_schema": schema_from_dict(json_schema)})
+        self._schema_dict = (self.json_schema, json_schema)
+        return self
+
+    def set_schema_dict(self, json_schema: dict[str, Any]) -> None:
+        """Sets the JSON schema from a dictionary, the Schema model is
+        validated once for every description of the same schema"""
+        from agntcy_iomapper.base.utils import schema_from_dict
+
+        self.json_schema = schema_from_dict(json_schema)
+        self._schema_dict = (self.json_schema, json_schema)
+
+    @property
+    def schema_dict(self) -> Optional[dict[str, Any]]:
+        """The JSON schema as a dictionary, dumped once for every description
+        of the same schema. It is shared and must not be modified."""
+        if self.json_schema is None:
+            return None
+
+        if self._schema_dict is None or self._schema_dict[0] is not self.json_schema:
+            from agntcy_iomapper.base.utils import schema_to_dict
+
+            self._schema_dict = (self.json_schema, schema_to_dict(self.json_schema))
+        return self._schema_dict[1]
 
     @model_validator(mode="after")
     def _validate_obj(self) -> Self:
@@ -55,16 +103,12 @@ class BaseIOMapperInput(BaseModel):
         if self.input.agent_manifest is not None:
             # given an input agents manifest map its ouput definition
             # because the data to be mapped is the result of calling the input agent
-            self.input.json_schema = Schema.model_validate(
-                self.input.agent_manifest["specs"]["output"]
-            )
+            self.input.set_schema_dict(self.input.agent_manifest["specs"]["output"])
 
         if self.output.agent_manifest:
             # given an output agents manifest map its input definition
             # because the data to be mapped would be mapped to it's input
-            self.output.json_schema = Schema.model_validate(
-                self.output.agent_manifest["specs"]["input"]
-            )
+            self.output.set_schema_dict(self.output.agent_manifest["specs"]["input"])
 
         return self
 
@@ -83,6 +127,57 @@ class BaseIOMapperConfig(BaseModel):
     validate_json_output: bool = Field(
         default=False, description="Validate output against JSON schema."
     )
+    validation_policy: Literal["always", "never", "every_n", "sample"] = Field(
+        default="always",
+        description="How often enabled input/output validations run: on every call, never, every Nth call or on a random sample of calls. Only failures under the always policy are raised, sampled failures are logged and counted in the validation stats.",
+    )
+    validation_every_n: int = Field(
+        default=100,
+        ge=1,
+        description="Validate one call out of N with the every_n validation policy.",
+    )
+    validation_sample_rate: float = Field(
+        default=0.01,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of calls validated with the sample validation policy.",
+    )
+    prompt_format: Literal["python", "compact"] = Field(
+        default="python",
+        description="How the schemas and the data are rendered in the prompt: as Python reprs, or as minified JSON without the unreferenced schema definitions.",
+    )
+    prompt_strip_titles: bool = Field(
+        default=False,
+        description="Drop the title keywords of the schemas rendered in compact prompts.",
+    )
+    prompt_strip_defaults: bool = Field(
+        default=False,
+        description="Drop the default keywords of the schemas rendered in compact prompts.",
+    )
+    response_cache: SkipJsonSchema[Optional[InstanceOf[ResponseCache]]] = Field(
+        default=None,
+        exclude=True,
+        description="Cache of the LLM responses, keyed by the model, its settings and the rendered messages. Disabled when not set.",
+    )
+    batch_token_budget: int = Field(
+        default=4000,
+        ge=1,
+        description="Estimated prompt tokens of a batched prompt, records are added to a batch until it is reached. A batch always holds at least one record.",
+    )
+    batch_max_records: int = Field(
+        default=50,
+        ge=1,
+        description="Maximum number of records of a batched prompt.",
+    )
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of inputs mapped at once by the async batch calls and by the batches of the LangGraph runnable. Not limited when not set.",
+    )
+    stream_output: bool = Field(
+        default=False,
+        description="Stream the responses of the LLM in async calls, the members of JSON outputs are parsed as they complete and, when output validation is raised, the generation is stopped on the first invalid member.",
+    )
     system_prompt_template: str = Field(
         max_length=4096,
         default="You are a translation machine. You translate both natural language and object formats for computers. Response_format to { 'type': 'json_object' }",
@@ -90,9 +185,14 @@ class BaseIOMapperConfig(BaseModel):
     )
     message_template: str = Field(
         max_length=4096,
-        default="The data is described {% if input.json_schema %}by the following JSON schema: {{ input.json_schema.model_dump(exclude_none=True) }}{% else %}as {{ input.description }}{% endif %}, and {%if output.json_schema %} the result must adhere strictly to the following JSON schema: {{ output.json_schema.model_dump(exclude_none=True) }}{% else %}as {{ output.description }}{% endif %}. The data to translate is: {{ data }}. It is absolutely crucial that each field and its type specified in the schema are followed precisely, without introducing any additional fields or altering types. Non-compliance will result in rejection of the output.",
+        default="The data is described {% if input.json_schema %}by the following JSON schema: {{ input_schema }}{% else %}as {{ input.description }}{% endif %}, and {%if output.json_schema %} the result must adhere strictly to the following JSON schema: {{ output_schema }}{% else %}as {{ output.description }}{% endif %}. The data to translate is: {{ serialized_data }}. It is absolutely crucial that each field and its type specified in the schema are followed precisely, without introducing any additional fields or altering types. Non-compliance will result in rejection of the output.",
         description="Default user message template. This can be overridden by the message request.",
     )
+    batch_message_template: str = Field(
+        max_length=4096,
+        default="The data is described {% if input.json_schema %}by the following JSON schema: {{ input_schema }}{% else %}as {{ input.description }}{% endif %}, and {%if output.json_schema %} each result must adhere strictly to the following JSON schema: {{ output_schema }}{% else %}as {{ output.description }}{% endif %}. Translate each of the following {{ records|length }} records:\n{% for record in records %}{{ loop.index }}. {{ record }}\n{% endfor %}Respond with a JSON array holding the {{ records|length }} results in the order of the records. It is absolutely crucial that each field and its type specified in the schema are followed precisely, without introducing any additional fields or altering types. Non-compliance will result in rejection of the output.",
+        description="User message Jinja2 template of batched prompts, the records to translate are rendered from the records variable.",
+    )
 
 
 class AgentIOMapperInput(BaseIOMapperInput):
@@ -0,0 +1,182 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Serialization of the schemas and of the data embedded in the prompts.
+
+The `python` prompt format renders them as Python reprs, like the message
+template always did. The `compact` format renders minified JSON, drops the
+definitions the schema never references and, optionally, the `title` and
+`default` keywords, which saves prompt tokens on large schemas.
+"""
+
+from typing import Any, Optional, Union
+
+from openapi_pydantic import Schema
+from pydantic_core import to_json
+
+from agntcy_iomapper.base.fingerprint import (
+    _SCHEMA_MAPS,
+    _VALUE_KEYWORDS,
+    schema_as_dict,
+    schema_fingerprint,
+)
+from agntcy_iomapper.base.lru import LRUCache
+from agntcy_iomapper.base.models import BaseIOMapperConfig
+
+_DEFAULT_CACHE_SIZE = 256
+
+_DEFINITIONS = ("$defs", "definitions")
+
+
+def _collect_refs(node: Any, refs: set[str]) -> None:
+    if isinstance(node, list):
+        for value in node:
+            _collect_refs(value, refs)
+    elif isinstance(node, dict):
+        for key, value in node.items():
+            if key == "$ref" and isinstance(value, str):
+                refs.add(value)
+            elif key not in _VALUE_KEYWORDS:
+                _collect_refs(value, refs)
+
+
+def _definition_name(ref: str) -> Optional[tuple[str, str]]:
+    for definitions in _DEFINITIONS:
+        prefix = f"#/{definitions}/"
+        if ref.startswith(prefix):
+            return definitions, ref[len(prefix) :].split("/", 1)[0]
+    return None
+
+
+def prune_definitions(schema: dict[str, Any]) -> dict[str, Any]:
+    """Returns the schema without the root definitions that are not
+    referenced, directly or through other definitions, from the schema.
+    The schema given is not modified."""
+    if not any(isinstance(schema.get(key), dict) for key in _DEFINITIONS):
+        return schema
+
+    refs: set[str] = set()
+    _collect_refs(
+        {key: value for key, value in schema.items() if key not in _DEFINITIONS},
+        refs,
+    )
+
+    used: set[tuple[str, str]] = set()
+    pending = list(refs)
+    while pending:
+        name = _definition_name(pending.pop())
+        if name is None or name in used:
+            continue
+        definition = schema.get(name[0], {}).get(name[1])
+        if definition is None:
+            continue
+        used.add(name)
+        new_refs: set[str] = set()
+        _collect_refs(definition, new_refs)
+        pending.extend(new_refs)
+
+    pruned = {key: value for key, value in schema.items() if key not in _DEFINITIONS}
+    for definitions in _DEFINITIONS:
+        if not isinstance(schema.get(definitions), dict):
+            continue
+        kept = {
+            name: definition
+            for name, definition in schema[definitions].items()
+            if (definitions, name) in used
+        }
+        if kept:
+            pruned[definitions] = kept
+    return pruned
+
+
+def strip_keywords(node: Any, keywords: set[str]) -> Any:
+    """Returns a copy of the schema without the given keywords, property
+    names and values such as enums or defaults are left untouched"""
+    if isinstance(node, list):
+        return [strip_keywords(value, keywords) for value in node]
+    elif not isinstance(node, dict):
+        return node
+
+    stripped = {}
+    for key, value in node.items():
+        if key in keywords:
+            continue
+        if key in _VALUE_KEYWORDS:
+            stripped[key] = value
+        elif (key in _SCHEMA_MAPS or key in _DEFINITIONS) and isinstance(value, dict):
+            stripped[key] = {
+                name: strip_keywords(sub_schema, keywords)
+                for name, sub_schema in value.items()
+            }
+        else:
+            stripped[key] = strip_keywords(value, keywords)
+    return stripped
+
+
+def compact_schema(
+    schema: Union[Schema, dict[str, Any]],
+    strip_titles: bool = False,
+    strip_defaults: bool = False,
+) -> dict[str, Any]:
+    """Returns the schema as embedded in compact prompts
+    Args:
+        schema: the JSON schema either as a dictionary or as a Schema model
+        strip_titles: drop the `title` keywords
+        strip_defaults: drop the `default` keywords
+    Returns:
+        The schema without unreferenced definitions and stripped keywords
+    """
+    if isinstance(schema, Schema):
+        schema = schema_as_dict(schema)
+
+    schema = prune_definitions(schema)
+    keywords = {
+        keyword
+        for keyword, strip in (("title", strip_titles), ("default", strip_defaults))
+        if strip
+    }
+    return strip_keywords(schema, keywords) if keywords else schema
+
+
+def to_prompt_json(value: Any) -> str:
+    """Minified JSON of the value, Pydantic models included"""
+    return to_json(value, fallback=str).decode("utf-8")
+
+
+_cache: LRUCache[str] = LRUCache(_DEFAULT_CACHE_SIZE)
+
+
+def _render_schema(schema: Schema, config: BaseIOMapperConfig) -> str:
+    if config.prompt_format == "python":
+        return str(schema.model_dump(exclude_none=True))
+    return to_prompt_json(
+        compact_schema(schema, config.prompt_strip_titles, config.prompt_strip_defaults)
+    )
+
+
+def serialize_schema(
+    schema: Optional[Schema], config: BaseIOMapperConfig
+) -> Optional[str]:
+    """Returns the schema as rendered in the prompts with the prompt format
+    of the config, cached by fingerprint"""
+    if schema is None:
+        return None
+
+    return _cache.get_or_create(
+        (
+            schema_fingerprint(schema),
+            config.prompt_format,
+            config.prompt_strip_titles,
+            config.prompt_strip_defaults,
+        ),
+        lambda: _render_schema(schema, config),
+    )
+
+
+def serialize_data(data: Any, config: BaseIOMapperConfig) -> Any:
+    """Returns the data as rendered in the prompts with the prompt format of
+    the config"""
+    if config.prompt_format == "python":
+        return data
+    return to_prompt_json(data)
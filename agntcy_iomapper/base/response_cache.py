@@ -0,0 +1,168 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Caches of LLM responses, keyed by the model, its settings and the messages.
+
+Retried graph steps often render byte-identical prompts, a response cache
+set on the `BaseIOMapperConfig` answers them without calling the LLM. Only
+responses that were parsed and validated successfully are stored, so a
+retry after a bad response still reaches the LLM.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional
+
+from pydantic import BaseModel, Field
+
+_DEFAULT_MAX_ENTRIES = 1024
+_DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def response_cache_key(
+    model: str, settings: Any, messages: list[dict[str, str]]
+) -> str:
+    """Returns the cache key of a request
+    Args:
+        model: identity of the model, e.g. its class and name
+        settings: the model settings, anything JSON serializable
+        messages: the rendered messages sent to the model
+    Returns:
+        The hex sha256 of the canonical JSON of the request
+    """
+    canonical = json.dumps(
+        {"model": model, "settings": settings, "messages": messages},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCacheStats(BaseModel):
+    hits: int = Field(default=0, description="Requests answered from the cache")
+    misses: int = Field(default=0, description="Requests sent to the model")
+    expired: int = Field(
+        default=0, description="Entries dropped when their TTL ran out"
+    )
+    evicted: int = Field(
+        default=0, description="Entries dropped to honor the size bounds"
+    )
+    entries: int = Field(default=0, description="Entries currently cached")
+    size_bytes: int = Field(default=0, description="Size of the cached entries")
+
+
+class ResponseCache(ABC):
+    """Store of LLM responses, implementations must be thread-safe"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Returns the response cached for the key, None on a miss"""
+
+    @abstractmethod
+    def set(self, key: str, response: str) -> None:
+        """Caches the response for the key"""
+
+    @abstractmethod
+    def stats(self) -> ResponseCacheStats:
+        """Reports the counters and the size of the cache"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drops every entry and resets the counters"""
+
+
+class _Entry(NamedTuple):
+    response: str
+    size: int
+    expires_at: Optional[float]
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Response cache of the process, bounded in entries and in bytes.
+
+    Entries are evicted least recently used first when a bound is exceeded
+    and dropped when their TTL runs out.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = _DEFAULT_MAX_ENTRIES,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            max_entries: number of responses kept at most
+            max_bytes: size of the responses and keys kept at most, in bytes
+            ttl: seconds a response is served for, forever when None
+            clock: returns the current time in seconds
+        """
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive numbers")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be a positive number of seconds")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._size = 0
+        self._stats = ResponseCacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None:
+                if entry.expires_at <= self._clock():
+                    self._remove(key)
+                    self._stats.expired += 1
+                    entry = None
+
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            self._stats.hits += 1
+            self._entries.move_to_end(key)
+            return entry.response
+
+    def set(self, key: str, response: str) -> None:
+        size = len(key) + len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        expires_at = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(response, size, expires_at)
+            self._size += size
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats.evicted += 1
+
+    def stats(self) -> ResponseCacheStats:
+        with self._lock:
+            return self._stats.model_copy(
+                update={"entries": len(self._entries), "size_bytes": self._size}
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._stats = ResponseCacheStats()
+
+    def _remove(self, key: str) -> None:
+        self._size -= self._entries.pop(key).size
@@ -0,0 +1,286 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Path to sub-schema index of a JSON schema.
+
+Projection, field extraction and per-field validation all need the schema
+sitting at a dotted path. `SchemaIndex` resolves it once per schema and
+keeps it in a table, so later lookups are a dictionary access.
+"""
+
+import copy
+import sys
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import unquote
+
+import jsonref
+
+
+class _RefResolver:
+    """Resolves the $refs of a schema on demand.
+
+    Only the subschemas handed to `resolve` are walked, so definitions that
+    are not reachable from them are never touched. Each local definition is
+    resolved once per schema and shared by every $ref pointing to it, like
+    jsonref does, sibling keywords of a $ref are dropped.
+    """
+
+    def __init__(self, schema: Dict[str, Any]) -> None:
+        self.schema = schema
+        self._definitions: Dict[str, Any] = {}
+        # resolved copies by identity of the original node, the node is kept
+        # alongside so its id cannot be reused
+        self._nodes: Dict[int, tuple[Any, Any]] = {}
+        self._lock = threading.RLock()
+
+    def target(self, node: Any) -> Any:
+        """Follows $refs until reaching a schema that is not a reference,
+        without resolving the references inside of it"""
+        seen = set()
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str):
+            ref = node["$ref"]
+            if not ref.startswith("#") or ref in seen:
+                break
+            seen.add(ref)
+            node = self._pointer(ref)
+        return node
+
+    def resolve(self, node: Any) -> Any:
+        """Returns node with every reachable $ref replaced by its definition"""
+        # definitions are registered before they are filled in, other threads
+        # must not see them half resolved
+        with self._lock:
+            return self._resolve(node)
+
+    def _resolve(self, node: Any) -> Any:
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                return self._definition(ref)
+        elif not isinstance(node, list):
+            return node
+
+        cached = self._nodes.get(id(node))
+        if cached is not None:
+            return cached[1]
+
+        if isinstance(node, dict):
+            resolved = {key: self._resolve(value) for key, value in node.items()}
+        else:
+            resolved = [self._resolve(value) for value in node]
+        self._nodes[id(node)] = (node, resolved)
+        return resolved
+
+    def _definition(self, ref: str) -> Any:
+        if ref in self._definitions:
+            return self._definitions[ref]
+
+        if not ref.startswith("#"):
+            # remote references are left to jsonref and its loader
+            resolved = copy.deepcopy(jsonref.replace_refs({"$ref": ref}))
+            self._definitions[ref] = resolved
+            return resolved
+
+        target = self._pointer(ref)
+        if not isinstance(target, dict):
+            resolved = self._resolve(target)
+            self._definitions[ref] = resolved
+            return resolved
+
+        # registered before walking the definition so recursive references
+        # point back to it instead of recursing forever
+        resolved = {}
+        self._definitions[ref] = resolved
+        definition = self._resolve(target)
+        resolved.update(definition if isinstance(definition, dict) else {})
+        return resolved
+
+    def _pointer(self, ref: str) -> Any:
+        node = self.schema
+        pointer = unquote(ref[1:])
+        if not pointer:
+            return node
+
+        for token in pointer.lstrip("/").split("/"):
+            token = token.replace("~1", "/").replace("~0", "~")
+            if isinstance(node, list):
+                node = node[int(token)]
+            else:
+                node = node[token]
+        return node
+
+
+class SchemaIndex:
+    """Table of the sub-schemas of a JSON schema by dotted path.
+
+    Paths follow the conventions of the field mappings: array items are
+    transparent, `messages.content` is the content of the message items,
+    and the properties of every anyOf branch are reachable. Numeric segments
+    such as `messages.0.content` are accepted and ignored. When several
+    branches define the same path, its schema is an anyOf of theirs.
+
+    An eager index walks the whole schema when created, recursive schemas
+    are indexed down to their first repetition. A lazy index only resolves
+    the paths looked up, which is what very large schemas need.
+
+    The sub-schemas are shared and must not be modified.
+    """
+
+    def __init__(self, schema: Dict[str, Any], lazy: bool = False) -> None:
+        self.schema = schema
+        self.resolver = _RefResolver(schema)
+        self._table: Dict[str, Any] = {}
+        # lookups of paths with numeric segments, by their canonical path
+        self._aliases: Dict[str, str] = {}
+        self._complete = False
+        self._lock = threading.RLock()
+
+        if not lazy:
+            self.build()
+
+    def build(self) -> "SchemaIndex":
+        """Indexes every path of the schema, a no-op for eager indexes"""
+        with self._lock:
+            if not self._complete:
+                root = self.resolver.target(self.schema)
+                self._walk([root], "", {id(root)})
+                self._complete = True
+        return self
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Returns the resolved sub-schema at path, None when there is none"""
+        if path in self._table:
+            return self._table[path]
+        elif path in self._aliases:
+            return self._table[self._aliases[path]]
+
+        with self._lock:
+            return self._lookup(path)
+
+    def __getitem__(self, path: str) -> Dict[str, Any]:
+        schema = self.get(path)
+        if schema is None:
+            raise KeyError(path)
+        return schema
+
+    def __contains__(self, path: str) -> bool:
+        return self.get(path) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over the paths indexed so far"""
+        return iter(list(self._table))
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def memory_usage(self) -> int:
+        """Approximate size in bytes of the table and of the sub-schemas it
+        holds. Sub-schemas shared between paths are counted once."""
+        size = sys.getsizeof(self._table) + sys.getsizeof(self._aliases)
+        size += sum(sys.getsizeof(path) for path in self._table)
+        size += sum(sys.getsizeof(path) for path in self._aliases)
+
+        seen = set()
+        stack = list(self._table.values())
+        while stack:
+            value = stack.pop()
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            size += sys.getsizeof(value)
+            if isinstance(value, dict):
+                stack.extend(value.keys())
+                stack.extend(value.values())
+            elif isinstance(value, list):
+                stack.extend(value)
+        return size
+
+    def _branches(self, nodes: List[Any]) -> List[Dict[str, Any]]:
+        """Expands the anyOf branches and the array items of nodes"""
+        branches = []
+        seen = set()
+        pending = list(nodes)
+        while pending:
+            node = self.resolver.target(pending.pop(0))
+            if not isinstance(node, dict) or id(node) in seen:
+                continue
+            seen.add(id(node))
+            branches.append(node)
+
+            sub_schemas = node.get("anyOf")
+            if isinstance(sub_schemas, list):
+                pending.extend(sub_schemas)
+            items = node.get("items")
+            if isinstance(items, dict):
+                pending.append(items)
+        return branches
+
+    def _children(self, nodes: List[Any]) -> Dict[str, List[Any]]:
+        children: Dict[str, List[Any]] = {}
+        for branch in self._branches(nodes):
+            properties = branch.get("properties")
+            if not isinstance(properties, dict):
+                continue
+            for name, child in properties.items():
+                candidates = children.setdefault(name, [])
+                if not any(
+                    self.resolver.target(child) is self.resolver.target(other)
+                    for other in candidates
+                ):
+                    candidates.append(child)
+        return children
+
+    def _resolve(self, candidates: List[Any]) -> Dict[str, Any]:
+        if len(candidates) == 1:
+            return self.resolver.resolve(candidates[0])
+        return {"anyOf": [self.resolver.resolve(c) for c in candidates]}
+
+    def _walk(
+        self,
+        nodes: List[Any],
+        prefix: str,
+        ancestors: set[int],
+        repeated: bool = False,
+    ) -> None:
+        for name, candidates in self._children(nodes).items():
+            path = prefix + name
+            if path not in self._table:
+                self._table[path] = self._resolve(candidates)
+            if repeated:
+                continue
+
+            branches = {id(branch) for branch in self._branches(candidates)}
+            # a recursive schema is indexed one level into its repetition,
+            # deeper paths are left to lookups
+            self._walk(
+                candidates,
+                path + ".",
+                ancestors | branches,
+                repeated=bool(branches & ancestors),
+            )
+
+    def _lookup(self, path: str) -> Optional[Dict[str, Any]]:
+        nodes = [self.schema]
+        canonical = []
+        for part in path.split("."):
+            candidates = self._children(nodes).get(part)
+            if not candidates:
+                if part.isdigit() and canonical:
+                    # array index, items are transparent
+                    continue
+                return None
+
+            canonical.append(part)
+            key = ".".join(canonical)
+            if key not in self._table:
+                self._table[key] = self._resolve(candidates)
+            nodes = candidates
+
+        if not canonical:
+            return None
+        key = ".".join(canonical)
+        if key != path:
+            self._aliases[path] = key
+        return self._table[key]
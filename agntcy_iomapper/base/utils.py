@@ -1,333 +1,348 @@
 # Copyright AGNTCY Contributors (https://github.com/agntcy)
 # SPDX-License-Identifier: Apache-2.0
 
-import copy
-import json
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
-import jsonref
 from openapi_pydantic import Schema
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
+from agntcy_iomapper.base.fingerprint import schema_as_dict, schema_fingerprint
+from agntcy_iomapper.base.lru import CacheInfo, LRUCache
 from agntcy_iomapper.base.models import (
     FieldMetadata,
     IOMappingAgentMetadata,
 )
+from agntcy_iomapper.base.schema_index import SchemaIndex
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_PROJECTION_CACHE_SIZE = 256
+_DEFAULT_EXTRACTOR_CACHE_SIZE = 256
+_DEFAULT_SCHEMA_VIEW_CACHE_SIZE = 256
+
+
+class _PathTrie:
+    """Prefix tree of the requested json paths"""
+
+    __slots__ = ("children", "terminal", "description", "examples", "annotated")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_PathTrie"] = {}
+        # a requested path ends here, the whole subtree is kept
+        self.terminal = False
+        self.description: Optional[str] = None
+        self.examples: Optional[List[str]] = None
+        # a node below this one carries a description or examples
+        self.annotated = False
+
+    def insert(
+        self,
+        parts: List[str],
+        description: Optional[str],
+        examples: Optional[List[str]],
+    ) -> None:
+        nodes = [self]
+        for part in parts:
+            nodes.append(nodes[-1].children.setdefault(part, _PathTrie()))
+
+        leaf = nodes[-1]
+        # the first path ending on a field decides its description
+        if leaf.terminal:
+            return
+        leaf.terminal = True
+        leaf.description = description
+        leaf.examples = examples
+
+        if description or examples:
+            for node in nodes[:-1]:
+                node.annotated = True
+
+
+def _annotate(
+    schema: Any, trie: _PathTrie, with_examples: bool = True
+) -> Dict[str, Any]:
+    if not isinstance(schema, dict):
+        return schema
+    if not trie.description and not (with_examples and trie.examples):
+        return schema
+
+    # subtrees are shared, never annotate them in place
+    schema = dict(schema)
+    if trie.description:
+        schema["description"] = trie.description
+    if with_examples and trie.examples:
+        schema["examples"] = trie.examples
+    return schema
+
+
+def _is_branching(node: Any) -> bool:
+    # the index merges the sub-schemas of the branches, the projection
+    # keeps them apart
+    return isinstance(node.get("anyOf"), list) or isinstance(node.get("items"), dict)
+
+
+def _project_schema(
+    node: Any,
+    trie: _PathTrie,
+    index: SchemaIndex,
+    keep_all: bool,
+    path: Optional[str],
+) -> Any:
+    resolver = index.resolver
+    if keep_all and not trie.annotated:
+        return resolver.resolve(node)
+
+    node = resolver.target(node)
+    if not isinstance(node, dict):
+        return resolver.resolve(node)
+    if _is_branching(node):
+        path = None
+
+    # arrays and unions are transparent, the paths apply to their items
+    # and to each of their sub schemas
+    projected = {}
+    for key, value in node.items():
+        if key == "properties" and isinstance(value, dict):
+            projected[key] = _project_properties(value, trie, index, keep_all, path)
+        elif key == "items" and isinstance(value, dict):
+            projected[key] = _project_schema(value, trie, index, keep_all, None)
+        elif key == "anyOf" and isinstance(value, list):
+            projected[key] = [
+                _project_schema(sub_schema, trie, index, keep_all, None)
+                for sub_schema in value
+            ]
+        else:
+            projected[key] = resolver.resolve(value)
+    return projected
+
+
+def _project_properties(
+    properties: Dict[str, Any],
+    trie: _PathTrie,
+    index: SchemaIndex,
+    keep_all: bool,
+    path: Optional[str],
+) -> Dict[str, Any]:
+    """Projects the properties of the node at path, path is None when the
+    node sits below an array or a union"""
+    # a path that does not exist at this level keeps every property
+    if not keep_all and any(key not in properties for key in trie.children):
+        keep_all = True
+
+    keys = properties if keep_all else trie.children
+    projected = {}
+    for key in keys:
+        child = trie.children.get(key)
+        if child is None:
+            projected[key] = index.resolver.resolve(properties[key])
+            continue
+
+        projected[key] = _project_field(
+            properties[key],
+            child,
+            index,
+            keep_all or child.terminal,
+            None if path is None else f"{path}.{key}",
+        )
+    return projected
+
+
+def _project_field(
+    node: Any,
+    trie: _PathTrie,
+    index: SchemaIndex,
+    keep_all: bool,
+    path: Optional[str],
+) -> Any:
+    if keep_all and not trie.annotated and path is not None:
+        # a whole field, the same sub-schema for every projection
+        return _annotate(index[path], trie)
+    return _annotate(_project_schema(node, trie, index, keep_all, path), trie)
+
 
 def create_type_from_schema(
-    json_schema: Dict[str, Any], json_paths: List[Union[str, FieldMetadata]]
+    json_schema: Dict[str, Any],
+    json_paths: List[Union[str, FieldMetadata]],
+    schema_index: Optional[SchemaIndex] = None,
 ) -> Optional[Type]:
     """
     Creates a new model with only the specified fields from a JSON schema.
 
+    The paths are merged in a prefix tree and projected in a single walk of
+    the schema. Whole fields outside of arrays and unions are looked up in
+    the schema index. Unchanged subtrees are shared, not copied, both within
+    the result and with the $ref definitions they come from.
+
     Args:
         json_schema: The JSON schema of the original object.
         json_paths: A list of field names to include in the new model.
+        schema_index: Index of json_schema, its sub-schemas and resolved
+            definitions are reused across projections of the same schema.
 
     Returns:
         A new Pydantic model class containing only the specified fields.
     """
-
-    # replace $refs with actual object definition
-    flatten_json = jsonref.loads(json.dumps(json_schema))
-
-    properties = flatten_json.get("properties", {})
-
-    filtered_properties = {}
-    curr_path_schema = {}
-
+    trie = _PathTrie()
     for path in json_paths:
         curr_path = path if isinstance(path, str) else path.json_path
         field_description = None if isinstance(path, str) else path.description
         field_examples = None if isinstance(path, str) else path.examples
+        trie.insert(curr_path.split("."), field_description, field_examples)
+
+    # $refs are replaced with their definition only along the requested paths
+    if schema_index is None:
+        schema_index = SchemaIndex(json_schema, lazy=True)
+    resolver = schema_index.resolver
+
+    root = resolver.target(json_schema)
+    properties = root.get("properties", {})
+    # fields are looked up in the index unless the root is a union
+    indexed = not _is_branching(root)
 
-        parts = curr_path.split(".")
-        curr_key = parts[0]
+    filtered_properties = {}
 
+    for curr_key, child in trie.children.items():
         if curr_key.isdigit():
             continue
 
-        curr_path_schema.clear()
-
         if curr_key in properties:
-            # perform a deepcopy to keep original properties intact
-            curr_object_def = copy.deepcopy(properties.get(curr_key))
-
-            curr_path_schema[curr_key] = copy.deepcopy(curr_object_def)
-
-            if len(parts) == 1:
-                if field_description:
-                    curr_path_schema[curr_key]["description"] = field_description
-                if field_examples:
-                    curr_path_schema[curr_key]["examples"] = field_examples
-
-            if "anyOf" in curr_object_def:
-                sub_schemas = curr_object_def.get("anyOf")
-
-                for i, sub_schema in enumerate(sub_schemas):
-                    if "properties" in sub_schema:
-                        _props = sub_schema.get("properties", {})
-                        curr_path_schema[curr_key]["anyOf"][i]["properties"] = (
-                            _get_properties(
-                                1,
-                                parts,
-                                _props,
-                                flatten_json,
-                                field_description,
-                                field_examples,
-                            )
-                        )
-                    elif "items" in sub_schema:
-                        _curr_items = curr_object_def.get("items", {})
-                        curr_path_schema[curr_key]["anyOf"][i]["items"] = (
-                            _get_properties(
-                                1,
-                                parts,
-                                _curr_items,
-                                flatten_json,
-                                field_description,
-                                field_examples,
-                            )
-                        )
-
-            if "properties" in curr_object_def:
-                props = curr_object_def.get("properties", {})
-                curr_path_schema[curr_key]["properties"] = _get_properties(
-                    1, parts, props, flatten_json, field_description, field_examples
-                )
-            elif "items" in curr_object_def:
-                curr_items = curr_object_def.get("items", {})
-                curr_path_schema[curr_key]["items"] = _get_properties(
-                    1,
-                    parts,
-                    curr_items,
-                    flatten_json,
-                    field_description,
-                    field_examples,
-                )
-
-        else:
-            curr_path_schema[curr_key] = {"type": "object", "properties": {}}
-            if len(parts) == 1:
-                curr_path_schema[curr_key] = flatten_json
-                if field_description:
-                    curr_path_schema[curr_key]["description"] = field_description
-            else:
-                curr_path_schema[curr_key]["properties"] = _get_properties(
-                    1, parts, {}, flatten_json, field_description, field_examples
-                )
-
-        if curr_key not in filtered_properties:
-            filtered_properties[curr_key] = copy.deepcopy(curr_path_schema[curr_key])
+            filtered_properties[curr_key] = _project_field(
+                properties[curr_key],
+                child,
+                schema_index,
+                child.terminal,
+                curr_key if indexed else None,
+            )
+        elif child.terminal:
+            # unknown root field, it stands for the whole object
+            filtered_properties[curr_key] = _annotate(
+                resolver.resolve(json_schema), child, with_examples=False
+            )
         else:
-            filtered_properties[curr_key] = _merge_paths(
-                curr_path_schema, filtered_properties
-            )[curr_key]
+            filtered_properties[curr_key] = {"type": "object", "properties": {}}
 
     return filtered_properties
 
 
-def _merge_paths(d1: dict, d2: dict):
-    """
-    Merges two dictionaries recursively, combining values for common keys,
-    and merging nested dictionaries at the same level.
-
+def extract_nested_fields(data: Any, fields: List[Union[str, FieldMetadata]]) -> dict:
+    """Extracts specified fields from a potentially nested data structure
     Args:
-        d1 (dict): The first dictionary.
-        d2 (dict): The second dictionary.
-
+        data: The input data (can be any type)
+        fields: A list of fields path (e.g.. "fielda.fieldb")
     Returns:
-        dict: The merged dictionary.
+        A dictionary containing the extracted fields and their values.
+        Returns empty dictionary if there are errors
     """
-    merged = {}
-    keys = set(d1.keys()) | set(d2.keys())
-
-    for key in keys:
-        if key in d1 and key in d2:
-            if isinstance(d1[key], dict) and isinstance(d2[key], dict):
-                merged[key] = _merge_paths(d1[key], d2[key])
-            elif isinstance(d1[key], list) and isinstance(d2[key], list):
-                merged[key] = []
-                for val1, val2 in zip(d1[key], d2[key]):
-                    if isinstance(val1, dict) and isinstance(val2, dict):
-                        merged[key].append(_merge_paths(val1, val2))
-                    else:
-                        merged[key].append(val2)
-
-                merged[key].extend(d1[key][len(merged[key]) :])
-                merged[key].extend(d2[key][len(merged[key]) :])
-
-            else:
-                merged[key] = d2[key]
-        elif key in d1:
-            merged[key] = d1[key]
-        else:
-            merged[key] = d2[key]
-
-    return merged
+    if not fields:
+        return {}
 
+    return compile_field_extractor(fields)(data)
 
-def _get_properties(
-    level, parts, props, json_schema, field_description, field_examples
-):
 
-    if level >= len(parts):
-        return props
+def _log_extraction_error(field_path: str, e: Exception) -> None:
+    logger.error(f"Error extracting field {field_path}: {e}")
 
-    curr_key = parts[level]
 
-    if curr_key in props:
-        curr_obj = props.get(curr_key)
-        if "properties" in curr_obj:
-            curr_properties = curr_obj.get("properties", {})
-            curr_obj["properties"] = _get_properties(
-                level + 1,
-                parts,
-                curr_properties,
-                json_schema,
-                field_description,
-                field_examples,
-            )
+def _generate_extractor_source(paths: Tuple[str, ...]) -> str:
+    """Generates the source of a function extracting the paths"""
+    lines = ["def extract(data):", "    results = {}"]
 
-        elif "items" in curr_obj:
-            curr_properties = curr_obj.get("items", {})
-            curr_obj["items"] = _get_properties(
-                level + 1,
-                parts,
-                curr_properties,
-                json_schema,
-                field_description,
-                field_examples,
-            )
-        elif "anyOf" in curr_obj:
-            sub_schemas = curr_obj.get("anyOf")
-            anyOfs = []
-            for sub_schema in sub_schemas:
-                s = _get_properties(
-                    level + 1,
-                    parts,
-                    sub_schema,
-                    json_schema,
-                    field_description,
-                    field_examples,
+    for path in paths:
+        lines += ["    try:", "        current = data"]
+        # mappings are indexed by key, lists by numeric segments and
+        # anything else by attribute, missing attributes yield None
+        for part in path.split("."):
+            if part.isdigit():
+                accessor = (
+                    f"current[{part!r}] if isinstance(current, dict) "
+                    f"else current[{int(part)}] if isinstance(current, list) "
+                    f"else getattr(current, {part!r}, None)"
                 )
-                anyOfs.append(s)
-
-            curr_obj["anyOf"] = anyOfs
-
-        if level == len(parts) - 1:
-            if field_description:
-                curr_obj["description"] = field_description
-            if field_examples:
-                curr_obj["examples"] = field_examples
-
-        return {curr_key: curr_obj}
-
-    elif "anyOf" in props:
-        curr_obj = {curr_key: {"anyOf": []}}
-        anyOf = []
-        sub_schemas = props.get("anyOf")
-
-        for sub_schema in sub_schemas:
-            anyOf.append(
-                _get_properties(
-                    level,
-                    parts,
-                    sub_schema,
-                    json_schema,
-                    field_description,
-                    field_examples,
+            else:
+                accessor = (
+                    f"current[{part!r}] if isinstance(current, dict) "
+                    f"else getattr(current, {part!r}, None)"
                 )
-            )
+            lines.append(f"        current = {accessor}")
+        lines += [
+            f"        results[{path!r}] = current",
+            "    except (KeyError, TypeError, AttributeError, ValueError) as e:",
+            f"        _log_error({path!r}, e)",
+        ]
+
+    lines.append("    return results")
+    return "\n".join(lines) + "\n"
+
+
+def _compile_extractor(paths: Tuple[str, ...]) -> Callable[[Any], dict]:
+    namespace = {"_log_error": _log_extraction_error}
+    exec(
+        compile(_generate_extractor_source(paths), "<field extractor>", "exec"),
+        namespace,
+    )
+    return namespace["extract"]
 
-        curr_obj[curr_key]["anyOf"] = anyOf
-        return {curr_key: curr_obj}
-
-    elif "properties" in props:
-        curr_obj = copy.deepcopy(props)
-        curr_properties = curr_obj.get("properties", {})
-        curr_obj["properties"] = _get_properties(
-            level,
-            parts,
-            curr_properties,
-            json_schema,
-            field_description,
-            field_examples,
-        )
-        return curr_obj
-
-    elif "items" in props:
-        curr_obj = copy.deepcopy(props)
-        curr_properties = props.get("items", {})
-        curr_obj["items"] = _get_properties(
-            level,
-            parts,
-            curr_properties,
-            json_schema,
-            field_description,
-            field_examples,
-        )
-        return curr_obj
 
-    else:
-        return props
+_extractor_cache: LRUCache[Callable[[Any], dict]] = LRUCache(
+    _DEFAULT_EXTRACTOR_CACHE_SIZE
+)
 
 
-def extract_nested_fields(data: Any, fields: List[Union[str, FieldMetadata]]) -> dict:
-    """Extracts specified fields from a potentially nested data structure
+def compile_field_extractor(
+    fields: List[Union[str, FieldMetadata]],
+) -> Callable[[Any], dict]:
+    """Compiles the fields into a function extracting them from the data
     Args:
-        data: The input data (can be any type)
         fields: A list of fields path (e.g.. "fielda.fieldb")
     Returns:
-        A dictionary containing the extracted fields and their values.
-        Returns empty dictionary if there are errors
+        A function behaving like `extract_nested_fields` for these fields,
+        shared by every caller extracting the same fields
     """
-    if not fields:
-        return {}
-
-    results = {}
+    paths = tuple(
+        [
+            field_path if isinstance(field_path, str) else field_path.json_path
+            for field_path in fields
+        ]
+    )
+    return _extractor_cache.get_or_create(paths, lambda: _compile_extractor(paths))
 
-    for field_path in fields:
-        try:
-            curr_path = (
-                field_path if isinstance(field_path, str) else field_path.json_path
-            )
-            value = _get_nested_value(data, curr_path)
-            results[curr_path] = value
-        except (KeyError, TypeError, AttributeError, ValueError) as e:
-            logger.error(f"Error extracting field {field_path}: {e}")
-    return results
 
+def get_io_types(data: Any, metadata: IOMappingAgentMetadata) -> Tuple[Schema, Schema]:
+    if not isinstance(data, BaseModel):
+        return get_io_types_from_schema(None, metadata)
 
-def _get_nested_value(data: Any, field_path: str) -> Optional[Any]:
-    """
-    Recursively retrieves a value from a nested data structure
-    """
-    current = data
-    parts = field_path.split(".")
-
-    for part in parts:
-        if isinstance(current, dict):
-            current = current[part]
-        elif isinstance(current, list) and part.isdigit():
-            current = current[int(part)]
-        elif hasattr(current, part):
-            current = getattr(current, part)
-        else:
-            current = None
+    # the schema and the projections of the state class are computed once,
+    # metadata schemas still take precedence over the state schema
+    model_schemas = _get_model_schemas(type(data))
 
-    return current
+    input_type = (
+        project_schema(metadata.input_schema, metadata.input_fields)
+        if metadata.input_schema
+        else model_schemas.project(metadata.input_fields)
+    )
+    output_type = (
+        project_schema(metadata.output_schema, metadata.output_fields)
+        if metadata.output_schema
+        else model_schemas.project(metadata.output_fields)
+    )
 
+    return (input_type, output_type)
 
-def get_io_types(data: Any, metadata: IOMappingAgentMetadata) -> Tuple[Schema, Schema]:
-    data_schema = None
 
-    if isinstance(data, BaseModel):
-        data_schema = data.model_json_schema()
+def get_io_types_from_schema(
+    data_schema: Optional[Dict[str, Any]], metadata: IOMappingAgentMetadata
+) -> Tuple[Schema, Schema]:
+    """Projects the input and output fields of the metadata on their schemas
+    Args:
+        data_schema: schema of the state, used when the metadata does not
+            provide the input or the output schema
+        metadata: the io mapping metadata
+    Returns:
+        The input and output types
+    """
     # If input schema is provided it overwrites the data schema
     input_schema = metadata.input_schema if metadata.input_schema else data_schema
     # If output schema is provided it overwrites the data schema
@@ -338,12 +353,161 @@ def get_io_types(data: Any, metadata: IOMappingAgentMetadata) -> Tuple[Schema, S
             "input_schema, and or output_schema are missing from the metadata, for a better accuracy you are required to provide them in this scenario, or we  could not infer the type from the state"
         )
 
-    input_type = Schema.model_validate(
-        create_type_from_schema(input_schema, metadata.input_fields)
+    input_type = project_schema(input_schema, metadata.input_fields)
+    output_type = project_schema(output_schema, metadata.output_fields)
+
+    return (input_type, output_type)
+
+
+class SharedSchema(Schema):
+    """Schema shared between callers, validated once per distinct schema.
+
+    The model is frozen, nested schemas are shared too and must not be
+    modified either.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+
+class ProjectedSchema(SharedSchema):
+    """Schema returned by `project_schema`, shared between callers."""
+
+
+_FieldsKey = Tuple[Tuple[str, Optional[str], Optional[Tuple[str, ...]]], ...]
+
+
+def _fields_key(json_paths: List[Union[str, FieldMetadata]]) -> _FieldsKey:
+    key = []
+    for path in json_paths:
+        if isinstance(path, str):
+            key.append((path, None, None))
+        else:
+            examples = tuple(path.examples) if path.examples else None
+            key.append((path.json_path, path.description, examples))
+    return tuple(key)
+
+
+_projection_cache: LRUCache[ProjectedSchema] = LRUCache(_DEFAULT_PROJECTION_CACHE_SIZE)
+# lazy indexes of the projected schemas, shared by their projections
+_index_cache: LRUCache[SchemaIndex] = LRUCache(_DEFAULT_PROJECTION_CACHE_SIZE)
+
+
+def project_schema(
+    json_schema: Dict[str, Any], json_paths: List[Union[str, FieldMetadata]]
+) -> ProjectedSchema:
+    """Projects the fields on the schema, memoizing the result
+    Args:
+        json_schema: The JSON schema of the original object.
+        json_paths: The fields to keep, in the order given to the mapper.
+    Returns:
+        The projected schema, the same instance is returned for the same
+        schema and fields
+    """
+    fingerprint = schema_fingerprint(json_schema)
+
+    def project() -> ProjectedSchema:
+        schema_index = _index_cache.get_or_create(
+            fingerprint, lambda: SchemaIndex(json_schema, lazy=True)
+        )
+        return ProjectedSchema.model_validate(
+            create_type_from_schema(json_schema, json_paths, schema_index)
+        )
+
+    return _projection_cache.get_or_create(
+        (fingerprint, _fields_key(json_paths)), project
     )
 
-    output_type = Schema.model_validate(
-        create_type_from_schema(output_schema, metadata.output_fields)
+
+class _ModelSchemas:
+    """JSON schema of a Pydantic model class and its projections"""
+
+    __slots__ = ("json_schema", "projections")
+
+    def __init__(self, json_schema: Dict[str, Any]) -> None:
+        self.json_schema = json_schema
+        self.projections: Dict[_FieldsKey, ProjectedSchema] = {}
+
+    def project(self, json_paths: List[Union[str, FieldMetadata]]) -> ProjectedSchema:
+        key = _fields_key(json_paths)
+        projected = self.projections.get(key)
+        if projected is None:
+            projected = project_schema(self.json_schema, json_paths)
+            self.projections[key] = projected
+        return projected
+
+
+# weakly keyed so that model classes created on the fly can be collected
+_model_schemas: "weakref.WeakKeyDictionary[type, _ModelSchemas]" = (
+    weakref.WeakKeyDictionary()
+)
+_model_schemas_lock = threading.Lock()
+
+
+def _get_model_schemas(model_type: Type[BaseModel]) -> _ModelSchemas:
+    model_schemas = _model_schemas.get(model_type)
+    if model_schemas is None:
+        model_schemas = _ModelSchemas(model_type.model_json_schema())
+        with _model_schemas_lock:
+            model_schemas = _model_schemas.setdefault(model_type, model_schemas)
+    return model_schemas
+
+
+def get_model_json_schema(model_type: Type[BaseModel]) -> Dict[str, Any]:
+    """Returns the JSON schema of a Pydantic model class, generated once
+    Args:
+        model_type: the Pydantic model class
+    Returns:
+        The schema shared by every caller, it must not be modified
+    """
+    return _get_model_schemas(model_type).json_schema
+
+
+# Schema models of JSON schemas and the other way around, by fingerprint
+_schema_models: LRUCache[SharedSchema] = LRUCache(_DEFAULT_SCHEMA_VIEW_CACHE_SIZE)
+_schema_dicts: LRUCache[Dict[str, Any]] = LRUCache(_DEFAULT_SCHEMA_VIEW_CACHE_SIZE)
+
+
+def schema_from_dict(json_schema: Dict[str, Any]) -> SharedSchema:
+    """Returns the Schema model of a JSON schema, validated once
+    Args:
+        json_schema: the JSON schema as a dictionary
+    Returns:
+        The model shared by every caller using the same schema
+    """
+    return _schema_models.get_or_create(
+        schema_fingerprint(json_schema),
+        lambda: SharedSchema.model_validate(json_schema),
     )
 
-    return (input_type, output_type)
+
+def schema_to_dict(schema: Schema) -> Dict[str, Any]:
+    """Returns the JSON schema of a Schema model, dumped once
+    Args:
+        schema: the Schema model
+    Returns:
+        The dictionary shared by every caller using the same schema, it must
+        not be modified
+    """
+    return _schema_dicts.get_or_create(
+        schema_fingerprint(schema), lambda: schema_as_dict(schema)
+    )
+
+
+def projection_cache_info() -> CacheInfo:
+    """Reports hits, misses and size of the schema projection cache"""
+    return _projection_cache.info()
+
+
+def set_projection_cache_size(maxsize: int) -> None:
+    """Changes the number of projections kept, evicting the least recently used"""
+    _projection_cache.resize(maxsize)
+
+
+def clear_projection_cache() -> None:
+    """Drops every cached projection and schema view and resets the counters"""
+    _projection_cache.clear()
+    _index_cache.clear()
+    _schema_models.clear()
+    _schema_dicts.clear()
+    with _model_schemas_lock:
+        _model_schemas.clear()
@@ -0,0 +1,192 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Process-wide cache of compiled jsonschema validators.
+
+`jsonschema.validate` checks the schema against its meta-schema and builds a
+new validator on every call. The mappers validate against the same handful of
+schemas over and over, so validators are built once and kept in a bounded
+LRU cache keyed by a fingerprint of the schema.
+
+`SampledValidator` applies the validation policy of a `BaseIOMapperConfig`,
+so trusted producers can be validated on a sample of calls only.
+"""
+
+import logging
+import random
+import threading
+from typing import Any, Optional, Union
+
+import jsonschema
+from jsonschema.exceptions import best_match
+from jsonschema.protocols import Validator
+from openapi_pydantic import Schema
+from pydantic import BaseModel, Field
+
+from agntcy_iomapper.base.fingerprint import schema_as_dict, schema_fingerprint
+from agntcy_iomapper.base.lru import CacheInfo, LRUCache
+from agntcy_iomapper.base.models import BaseIOMapperConfig
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CACHE_SIZE = 128
+
+
+ValidatorCacheInfo = CacheInfo
+
+
+def _build_validator(schema: dict[str, Any]) -> Validator:
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+_cache: LRUCache[Validator] = LRUCache(_DEFAULT_CACHE_SIZE)
+
+
+def get_validator(schema: Union[Schema, dict[str, Any]]) -> Validator:
+    """Returns a ready to use validator for the schema
+    Args:
+        schema: the JSON schema either as a dictionary or as a Schema model
+    Returns:
+        A validator instance shared by every caller using the same schema
+    """
+
+    def build() -> Validator:
+        if isinstance(schema, Schema):
+            return _build_validator(schema_as_dict(schema))
+        return _build_validator(schema)
+
+    return _cache.get_or_create(schema_fingerprint(schema), build)
+
+
+def validate_with(validator: Optional[Validator], instance: Any) -> None:
+    """Validates the instance, raising the best matching ValidationError like
+    `jsonschema.validate` does. A missing validator accepts everything.
+    """
+    if validator is None:
+        return
+
+    error = best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def format_error(error: Exception) -> str:
+    """Formats the failure of a record for the error field of its output"""
+    if isinstance(error, jsonschema.ValidationError):
+        message = f"ValidationError: {error.message}"
+    else:
+        message = f"{type(error).__name__}: {error}"
+    # BaseIOMapperOutput.error is limited to 4096 characters
+    return message[:4096]
+
+
+def validate(instance: Any, schema: Union[Schema, dict[str, Any]]) -> None:
+    """Drop-in replacement for `jsonschema.validate` using cached validators"""
+    validate_with(get_validator(schema), instance)
+
+
+def validator_cache_info() -> ValidatorCacheInfo:
+    """Reports hits, misses and size of the validator cache"""
+    return _cache.info()
+
+
+def set_validator_cache_size(maxsize: int) -> None:
+    """Changes the number of validators kept, evicting the least recently used"""
+    _cache.resize(maxsize)
+
+
+def clear_validator_cache() -> None:
+    """Drops every cached validator and resets the counters"""
+    _cache.clear()
+
+
+class ValidationCounters(BaseModel):
+    validated: int = Field(default=0, description="Payloads validated")
+    skipped: int = Field(default=0, description="Payloads not sampled")
+    failed: int = Field(default=0, description="Validated payloads that failed")
+
+
+class ValidationStats(BaseModel):
+    input: ValidationCounters = Field(default_factory=ValidationCounters)
+    output: ValidationCounters = Field(default_factory=ValidationCounters)
+
+    def merge(self, other: "ValidationStats") -> None:
+        for name in ("input", "output"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            mine.validated += theirs.validated
+            mine.skipped += theirs.skipped
+            mine.failed += theirs.failed
+
+
+SchemaOrValidator = Union[Schema, dict[str, Any], Validator, None]
+
+
+class SampledValidator:
+    """Validates payloads according to the validation policy of a config.
+
+    Under the `always` policy failures are raised. Under the sampling
+    policies they are logged and counted, the payload is let through.
+    """
+
+    def __init__(self, config: BaseIOMapperConfig) -> None:
+        self.config = config
+        self.stats = ValidationStats()
+        self._calls = {"input": 0, "output": 0}
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+    def validate_input(self, instance: Any, schema: SchemaOrValidator) -> None:
+        if self.config.validate_json_input:
+            self._validate("input", instance, schema)
+
+    def validate_output(self, instance: Any, schema: SchemaOrValidator) -> None:
+        if self.config.validate_json_output:
+            self._validate("output", instance, schema)
+
+    def record_failure(self, direction: str) -> None:
+        """Counts a payload rejected before it was complete, like a streamed
+        output"""
+        counters = getattr(self.stats, direction)
+        counters.validated += 1
+        counters.failed += 1
+
+    def _sampled(self, direction: str) -> bool:
+        policy = self.config.validation_policy
+        if policy == "always":
+            return True
+        elif policy == "never":
+            return False
+        elif policy == "every_n":
+            with self._lock:
+                self._calls[direction] += 1
+                return (
+                    self._calls[direction] - 1
+                ) % self.config.validation_every_n == 0
+        return self._random.random() < self.config.validation_sample_rate
+
+    def _validate(
+        self, direction: str, instance: Any, schema: SchemaOrValidator
+    ) -> None:
+        if schema is None:
+            return
+
+        counters = getattr(self.stats, direction)
+        if not self._sampled(direction):
+            counters.skipped += 1
+            return
+
+        # only resolve the validator once sampled, dumping a Schema isn't free
+        validator = (
+            get_validator(schema) if isinstance(schema, (Schema, dict)) else schema
+        )
+        try:
+            counters.validated += 1
+            validate_with(validator, instance)
+        except jsonschema.ValidationError as e:
+            counters.failed += 1
+            if self.config.validation_policy == "always":
+                raise
+            logger.warning(f"Sampled {direction} validation failed: {e.message}")
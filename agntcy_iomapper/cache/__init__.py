@@ -0,0 +1,16 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+from .sqlite import (
+    CacheFormatError,
+    CacheInspection,
+    SQLiteResponseCache,
+    VersionUsage,
+)
+
+__all__ = [
+    "CacheFormatError",
+    "CacheInspection",
+    "SQLiteResponseCache",
+    "VersionUsage",
+]
@@ -0,0 +1,93 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Inspects and prunes a SQLite response cache.
+
+Example:
+    python -m agntcy_iomapper.cache inspect responses.db
+    python -m agntcy_iomapper.cache prune responses.db \\
+        --max-bytes 100000000 --older-than 604800 --version v2 --vacuum
+"""
+
+import argparse
+import os
+import sys
+from typing import Optional
+
+from agntcy_iomapper.cache.sqlite import CacheFormatError, SQLiteResponseCache
+
+
+def _parse_args(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m agntcy_iomapper.cache",
+        description="Inspect and prune a SQLite response cache.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    inspect = commands.add_parser("inspect", help="Print the content as JSON")
+    inspect.add_argument("path", help="Database file of the cache")
+
+    prune = commands.add_parser("prune", help="Delete entries")
+    prune.add_argument("path", help="Database file of the cache")
+    prune.add_argument(
+        "--max-bytes",
+        type=int,
+        help="Evict the least recently used entries down to this size",
+    )
+    prune.add_argument(
+        "--older-than",
+        type=float,
+        help="Delete the entries not accessed for this many seconds",
+    )
+    prune.add_argument(
+        "--version",
+        help="Delete the entries written under any other version",
+    )
+    prune.add_argument("--all", action="store_true", help="Delete every entry")
+    prune.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Give the space of the deleted entries back to the file system",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+    if not os.path.exists(args.path):
+        print(f"{args.path}: no such cache", file=sys.stderr)
+        return 2
+
+    cache = SQLiteResponseCache(
+        args.path,
+        version=getattr(args, "version", None) or "",
+        read_only=args.command == "inspect",
+    )
+    try:
+        if args.command == "inspect":
+            print(cache.inspect().model_dump_json(indent=2))
+            return 0
+
+        if args.all:
+            entries = cache.stats().entries
+            cache.clear()
+        else:
+            entries = cache.prune(
+                max_bytes=args.max_bytes,
+                older_than=args.older_than,
+                other_versions=args.version is not None,
+            )
+        if args.vacuum:
+            cache.vacuum()
+        print(f"{entries} entries deleted", file=sys.stderr)
+        return 0
+    except CacheFormatError as e:
+        print(f"{args.path}: {e}", file=sys.stderr)
+        return 2
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
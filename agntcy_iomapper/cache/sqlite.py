@@ -0,0 +1,417 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Response cache persisted in a SQLite file, shared by the processes of a host.
+
+The database runs in WAL mode, readers don't block the writer and every
+process opens its own connection. Responses are stored under their content
+addressed key and a version: bump the version when the schemas or the
+prompts change and the entries written before are no longer served. Large
+responses are compressed with zlib and the least recently used entries are
+evicted when the file grows past its size bound.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Union
+from urllib.parse import quote
+
+from pydantic import BaseModel, Field
+
+from agntcy_iomapper.base.response_cache import ResponseCache, ResponseCacheStats
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_DEFAULT_COMPRESS_MIN_BYTES = 1024
+# eviction goes down to this fraction of max_bytes, so it runs seldom
+_EVICTION_LOW_WATERMARK = 0.9
+# access times are refreshed at most this often, hits seldom need a write
+_ACCESS_TIME_RESOLUTION = 60.0
+
+# layout of the database, files of other layouts are refused on open
+_FORMAT_VERSION = 1
+
+_CREATE_TABLES = (
+    """
+    CREATE TABLE responses (
+        key TEXT NOT NULL,
+        version TEXT NOT NULL,
+        value BLOB NOT NULL,
+        compressed INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        accessed_at REAL NOT NULL,
+        PRIMARY KEY (key, version)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX responses_accessed_at ON responses (accessed_at)",
+    # entries and size kept up to date by triggers, for every process
+    """
+    CREATE TABLE totals (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        entries INTEGER NOT NULL,
+        size INTEGER NOT NULL
+    )
+    """,
+    "INSERT INTO totals VALUES (0, 0, 0)",
+    """
+    CREATE TRIGGER responses_insert AFTER INSERT ON responses BEGIN
+        UPDATE totals SET entries = entries + 1, size = size + NEW.size;
+    END
+    """,
+    """
+    CREATE TRIGGER responses_update AFTER UPDATE OF size ON responses BEGIN
+        UPDATE totals SET size = size - OLD.size + NEW.size;
+    END
+    """,
+    """
+    CREATE TRIGGER responses_delete AFTER DELETE ON responses BEGIN
+        UPDATE totals SET entries = entries - 1, size = size - OLD.size;
+    END
+    """,
+)
+
+
+class CacheFormatError(Exception):
+    """The database file was written with another layout, by another
+    version of the package, or is not a response cache"""
+
+
+class VersionUsage(BaseModel):
+    version: str = Field(description="Version the entries were written under")
+    entries: int = Field(description="Number of entries")
+    size_bytes: int = Field(description="Size of the entries")
+
+
+class CacheInspection(BaseModel):
+    path: str = Field(description="Path of the database file")
+    file_bytes: int = Field(description="Size of the database file and its WAL")
+    entries: int = Field(description="Number of entries")
+    size_bytes: int = Field(description="Size of the keys and stored values")
+    versions: list[VersionUsage] = Field(description="Usage by version")
+    oldest_access: Optional[float] = Field(
+        default=None, description="Least recent access time, seconds since epoch"
+    )
+    newest_access: Optional[float] = Field(
+        default=None, description="Most recent access time, seconds since epoch"
+    )
+
+
+class SQLiteResponseCache(ResponseCache):
+    """Response cache stored in a SQLite file, safe to share between the
+    threads and the processes of a host.
+
+    Hit, miss, expiration and eviction counters are those of the current
+    process, the entries and their size are those of the file.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        ttl: Optional[float] = None,
+        version: str = "",
+        compress_min_bytes: Optional[int] = _DEFAULT_COMPRESS_MIN_BYTES,
+        timeout: float = 30.0,
+        clock: Callable[[], float] = time.time,
+        read_only: bool = False,
+    ) -> None:
+        """
+        Args:
+            path: the database file, created when missing. Files written
+                with another layout are refused with a CacheFormatError,
+                their entries are never dropped
+            max_bytes: size of the stored keys and values kept at most
+            ttl: seconds a response is served for, forever when None
+            version: entries written under another version are not served
+            compress_min_bytes: responses from this size on are compressed,
+                None disables compression
+            timeout: seconds to wait for another process holding the lock
+            clock: returns the current time in seconds since epoch
+            read_only: open the file without ever writing to it, for the
+                stats and inspect methods only
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be a positive number")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be a positive number of seconds")
+
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = version
+        self.compress_min_bytes = compress_min_bytes
+        self.timeout = timeout
+        self._clock = clock
+        self.read_only = read_only
+        self._stats = ResponseCacheStats()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # connections and locks can't be pickled, the copy reconnects
+        state = self.__dict__.copy()
+        state.update(_lock=None, _connection=None, _pid=None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # connections are not shared with forked processes
+        if self._connection is None or self._pid != os.getpid():
+            if self.read_only:
+                connection = sqlite3.connect(
+                    f"file:{quote(os.path.abspath(self.path))}?mode=ro",
+                    timeout=self.timeout,
+                    isolation_level=None,
+                    check_same_thread=False,
+                    uri=True,
+                )
+                _check_format(connection)
+            else:
+                connection = sqlite3.connect(
+                    self.path,
+                    timeout=self.timeout,
+                    isolation_level=None,
+                    check_same_thread=False,
+                )
+                # files that aren't caches of this layout are left untouched
+                self._init_tables(connection)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def _init_tables(connection: sqlite3.Connection) -> None:
+        with _transaction(connection):
+            (format_version,) = connection.execute("PRAGMA user_version").fetchone()
+            if format_version == 0 and not _has_tables(connection):
+                for statement in _CREATE_TABLES:
+                    connection.execute(statement)
+                connection.execute(f"PRAGMA user_version = {_FORMAT_VERSION}")
+                return
+        _check_format(connection)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, compressed, created_at, accessed_at FROM responses "
+                "WHERE key = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+
+            now = self._clock()
+            if row is not None and self.ttl is not None and row[2] + self.ttl <= now:
+                with _transaction(connection):
+                    connection.execute(
+                        "DELETE FROM responses WHERE key = ? AND version = ?",
+                        (key, self.version),
+                    )
+                self._stats.expired += 1
+                row = None
+
+            if row is None:
+                self._stats.misses += 1
+                return None
+
+            if now - row[3] >= _ACCESS_TIME_RESOLUTION:
+                with _transaction(connection):
+                    connection.execute(
+                        "UPDATE responses SET accessed_at = ? "
+                        "WHERE key = ? AND version = ?",
+                        (now, key, self.version),
+                    )
+            self._stats.hits += 1
+
+        value, compressed = row[0], row[1]
+        return (zlib.decompress(value) if compressed else value).decode("utf-8")
+
+    def set(self, key: str, response: str) -> None:
+        value = response.encode("utf-8")
+        compressed = False
+        if (
+            self.compress_min_bytes is not None
+            and len(value) >= self.compress_min_bytes
+        ):
+            compressed_value = zlib.compress(value)
+            if len(compressed_value) < len(value):
+                value, compressed = compressed_value, True
+
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            connection = self._connect()
+            now = self._clock()
+            with _transaction(connection):
+                connection.execute(
+                    "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key, version) DO UPDATE SET value = excluded.value, "
+                    "compressed = excluded.compressed, size = excluded.size, "
+                    "created_at = excluded.created_at, "
+                    "accessed_at = excluded.accessed_at",
+                    (key, self.version, value, compressed, size, now, now),
+                )
+                (total,) = connection.execute("SELECT size FROM totals").fetchone()
+                if total > self.max_bytes:
+                    self._stats.evicted += _evict(
+                        connection, int(self.max_bytes * _EVICTION_LOW_WATERMARK)
+                    )
+
+    def stats(self) -> ResponseCacheStats:
+        with self._lock:
+            entries, size = (
+                self._connect().execute("SELECT entries, size FROM totals").fetchone()
+            )
+            return self._stats.model_copy(
+                update={"entries": entries, "size_bytes": size}
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            connection = self._connect()
+            with _transaction(connection):
+                connection.execute("DELETE FROM responses")
+            self._stats = ResponseCacheStats()
+
+    def prune(
+        self,
+        max_bytes: Optional[int] = None,
+        older_than: Optional[float] = None,
+        other_versions: bool = False,
+    ) -> int:
+        """Deletes entries, returns how many
+        Args:
+            max_bytes: evict the least recently used entries down to this size
+            older_than: delete the entries not accessed for this many seconds
+            other_versions: delete the entries of other versions
+        """
+        with self._lock:
+            connection = self._connect()
+            deleted = 0
+            with _transaction(connection):
+                if other_versions:
+                    deleted += connection.execute(
+                        "DELETE FROM responses WHERE version != ?", (self.version,)
+                    ).rowcount
+                if older_than is not None:
+                    deleted += connection.execute(
+                        "DELETE FROM responses WHERE accessed_at < ?",
+                        (self._clock() - older_than,),
+                    ).rowcount
+                if max_bytes is not None:
+                    deleted += _evict(connection, max_bytes)
+            return deleted
+
+    def inspect(self) -> CacheInspection:
+        """Reports the content of the database file"""
+        with self._lock:
+            connection = self._connect()
+            entries, size = connection.execute(
+                "SELECT entries, size FROM totals"
+            ).fetchone()
+            oldest, newest = connection.execute(
+                "SELECT MIN(accessed_at), MAX(accessed_at) FROM responses"
+            ).fetchone()
+            versions = [
+                VersionUsage(version=version, entries=count, size_bytes=total)
+                for version, count, total in connection.execute(
+                    "SELECT version, COUNT(*), SUM(size) FROM responses "
+                    "GROUP BY version ORDER BY version"
+                )
+            ]
+
+        file_bytes = sum(
+            os.path.getsize(path)
+            for path in (self.path, f"{self.path}-wal")
+            if os.path.exists(path)
+        )
+        return CacheInspection(
+            path=self.path,
+            file_bytes=file_bytes,
+            entries=entries,
+            size_bytes=size,
+            versions=versions,
+            oldest_access=oldest,
+            newest_access=newest,
+        )
+
+    def vacuum(self) -> None:
+        """Gives the space of the deleted entries back to the file system"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("VACUUM")
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+            self._pid = None
+
+
+def _has_tables(connection: sqlite3.Connection) -> bool:
+    (tables,) = connection.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'"
+    ).fetchone()
+    return tables > 0
+
+
+def _check_format(connection: sqlite3.Connection) -> None:
+    (format_version,) = connection.execute("PRAGMA user_version").fetchone()
+    if format_version != _FORMAT_VERSION:
+        connection.close()
+        raise CacheFormatError(
+            f"Response cache of format {format_version}, expected "
+            f"{_FORMAT_VERSION}. Delete the file to start a new cache."
+        )
+
+
+@contextmanager
+def _transaction(connection: sqlite3.Connection) -> Iterator[None]:
+    # takes the write lock upfront, so that concurrent writers wait on the
+    # busy timeout rather than failing to upgrade a read lock
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def _evict(connection: sqlite3.Connection, max_bytes: int) -> int:
+    """Deletes the least recently used entries until the size of the cache
+    is at most max_bytes, returns how many"""
+    (total,) = connection.execute("SELECT size FROM totals").fetchone()
+    evicted = 0
+    while total > max_bytes:
+        rows = connection.execute(
+            "SELECT key, version, size FROM responses ORDER BY accessed_at LIMIT 64"
+        ).fetchall()
+        if not rows:
+            break
+        for key, version, size in rows:
+            if total <= max_bytes:
+                break
+            connection.execute(
+                "DELETE FROM responses WHERE key = ? AND version = ?", (key, version)
+            )
+            total -= size
+            evicted += 1
+    return evicted
@@ -5,10 +5,23 @@ from .imperative import (
     ImperativeIOMapper,
     ImperativeIOMapperInput,
     ImperativeIOMapperOutput,
+    ResultMode,
 )
+from .parallel import ProcessPoolBatchExecutor
+from .plan import MappingPlan, compile_field_mapping
+from .stream import JsonLinesStats, map_json_lines
+from .synthesis import MappingSynthesizer, SynthesisStats
 
 __all__ = [
     "ImperativeIOMapper",
     "ImperativeIOMapperInput",
     "ImperativeIOMapperOutput",
+    "ResultMode",
+    "MappingPlan",
+    "compile_field_mapping",
+    "JsonLinesStats",
+    "map_json_lines",
+    "ProcessPoolBatchExecutor",
+    "MappingSynthesizer",
+    "SynthesisStats",
 ]
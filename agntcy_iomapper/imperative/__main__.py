@@ -0,0 +1,114 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Maps JSON Lines records with an imperative field mapping.
+
+Example:
+    python -m agntcy_iomapper.imperative \\
+        --field-mapping mapping.json \\
+        --input-schema input_schema.json \\
+        --output-schema output_schema.json \\
+        records.jsonl -o mapped.jsonl
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Optional
+
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import ArgumentsDescription
+from agntcy_iomapper.imperative.imperative import (
+    ImperativeIOMapper,
+    ImperativeIOMapperInput,
+)
+from agntcy_iomapper.imperative.stream import map_json_lines
+
+
+def _load_json(path: Optional[str]) -> Any:
+    if path is None:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_args(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m agntcy_iomapper.imperative",
+        description="Map JSON Lines records with an imperative field mapping. "
+        "Exits with status 1 when some records could not be mapped.",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="JSON Lines file to read, '-' or no value reads stdin",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="JSON Lines file to write, '-' or no value writes stdout",
+    )
+    parser.add_argument(
+        "-m",
+        "--field-mapping",
+        required=True,
+        help="JSON file holding the field mapping, output paths to JSONPath",
+    )
+    parser.add_argument("--input-schema", help="JSON schema file of the records")
+    parser.add_argument("--output-schema", help="JSON schema file of the results")
+    parser.add_argument(
+        "--on-error",
+        choices=["skip", "include", "raise"],
+        default="skip",
+        help="What to do with records that cannot be mapped",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+
+    field_mapping = _load_json(args.field_mapping)
+    input_schema = _load_json(args.input_schema)
+    output_schema = _load_json(args.output_schema)
+
+    mapper = ImperativeIOMapper(
+        input=ImperativeIOMapperInput(
+            input=ArgumentsDescription(
+                json_schema=Schema.model_validate(input_schema)
+                if input_schema is not None
+                else None
+            ),
+            output=ArgumentsDescription(
+                json_schema=Schema.model_validate(output_schema)
+                if output_schema is not None
+                else None
+            ),
+            data=None,
+        ),
+        field_mapping=field_mapping,
+        # records are serialized right after mapping, no need for a copy
+        result_mode="direct",
+    )
+
+    stats = map_json_lines(
+        mapper,
+        source=sys.stdin if args.input == "-" else args.input,
+        sink=sys.stdout if args.output == "-" else args.output,
+        on_error=args.on_error,
+    )
+
+    print(
+        f"{stats.records} records, {stats.mapped} mapped, {stats.errors} errors "
+        f"in {stats.seconds:.3f}s ({stats.records_per_second:.0f} records/s)",
+        file=sys.stderr,
+    )
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
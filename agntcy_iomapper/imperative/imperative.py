@@ -16,13 +16,24 @@ This is particularly useful in scenarios where
 consistent data transformation is required.
 """
 
+import copy
 import json
 import logging
-from typing import Any, Callable, Optional, Union
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Literal,
+    Optional,
+    Union,
+)
 
-import jsonschema
-from jsonpath_ng.ext import parse
+from jsonschema.protocols import Validator
 from langgraph.utils.runnable import RunnableCallable
+from openapi_pydantic import Schema
 
 from agntcy_iomapper.base import (
     BaseIOMapper,
@@ -30,6 +41,15 @@ from agntcy_iomapper.base import (
     BaseIOMapperInput,
     BaseIOMapperOutput,
 )
+from agntcy_iomapper.base.validation import (
+    SampledValidator,
+    format_error,
+    get_validator,
+)
+from agntcy_iomapper.imperative.plan import MappingPlan, compile_field_mapping
+
+if TYPE_CHECKING:
+    from agntcy_iomapper.imperative.parallel import ProcessPoolBatchExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +57,13 @@ logger = logging.getLogger(__name__)
 ImperativeIOMapperInput = BaseIOMapperInput
 ImperativeIOMapperOutput = BaseIOMapperOutput
 
+# How mapped data is handed back to the caller:
+#   json   - serialized and parsed back, the result only holds JSON types
+#   direct - the mapped structure as is, it may share objects with the input
+#   copy   - a deep copy of the mapped structure
+#   freeze - read-only views, dicts become mappingproxy and lists tuples
+ResultMode = Literal["json", "direct", "copy", "freeze"]
+
 
 class ImperativeIOMapper(BaseIOMapper):
 
@@ -45,10 +72,32 @@ class ImperativeIOMapper(BaseIOMapper):
         input: ImperativeIOMapperInput,
         field_mapping: dict[str, Union[str, Callable]],
         config: Optional[BaseIOMapperConfig] = None,
+        result_mode: ResultMode = "json",
     ) -> None:
+        if config is None:
+            # the imperative mapper validates both ends unless told otherwise
+            config = BaseIOMapperConfig(
+                validate_json_input=True, validate_json_output=True
+            )
         super().__init__(config)
+        if result_mode not in _result_finalizers:
+            raise ValueError(f"Unsupported result mode {result_mode}")
+
         self.field_mapping = field_mapping
         self.input = input
+        self.result_mode = result_mode
+
+    @property
+    def field_mapping(self) -> Optional[dict[str, Union[str, Callable]]]:
+        return self._field_mapping
+
+    @field_mapping.setter
+    def field_mapping(self, field_mapping: Optional[dict[str, Union[str, Callable]]]):
+        # compile once, every invocation only evaluates the plan
+        self._field_mapping = field_mapping
+        self.plan: Optional[MappingPlan] = (
+            compile_field_mapping(field_mapping) if field_mapping is not None else None
+        )
 
     def invoke(self, data: any) -> dict:
         _input = self.input if self.input else None
@@ -58,13 +107,24 @@ class ImperativeIOMapper(BaseIOMapper):
         if self.field_mapping is None:
             return _input.data
 
-        data = self._imperative_map(_input)
-        return json.loads(data)
+        return self.map(_input.data)
 
     async def ainvoke(self, state: any) -> dict:
-        return self.invoke()
+        return self.invoke(state)
 
-    def _imperative_map(self, input_definition: ImperativeIOMapperInput) -> Any:
+    def map(self, data: Any) -> Any:
+        """Maps the given data instead of the data of the mapper input.
+
+        The schemas of the mapper input are used for validation and failures
+        are raised, see `map_batch` for a version reporting them instead.
+        """
+        if self.plan is None:
+            return data
+
+        mapped_output = self._imperative_map(data)
+        return _result_finalizers[self.result_mode](mapped_output)
+
+    def _imperative_map(self, data: Any) -> Any:
         """
         Converts input data to a desired output type.
 
@@ -76,64 +136,105 @@ class ImperativeIOMapper(BaseIOMapper):
         The function assumes that the caller provides a valid `input_schema`.
         Unsupported target types should be handled as needed within the function.
         """
-        data = input_definition.data
-        input_schema = input_definition.input.json_schema
-
-        jsonschema.validate(
-            instance=data,
-            schema=input_schema.model_dump(exclude_none=True, mode="json"),
-        )
-
-        mapped_output = {}
-
-        for output_field, json_path_or_func in self.field_mapping.items():
-            if isinstance(json_path_or_func, str):
-                jsonpath_expr = parse(json_path_or_func)
-                match = jsonpath_expr.find(data)
-                expect_value = match[0].value if match else None
-            elif callable(json_path_or_func):
-                expect_value = json_path_or_func(data)
-            else:
-                raise TypeError(
-                    "Mapping values must be strings (JSONPath) or callables (functions)."
-                )
-
-            self._set_jsonpath(mapped_output, output_field, expect_value)
-        jsonschema.validate(
-            instance=mapped_output,
-            schema=input_definition.output.json_schema.model_dump(
-                exclude_none=True, mode="json"
-            ),
-        )
-        # return a serialized version of the object
-        return json.dumps(mapped_output)
+        self.validator.validate_input(data, self.input.input.schema_dict)
+        mapped_output = self.plan.apply(data)
+        self.validator.validate_output(mapped_output, self.input.output.schema_dict)
+        return mapped_output
 
-    def _set_jsonpath(
-        self, data: dict[str, Any], path: str, value: Any
-    ) -> dict[str, Any]:
-        """set value for field based on its json path
+    def map_batch(
+        self,
+        records: Iterable[Any],
+        executor: Optional["ProcessPoolBatchExecutor"] = None,
+    ) -> list[ImperativeIOMapperOutput]:
+        """Maps a batch of records with the mapper field mapping.
         Args:
-            data: Data so far
-            path: the json path
-            value: the value to set the json path to
+            records: the records to be mapped, each one is validated against
+                the input schema and its result against the output schema
+            executor: optional process pool to spread large batches on
         Returns:
-        -----
-        dict[str,Any]
-            The mapped filed with the value
+            One output per record, in the same order as the records. Records
+            that fail carry the failure in `error` instead of raising.
         """
-        copy_data: dict[str, Any] = data
-        # Split the path into parts and remove the leading root
-        parts = path.strip("$.").split(".")
-        # Add value to corresponding path
-        for part in parts[:-1]:
-            if part not in copy_data:
-                copy_data[part] = {}
-
-            copy_data = copy_data[part]
-
-        copy_data[parts[-1]] = value
-
-        return copy_data
+        if executor is not None:
+            return executor.map(self, records)
+        return list(self.imap_batch(records))
+
+    def imap_batch(self, records: Iterable[Any]) -> Iterator[ImperativeIOMapperOutput]:
+        """Lazy version of `map_batch`, results are yielded as records are consumed"""
+        map_record = self.record_mapper()
+        for record in records:
+            yield map_record(record)
+
+    def record_mapper(self) -> Callable[[Any], ImperativeIOMapperOutput]:
+        """Returns a function mapping one record at a time.
+
+        Schemas are resolved to validators once, when the function is created,
+        so the function is meant to be reused for every record of a batch or
+        of a stream. Failures are returned in the output `error` field.
+        """
+        return build_record_mapper(
+            self.plan,
+            self.input.input.schema_dict,
+            self.input.output.schema_dict,
+            self.result_mode,
+            self.validator,
+        )
 
     def as_runnable(self):
         return RunnableCallable(self.invoke, self.ainvoke, name="extract", trace=False)
+
+
+def build_record_mapper(
+    plan: Optional[MappingPlan],
+    input_schema: Optional[Union[Schema, dict[str, Any]]],
+    output_schema: Optional[Union[Schema, dict[str, Any]]],
+    result_mode: ResultMode,
+    validator: SampledValidator,
+) -> Callable[[Any], ImperativeIOMapperOutput]:
+    """Builds the per record mapping function used by batches and streams"""
+    config = validator.config
+    # resolved once for the whole batch, sampling still happens per record
+    input_validator = _get_validator(input_schema, config.validate_json_input)
+    output_validator = _get_validator(output_schema, config.validate_json_output)
+    finalize = _result_finalizers[result_mode]
+
+    def map_record(record: Any) -> ImperativeIOMapperOutput:
+        if plan is None:
+            return ImperativeIOMapperOutput(data=record)
+        try:
+            validator.validate_input(record, input_validator)
+            mapped_output = plan.apply(record)
+            validator.validate_output(mapped_output, output_validator)
+
+            return ImperativeIOMapperOutput(data=finalize(mapped_output))
+        except Exception as e:
+            logger.debug(f"Failed to map record: {e}")
+            return ImperativeIOMapperOutput(error=format_error(e))
+
+    return map_record
+
+
+def _get_validator(
+    schema: Optional[Union[Schema, dict[str, Any]]], enabled: bool
+) -> Optional[Validator]:
+    return get_validator(schema) if enabled and schema is not None else None
+
+
+def _json_round_trip(data: Any) -> Any:
+    return json.loads(json.dumps(data))
+
+
+def _freeze(data: Any) -> Any:
+    if isinstance(data, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in data.items()})
+    elif isinstance(data, (list, tuple)):
+        return tuple(_freeze(v) for v in data)
+    return data
+
+
+_result_finalizers: dict[str, Callable[[Any], Any]] = {
+    "json": _json_round_trip,
+    "direct": lambda data: data,
+    "copy": copy.deepcopy,
+    "freeze": _freeze,
+}
@@ -0,0 +1,179 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Multi-process execution of large imperative batches.
+
+JSONPath evaluation and schema validation are pure Python and bound by the
+GIL, so a batch is split into chunks that are mapped by a pool of worker
+processes. Workers receive the field mapping and the schemas, compile them
+once per process thanks to the plan and validator caches, and send back
+the mapped records. Results keep the order of the input records.
+"""
+
+import logging
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing.context import BaseContext
+from typing import Any, Iterable, Iterator, Optional
+
+from agntcy_iomapper.base import BaseIOMapperConfig
+from agntcy_iomapper.base.validation import SampledValidator, ValidationStats
+from agntcy_iomapper.imperative.imperative import (
+    ImperativeIOMapper,
+    ImperativeIOMapperOutput,
+    ResultMode,
+    _freeze,
+    build_record_mapper,
+)
+from agntcy_iomapper.imperative.plan import MappingPlan
+
+logger = logging.getLogger(__name__)
+
+# the only settings the workers use, the rest of the config, like a response
+# cache holding a lock or a connection, may not be picklable
+_WORKER_CONFIG_FIELDS = {
+    "validate_json_input",
+    "validate_json_output",
+    "validation_policy",
+    "validation_every_n",
+    "validation_sample_rate",
+}
+
+
+class _ChunkMapper:
+    """Picklable description of a mapping, sent to the worker processes"""
+
+    def __init__(
+        self,
+        plan: Optional[MappingPlan],
+        input_schema: Optional[dict[str, Any]],
+        output_schema: Optional[dict[str, Any]],
+        result_mode: ResultMode,
+        config: BaseIOMapperConfig,
+    ) -> None:
+        self.plan = plan
+        self.input_schema = input_schema
+        self.output_schema = output_schema
+        self.result_mode = result_mode
+        self.config = config
+
+    def __call__(
+        self, records: list[Any]
+    ) -> tuple[list[tuple[Any, Optional[str]]], ValidationStats]:
+        # validation is sampled per worker, counters are merged by the caller
+        validator = SampledValidator(self.config)
+        map_record = build_record_mapper(
+            self.plan,
+            self.input_schema,
+            self.output_schema,
+            self.result_mode,
+            validator,
+        )
+        outputs = (map_record(record) for record in records)
+        # plain tuples are cheaper to send back than pydantic models
+        return [(output.data, output.error) for output in outputs], validator.stats
+
+
+def _chunks(records: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ProcessPoolBatchExecutor:
+    """Maps batches of an `ImperativeIOMapper` on a pool of processes.
+
+    The pool is started on first use and reused across batches, use the
+    executor as a context manager or call `shutdown` to stop it.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 1000,
+        min_parallel_records: int = 10000,
+        mp_context: Optional[BaseContext] = None,
+    ) -> None:
+        """
+        Args:
+            max_workers: number of worker processes, defaults to the CPU count
+            chunk_size: number of records sent to a worker at once
+            min_parallel_records: batches smaller than this are mapped in
+                the calling process, where the pool overhead is not worth it
+            mp_context: multiprocessing context used to start the workers
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive number")
+
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.min_parallel_records = min_parallel_records
+        self.mp_context = mp_context
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def map(
+        self, mapper: ImperativeIOMapper, records: Iterable[Any]
+    ) -> list[ImperativeIOMapperOutput]:
+        """Maps the records with the mapper, see `ImperativeIOMapper.map_batch`"""
+        records = records if isinstance(records, list) else list(records)
+
+        if len(records) < self.min_parallel_records:
+            return list(mapper.imap_batch(records))
+
+        chunk_mapper = self._chunk_mapper(mapper)
+        if chunk_mapper is None:
+            return list(mapper.imap_batch(records))
+
+        # map keeps the order of the chunks, hence of the records
+        results = self._get_pool().map(chunk_mapper, _chunks(records, self.chunk_size))
+
+        freeze = mapper.result_mode == "freeze"
+        outputs = []
+        for chunk, validation_stats in results:
+            mapper.validation_stats.merge(validation_stats)
+            for data, error in chunk:
+                if freeze and error is None:
+                    data = _freeze(data)
+                outputs.append(ImperativeIOMapperOutput(data=data, error=error))
+        return outputs
+
+    def _chunk_mapper(self, mapper: ImperativeIOMapper) -> Optional[_ChunkMapper]:
+        chunk_mapper = _ChunkMapper(
+            mapper.plan,
+            mapper.input.input.schema_dict,
+            mapper.input.output.schema_dict,
+            # read-only views can't be pickled, they are built on return
+            "direct" if mapper.result_mode == "freeze" else mapper.result_mode,
+            BaseIOMapperConfig(
+                **mapper.config.model_dump(include=_WORKER_CONFIG_FIELDS)
+            ),
+        )
+
+        try:
+            pickle.dumps(chunk_mapper)
+        except Exception as e:
+            logger.warning(
+                f"Field mapping can't be sent to worker processes, mapping in process: {e}"
+            )
+            return None
+        return chunk_mapper
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=self.mp_context
+            )
+        return self._pool
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def __enter__(self) -> "ProcessPoolBatchExecutor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
@@ -0,0 +1,177 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compiled mapping plans for the imperative I/O mapper.
+
+A `field_mapping` is a dictionary whose keys are dotted paths in the output
+object and whose values are JSONPath expressions (or callables) evaluated
+against the input data. Parsing the JSONPath expressions and splitting the
+target paths is by far the most expensive part of an imperative mapping,
+yet it only depends on the `field_mapping` itself. A `MappingPlan` does that
+work once, so evaluating the mapping is reduced to walking a list of
+pre-parsed steps.
+
+Mappings made of plain dotted paths (`$.a.b.c`) are the common case, for
+those the plan generates a specialized Python function that reads through
+`dict.get` chains and writes through direct dict indexing. Only filters,
+wildcards and extensions are evaluated with `jsonpath_ng`.
+
+Plans are cached by `compile_field_mapping`, so mapper instances created
+with the same `field_mapping` share the same plan.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Optional, Union
+
+from jsonpath_ng import JSONPath
+from jsonpath_ng.ext import parse
+from jsonpath_ng.jsonpath import Child, Fields, Root
+
+logger = logging.getLogger(__name__)
+
+FieldMapping = dict[str, Union[str, Callable]]
+
+_PLAN_CACHE_SIZE = 256
+
+
+def _split_target(path: str) -> tuple[str, ...]:
+    """Splits an output path into its keys, removing the leading root"""
+    return tuple(path.strip("$.").split("."))
+
+
+def _simple_path(expr: JSONPath) -> Optional[tuple[str, ...]]:
+    """Returns the keys of a plain dotted JSONPath or None for anything else"""
+    keys = []
+    while isinstance(expr, Child):
+        if not _is_single_field(expr.right):
+            return None
+        keys.append(expr.right.fields[0])
+        expr = expr.left
+
+    if isinstance(expr, Root):
+        return tuple(reversed(keys))
+    elif _is_single_field(expr):
+        return (expr.fields[0],) + tuple(reversed(keys))
+    return None
+
+
+def _is_single_field(expr: JSONPath) -> bool:
+    return type(expr) is Fields and len(expr.fields) == 1 and expr.fields[0] != "*"
+
+
+class _MappingStep:
+    """A single pre-compiled entry of a field mapping"""
+
+    __slots__ = ("target", "source", "expr", "path", "func")
+
+    def __init__(self, target: str, source: Union[str, Callable]) -> None:
+        self.target = _split_target(target)
+        self.source = source
+        self.expr: Optional[JSONPath] = None
+        self.path: Optional[tuple[str, ...]] = None
+        self.func: Optional[Callable] = None
+
+        if isinstance(source, str):
+            self.expr = parse(source)
+            self.path = _simple_path(self.expr)
+        elif callable(source):
+            self.func = source
+        else:
+            raise TypeError(
+                "Mapping values must be strings (JSONPath) or callables (functions)."
+            )
+
+
+# Sentinel without a `get` method, reading through it raises AttributeError
+_MISSING = object()
+
+
+def _generate_source(steps: tuple[_MappingStep, ...]) -> str:
+    """Generates the source of a function applying the steps in order"""
+    lines = ["def apply(data):", "    mapped_output = {}"]
+
+    for i, step in enumerate(steps):
+        if step.path is not None:
+            # same semantics as jsonpath_ng Fields: read with `get`, anything
+            # missing or not a mapping along the way yields None
+            getters = "".join(f".get({key!r}, _MISSING)" for key in step.path)
+            lines += [
+                "    try:",
+                f"        value = data{getters}",
+                "    except (TypeError, AttributeError):",
+                "        value = None",
+                "    else:",
+                "        if value is _MISSING:",
+                "            value = None",
+            ]
+        elif step.expr is not None:
+            lines += [
+                f"    match = _steps[{i}].expr.find(data)",
+                "    value = match[0].value if match else None",
+            ]
+        else:
+            lines.append(f"    value = _steps[{i}].func(data)")
+
+        setters = "".join(f".setdefault({key!r}, {{}})" for key in step.target[:-1])
+        lines.append(f"    mapped_output{setters}[{step.target[-1]!r}] = value")
+
+    lines.append("    return mapped_output")
+    return "\n".join(lines) + "\n"
+
+
+class MappingPlan:
+    """A `field_mapping` compiled into pre-parsed source expressions and
+    pre-split target paths.
+
+    Plans hold no per-invocation state and can be shared freely between
+    mapper instances.
+    """
+
+    __slots__ = ("field_mapping", "steps", "source", "apply")
+
+    def __init__(self, field_mapping: FieldMapping) -> None:
+        self.field_mapping = dict(field_mapping)
+        self.steps = tuple(
+            _MappingStep(target, source) for target, source in field_mapping.items()
+        )
+        self.source = _generate_source(self.steps)
+
+        namespace = {"_MISSING": _MISSING, "_steps": self.steps}
+        exec(compile(self.source, "<mapping plan>", "exec"), namespace)
+        # apply(data) evaluates the plan against the data and returns a new
+        # dictionary holding the mapped fields
+        self.apply: Callable[[Any], dict[str, Any]] = namespace["apply"]
+
+    def __reduce__(self):
+        # generated code can't be pickled, plans are compiled again on load
+        return (compile_field_mapping, (self.field_mapping,))
+
+    def __repr__(self) -> str:
+        return f"MappingPlan({self.field_mapping!r})"
+
+
+@lru_cache(maxsize=_PLAN_CACHE_SIZE)
+def _compile_cached(items: tuple[tuple[str, Union[str, Callable]], ...]) -> MappingPlan:
+    return MappingPlan(dict(items))
+
+
+def compile_field_mapping(field_mapping: FieldMapping) -> MappingPlan:
+    """Compiles a field mapping into a reusable `MappingPlan`.
+
+    Plans are cached, so compiling the same field mapping twice returns the
+    same plan instance.
+    Args:
+        field_mapping: output paths mapped to JSONPath expressions or callables
+    Returns:
+        The compiled mapping plan
+    """
+    try:
+        return _compile_cached(tuple(field_mapping.items()))
+    except TypeError as e:
+        # unhashable callables can still be compiled, they just can't be shared
+        if "unhashable" not in str(e):
+            raise
+        logger.debug(f"Field mapping is not hashable, plan will not be cached: {e}")
+        return MappingPlan(field_mapping)
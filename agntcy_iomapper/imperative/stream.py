@@ -0,0 +1,111 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Streaming JSON Lines pipeline for the imperative I/O mapper.
+
+Records are read one line at a time, mapped with the compiled field mapping
+of an `ImperativeIOMapper` and written out as soon as they are mapped, so
+memory use does not depend on the size of the input.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import time
+from types import MappingProxyType
+from typing import IO, Any, Iterator, Literal, Union
+
+from pydantic import BaseModel, Field
+
+from agntcy_iomapper.imperative.imperative import ImperativeIOMapper
+
+logger = logging.getLogger(__name__)
+
+JsonLinesSource = Union[str, os.PathLike, IO[str]]
+
+# What to do with records that cannot be mapped:
+#   skip    - log them and carry on, they are only counted
+#   include - write {"error": "..."} lines so output lines match input lines
+#   raise   - stop the stream with a ValueError
+OnError = Literal["skip", "include", "raise"]
+
+
+class JsonLinesStats(BaseModel):
+    records: int = Field(default=0, description="Number of records read")
+    mapped: int = Field(default=0, description="Number of records mapped")
+    errors: int = Field(default=0, description="Number of records that failed")
+    seconds: float = Field(default=0.0, description="Wall time spent streaming")
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds > 0 else 0.0
+
+
+def _json_default(value: Any) -> Any:
+    # the read-only views of the freeze result mode, tuples are already
+    # written as arrays
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    return str(value)
+
+
+@contextlib.contextmanager
+def _open(target: JsonLinesSource, mode: str) -> Iterator[IO[str]]:
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, mode, encoding="utf-8") as f:
+            yield f
+    else:
+        yield target
+
+
+def map_json_lines(
+    mapper: ImperativeIOMapper,
+    source: JsonLinesSource,
+    sink: JsonLinesSource,
+    on_error: OnError = "skip",
+) -> JsonLinesStats:
+    """Maps every JSON line of source and writes the results to sink.
+    Args:
+        mapper: the mapper holding the schemas, field mapping and result mode;
+            the data of its input is ignored
+        source: path or text file-like object to read JSON Lines from
+        sink: path or text file-like object to write JSON Lines to
+        on_error: what to do with records that fail to parse or to map
+    Returns:
+        Counters and throughput of the run
+    """
+    if on_error not in ("skip", "include", "raise"):
+        raise ValueError(f"Unsupported on_error value {on_error}")
+
+    map_record = mapper.record_mapper()
+    stats = JsonLinesStats()
+    start = time.perf_counter()
+
+    with _open(source, "r") as reader, _open(sink, "w") as writer:
+        for line_number, line in enumerate(reader, start=1):
+            if not line.strip():
+                continue
+            stats.records += 1
+
+            try:
+                output = map_record(json.loads(line))
+                error = output.error
+            except json.JSONDecodeError as e:
+                error = f"JSONDecodeError: {e}"
+
+            if error is None:
+                writer.write(json.dumps(output.data, default=_json_default) + "\n")
+                stats.mapped += 1
+                continue
+
+            stats.errors += 1
+            if on_error == "raise":
+                raise ValueError(f"Failed to map line {line_number}: {error}")
+            elif on_error == "include":
+                writer.write(json.dumps({"error": error}) + "\n")
+            logger.warning(f"Failed to map line {line_number}: {error}")
+
+    stats.seconds = time.perf_counter() - start
+    return stats
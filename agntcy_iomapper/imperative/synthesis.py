@@ -0,0 +1,290 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Imperative field mappings synthesized by an LLM.
+
+Structural mappings, where every output field is copied from an input
+field, are the same for every record of a given pair of schemas. The
+`MappingSynthesizer` asks the LLM once per pair of schemas for a
+`field_mapping`, checks it against the outputs of the LLM on the first
+records and, once it reproduced them all, maps the following records with
+the compiled plan. Records the plan fails to map to a valid output are
+still sent to the LLM.
+"""
+
+import json
+import logging
+import threading
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+from pydantic_core import to_jsonable_python
+
+from agntcy_iomapper.base import BaseIOMapper
+from agntcy_iomapper.base.fingerprint import schema_fingerprint
+from agntcy_iomapper.base.models import AgentIOMapperInput, AgentIOMapperOutput
+from agntcy_iomapper.base.prompt import compact_schema, to_prompt_json
+from agntcy_iomapper.base.validation import get_validator
+from agntcy_iomapper.imperative.plan import (
+    FieldMapping,
+    MappingPlan,
+    compile_field_mapping,
+)
+
+logger = logging.getLogger(__name__)
+
+_SYSTEM_PROMPT = (
+    "You write field mappings between JSON documents. A field mapping is a "
+    "JSON object whose keys are the dotted paths of the fields of the output "
+    "document and whose values are the JSONPath expressions selecting their "
+    "value in the input document, for example "
+    '{"customer.name": "$.order.client.full_name"}. Respond with the field '
+    "mapping only."
+)
+
+_USER_PROMPT = (
+    "The input documents follow this JSON schema: {input_schema}. The output "
+    "documents must follow this JSON schema: {output_schema}. Write the field "
+    "mapping filling every output field from the input. If some output field "
+    "can't be copied as is from a single input field, respond with {{}}."
+)
+
+SynthesisStatus = Literal["synthesizing", "verifying", "ready", "rejected"]
+
+
+class SynthesisStats(BaseModel):
+    synthesized: int = Field(default=0, description="Field mappings requested")
+    verified: int = Field(
+        default=0, description="Field mappings that reproduced the LLM outputs"
+    )
+    rejected: int = Field(
+        default=0, description="Field mappings that were invalid or diverged"
+    )
+    imperative: int = Field(default=0, description="Records mapped imperatively")
+    llm: int = Field(default=0, description="Records mapped by the LLM")
+    fallbacks: int = Field(
+        default=0,
+        description="Records the field mapping failed to map, sent to the LLM",
+    )
+
+
+class _Synthesis:
+    """Field mapping of one pair of schemas and its verification state"""
+
+    __slots__ = ("status", "plan", "verified")
+
+    def __init__(self) -> None:
+        self.status: SynthesisStatus = "synthesizing"
+        self.plan: Optional[MappingPlan] = None
+        self.verified = 0
+
+
+def _without_nulls(value: Any) -> Any:
+    # absent fields and null fields are the same to the comparison
+    if isinstance(value, dict):
+        return {k: _without_nulls(v) for k, v in value.items() if v is not None}
+    elif isinstance(value, list):
+        return [_without_nulls(v) for v in value]
+    return value
+
+
+class MappingSynthesizer:
+    """Maps inputs with an LLM mapper until a field mapping it synthesized
+    is verified for their schemas, imperatively afterwards.
+
+    Inputs without both an input and an output JSON schema, or with their
+    own message template, are always mapped by the LLM. The descriptions in
+    the schemas tell the LLM which fields to use, schemas that only differ
+    by them get field mappings of their own.
+    """
+
+    def __init__(self, llm_mapper: BaseIOMapper, verify_samples: int = 3) -> None:
+        """
+        Args:
+            llm_mapper: the mapper the field mappings and the verification
+                outputs are asked to
+            verify_samples: number of LLM outputs a field mapping must
+                reproduce before it is used
+        """
+        if verify_samples < 1:
+            raise ValueError("verify_samples must be a positive number")
+        self.llm_mapper = llm_mapper
+        self.verify_samples = verify_samples
+        self.stats = SynthesisStats()
+        self._syntheses: dict[tuple[str, str], _Synthesis] = {}
+        self._lock = threading.Lock()
+
+    def field_mapping(self, input: AgentIOMapperInput) -> Optional[FieldMapping]:
+        """Returns the verified field mapping of the input schemas, if any"""
+        synthesis = self._syntheses.get(self._key(input))
+        if synthesis is None or synthesis.status != "ready":
+            return None
+        return synthesis.plan.field_mapping
+
+    def map(self, input: AgentIOMapperInput, **kwargs) -> AgentIOMapperOutput:
+        """Maps the input data, kwargs are passed to the LLM mapper"""
+        # validated once, like on the LLM path, whichever path maps it
+        self.llm_mapper._validate_input(input)
+        synthesis, claimed = self._get_synthesis(input)
+        if synthesis is not None and synthesis.status == "ready":
+            output = self._apply(synthesis, input)
+            if output is not None:
+                return output
+
+        if claimed:
+            try:
+                response = self.llm_mapper.invoke(
+                    input, messages=self._messages(input), **kwargs
+                )
+            except Exception as e:
+                response = None
+                logger.warning(f"Field mapping synthesis failed: {e}")
+            self._set_field_mapping(synthesis, response)
+
+        output = self.llm_mapper._invoke_validated(input, **kwargs)
+        self._record_llm_output(synthesis, input, output)
+        return output
+
+    async def amap(self, input: AgentIOMapperInput, **kwargs) -> AgentIOMapperOutput:
+        """Async version of `map`"""
+        self.llm_mapper._validate_input(input)
+        synthesis, claimed = self._get_synthesis(input)
+        if synthesis is not None and synthesis.status == "ready":
+            output = self._apply(synthesis, input)
+            if output is not None:
+                return output
+
+        if claimed:
+            try:
+                response = await self.llm_mapper.ainvoke(
+                    input, messages=self._messages(input), **kwargs
+                )
+            except Exception as e:
+                response = None
+                logger.warning(f"Field mapping synthesis failed: {e}")
+            self._set_field_mapping(synthesis, response)
+
+        output = await self.llm_mapper._ainvoke_validated(input, **kwargs)
+        self._record_llm_output(synthesis, input, output)
+        return output
+
+    @staticmethod
+    def _key(input: AgentIOMapperInput) -> Optional[tuple[str, str]]:
+        if (
+            input.input.json_schema is None
+            or input.output.json_schema is None
+            # per input instructions the field mapping can't follow
+            or input.message_template is not None
+        ):
+            return None
+        return (
+            schema_fingerprint(input.input.json_schema),
+            schema_fingerprint(input.output.json_schema),
+        )
+
+    def _get_synthesis(
+        self, input: AgentIOMapperInput
+    ) -> tuple[Optional[_Synthesis], bool]:
+        """Returns the synthesis of the input schemas and whether the caller
+        claimed it, then it must ask for the field mapping"""
+        key = self._key(input)
+        if key is None:
+            return None, False
+
+        with self._lock:
+            synthesis = self._syntheses.get(key)
+            if synthesis is not None:
+                return synthesis, False
+            synthesis = self._syntheses[key] = _Synthesis()
+            self.stats.synthesized += 1
+            return synthesis, True
+
+    @staticmethod
+    def _messages(input: AgentIOMapperInput) -> list[dict[str, str]]:
+        user_prompt = _USER_PROMPT.format(
+            input_schema=to_prompt_json(compact_schema(input.input.json_schema)),
+            output_schema=to_prompt_json(compact_schema(input.output.json_schema)),
+        )
+        return [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _set_field_mapping(self, synthesis: _Synthesis, response: Any) -> None:
+        try:
+            if not isinstance(response, str):
+                raise ValueError(f"unexpected response {response!r}")
+            # the mapping may be wrapped in a JSON markdown block
+            matches = BaseIOMapper._json_search_pattern.findall(response)
+            field_mapping = json.loads(matches[-1] if matches else response)
+            if not isinstance(field_mapping, dict) or not field_mapping:
+                raise ValueError("no field mapping")
+            if not all(isinstance(path, str) for path in field_mapping.values()):
+                raise ValueError("mapping values must be JSONPath expressions")
+            synthesis.plan = compile_field_mapping(field_mapping)
+        except Exception as e:
+            logger.info(f"Rejecting synthesized field mapping: {e}")
+            self._reject(synthesis)
+            return
+        synthesis.status = "verifying"
+
+    def _reject(self, synthesis: _Synthesis) -> None:
+        with self._lock:
+            if synthesis.status != "rejected":
+                synthesis.status = "rejected"
+                self.stats.rejected += 1
+
+    def _map_data(self, synthesis: _Synthesis, input: AgentIOMapperInput) -> Any:
+        """Maps the input data with the field mapping, None when the result
+        is not valid against the output schema"""
+        try:
+            mapped = synthesis.plan.apply(to_jsonable_python(input.data))
+        except Exception as e:
+            logger.debug(f"Synthesized field mapping failed: {e}")
+            return None
+
+        validator = get_validator(input.output.schema_dict)
+        if not validator.is_valid(mapped):
+            return None
+        return mapped
+
+    def _apply(
+        self, synthesis: _Synthesis, input: AgentIOMapperInput
+    ) -> Optional[AgentIOMapperOutput]:
+        mapped = self._map_data(synthesis, input)
+        with self._lock:
+            if mapped is None:
+                self.stats.fallbacks += 1
+                return None
+            self.stats.imperative += 1
+        return AgentIOMapperOutput(data=mapped)
+
+    def _record_llm_output(
+        self,
+        synthesis: Optional[_Synthesis],
+        input: AgentIOMapperInput,
+        output: AgentIOMapperOutput,
+    ) -> None:
+        with self._lock:
+            self.stats.llm += 1
+        if synthesis is None or synthesis.status != "verifying":
+            return
+
+        mapped = self._map_data(synthesis, input)
+        expected = _without_nulls(to_jsonable_python(output.data))
+        if mapped is None or _without_nulls(mapped) != expected:
+            self._reject(synthesis)
+            return
+
+        with self._lock:
+            synthesis.verified += 1
+            if (
+                synthesis.status == "verifying"
+                and synthesis.verified >= self.verify_samples
+            ):
+                synthesis.status = "ready"
+                self.stats.verified += 1
+                logger.info(
+                    f"Mapping with synthesized field mapping {synthesis.plan!r}"
+                )
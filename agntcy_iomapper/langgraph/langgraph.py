@@ -2,11 +2,12 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import logging
-from typing import Any, Optional, Union
+from typing import Any, AsyncIterator, Optional, Sequence, Union
 
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
 from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import get_config_list
 from langgraph.utils.runnable import RunnableCallable
 from pydantic import Field
 
@@ -15,6 +16,7 @@ from agntcy_iomapper.base.models import (
     AgentIOMapperInput,
     AgentIOMapperOutput,
 )
+from agntcy_iomapper.imperative.synthesis import MappingSynthesizer
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,15 @@ class LangGraphIOMapperConfig(BaseIOMapperConfig):
             description="Model to use for translation as LangChain description or model class.",
         ),
     )
+    synthesize_field_mapping: bool = Field(
+        default=False,
+        description="Ask the LLM once per pair of input and output schemas for a field mapping and, once it reproduced the LLM outputs, map imperatively.",
+    )
+    synthesis_verify_samples: int = Field(
+        default=3,
+        ge=1,
+        description="Number of LLM outputs a synthesized field mapping must reproduce before it is used.",
+    )
 
 
 class _LangGraphAgentIOMapper(BaseIOMapper):
@@ -45,6 +56,23 @@ class _LangGraphAgentIOMapper(BaseIOMapper):
         else:
             self.llm = config.llm
 
+    def response_cache_identity(
+        self,
+        input: LangGraphIOMapperInput,
+        *,
+        config: Optional[RunnableConfig] = None,
+        **kwargs,
+    ) -> Optional[tuple[str, Any]]:
+        # models wrapped in runnables don't expose their settings
+        params = getattr(self.llm, "_identifying_params", None)
+        if params is None:
+            return None
+        llm_type = type(self.llm)
+        return (
+            f"{llm_type.__module__}.{llm_type.__qualname__}",
+            {"params": params, "kwargs": kwargs},
+        )
+
     def invoke(
         self,
         input: LangGraphIOMapperInput,
@@ -67,6 +95,18 @@ class _LangGraphAgentIOMapper(BaseIOMapper):
         response = await self.llm.ainvoke(messages, config, **kwargs)
         return response.content
 
+    async def astream(
+        self,
+        input: LangGraphIOMapperInput,
+        messages: list[dict[str, str]],
+        *,
+        config: Optional[RunnableConfig] = None,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        async for chunk in self.llm.astream(messages, config, **kwargs):
+            if isinstance(chunk.content, str):
+                yield chunk.content
+
 
 class LangGraphIOMapper:
     def __init__(
@@ -76,10 +116,18 @@ class LangGraphIOMapper:
     ):
         self._iomapper = _LangGraphAgentIOMapper(config)
         self._input = input
+        self._synthesizer = (
+            MappingSynthesizer(self._iomapper, config.synthesis_verify_samples)
+            if config.synthesize_field_mapping
+            else None
+        )
 
     async def ainvoke(self, state: dict[str, Any], config: RunnableConfig) -> dict:
         input = self._input if self._input else state["input"]
-        response = await self._iomapper._ainvoke(input=input, config=config)
+        if self._synthesizer is not None:
+            response = await self._synthesizer.amap(input, config=config)
+        else:
+            response = await self._iomapper._ainvoke(input=input, config=config)
         if response is not None:
             return response.data
         else:
@@ -87,7 +135,10 @@ class LangGraphIOMapper:
 
     def invoke(self, state: dict[str, Any], config: RunnableConfig) -> dict:
         input = self._input if self._input else state["input"]
-        response = self._iomapper._invoke(input=input, config=config)
+        if self._synthesizer is not None:
+            response = self._synthesizer.map(input, config=config)
+        else:
+            response = self._iomapper._invoke(input=input, config=config)
 
         if response is not None:
             return response.data
@@ -95,4 +146,50 @@ class LangGraphIOMapper:
             return {}
 
     def as_runnable(self):
-        return RunnableCallable(self.invoke, self.ainvoke, name="extract", trace=False)
+        return _LangGraphIOMapperRunnable(
+            self.invoke,
+            self.ainvoke,
+            name="extract",
+            trace=False,
+            max_concurrency=self._iomapper.config.max_concurrency,
+        )
+
+
+class _LangGraphIOMapperRunnable(RunnableCallable):
+    """Runnable of a LangGraphIOMapper, whose batches map at most the
+    max_concurrency of the mapper config at once unless the runnable config
+    sets its own."""
+
+    def __init__(self, *args, max_concurrency: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_concurrency = max_concurrency
+
+    def _get_configs(
+        self,
+        config: Optional[Union[RunnableConfig, Sequence[RunnableConfig]]],
+        length: int,
+    ) -> list[RunnableConfig]:
+        configs = get_config_list(config, length)
+        if self.max_concurrency is not None:
+            for config in configs:
+                config.setdefault("max_concurrency", self.max_concurrency)
+        return configs
+
+    def batch(self, inputs, config=None, **kwargs):
+        return super().batch(inputs, self._get_configs(config, len(inputs)), **kwargs)
+
+    async def abatch(self, inputs, config=None, **kwargs):
+        return await super().abatch(
+            inputs, self._get_configs(config, len(inputs)), **kwargs
+        )
+
+    def batch_as_completed(self, inputs, config=None, **kwargs):
+        yield from super().batch_as_completed(
+            inputs, self._get_configs(config, len(inputs)), **kwargs
+        )
+
+    async def abatch_as_completed(self, inputs, config=None, **kwargs):
+        async for result in super().abatch_as_completed(
+            inputs, self._get_configs(config, len(inputs)), **kwargs
+        ):
+            yield result
@@ -52,6 +52,15 @@ class _LLmaIndexAgentIOMapper(BaseIOMapper):
         else:
             self.llm = config.llm
 
+    def response_cache_identity(
+        self, input: AgentIOMapperInput, **kwargs
+    ) -> Optional[tuple[str, Any]]:
+        llm_type = type(self.llm)
+        return (
+            f"{llm_type.__module__}.{llm_type.__qualname__}",
+            {"llm": self.llm.to_dict(), "kwargs": kwargs},
+        )
+
     def invoke(
         self,
         input: AgentIOMapperInput,
@@ -155,6 +155,28 @@ class PydanticAIIOAgentIOMapper(BaseIOMapper):
         else:
             return self.config.default_model_settings[model_name]
 
+    def response_cache_identity(
+        self, input: PydanticAIAgentIOMapperInput, **kwargs
+    ) -> Optional[tuple[str, Any]]:
+        if hasattr(input, "model") and input.model is not None:
+            model_name = input.model
+        else:
+            model_name = self.config.default_model
+
+        # credentials don't change the responses, tokens are rotated
+        model_args = {
+            name: value
+            for name, value in self.config.models.get(model_name, {}).items()
+            if name != "azure_ad_token"
+        }
+        return (
+            model_name,
+            {
+                "model_args": model_args,
+                "model_settings": self._get_model_settings(input),
+            },
+        )
+
     def _get_agent(
         self, input: PydanticAIAgentIOMapperInput, system_prompt: str
     ) -> Agent:
@@ -0,0 +1,68 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Counts the prompt tokens spent per record when mapping the records one
+prompt each and with batched prompts, under the default token budget.
+
+Scenarios are the ones of `bench_prompt_tokens`, every record carries the
+data of its scenario. Tokens are counted with tiktoken when it is installed
+and estimated otherwise.
+
+Run from the repository root with:
+    python -m benchmarks.bench_batch_prompts
+"""
+
+from agntcy_iomapper.base import AgentIOMapperInput, BaseIOMapperConfig
+from benchmarks.bench_prompt_tokens import _PromptRenderer, scenarios
+from benchmarks.common import count_tokens, print_table
+
+RECORDS = 50
+
+
+class _BatchRenderer(_PromptRenderer):
+    def render_single(self, input: AgentIOMapperInput) -> str:
+        self._check_jinja_env(False)
+        render_env = self._get_render_env(input)
+        return self.prompt_template.render(render_env) + self.user_template.render(
+            render_env
+        )
+
+    def render_batches(self, inputs: list[AgentIOMapperInput]) -> list[str]:
+        self._check_jinja_env(False)
+        outputs = self._validate_batch_inputs(inputs)
+        return [
+            self.prompt_template.render(render_env)
+            + self.batch_template.render(render_env)
+            for _, render_env in self._iter_batches(inputs, outputs)
+        ]
+
+
+def main() -> None:
+    rows = []
+    for format in ("python", "compact"):
+        renderer = _BatchRenderer(BaseIOMapperConfig(prompt_format=format))
+        for name, input in scenarios().items():
+            inputs = [input] * RECORDS
+            single = count_tokens(renderer.render_single(input))
+            batches = renderer.render_batches(inputs)
+            batched = sum(count_tokens(prompt) for prompt in batches) / RECORDS
+            rows.append(
+                [
+                    name,
+                    format,
+                    single,
+                    f"{batched:.0f}",
+                    len(batches),
+                    f"{1 - batched / single:.0%}",
+                ]
+            )
+
+    print_table(
+        ["mapping", "prompt format", "single", "batched", "batches", "saved"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
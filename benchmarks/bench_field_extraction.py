@@ -0,0 +1,115 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compares the compiled field extractors behind `extract_nested_fields` with
+the per segment walk they replaced, on dict and Pydantic states.
+
+Run from the repository root with:
+    python -m benchmarks.bench_field_extraction
+"""
+
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from agntcy_iomapper.base.utils import compile_field_extractor, extract_nested_fields
+from benchmarks.common import print_table, timeit
+
+FIELD_COUNTS = [1, 10, 50]
+
+
+def walk_nested_value(data: Any, field_path: str) -> Optional[Any]:
+    current = data
+    for part in field_path.split("."):
+        if isinstance(current, dict):
+            current = current[part]
+        elif isinstance(current, list) and part.isdigit():
+            current = current[int(part)]
+        elif hasattr(current, part):
+            current = getattr(current, part)
+        else:
+            current = None
+    return current
+
+
+def walk_nested_fields(data: Any, fields: list[str]) -> dict:
+    results = {}
+    for field_path in fields:
+        try:
+            results[field_path] = walk_nested_value(data, field_path)
+        except (KeyError, TypeError, AttributeError, ValueError):
+            pass
+    return results
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+
+
+class Person(BaseModel):
+    name: str
+    addresses: list[Address]
+
+
+class State(BaseModel):
+    people: list[Person]
+    query: str
+
+
+def make_state(field_count: int) -> tuple[State, list[str]]:
+    people = [
+        Person(
+            name=f"person {i}",
+            addresses=[Address(street=f"{i} Elm St", city="Springfield")],
+        )
+        for i in range(field_count)
+    ]
+    fields = [f"people.{i}.addresses.0.city" for i in range(field_count)]
+    return State(people=people, query="q"), fields
+
+
+def main() -> None:
+    rows = []
+    for field_count in FIELD_COUNTS:
+        model_state, fields = make_state(field_count)
+        states = {"dict": model_state.model_dump(), "pydantic": model_state}
+
+        for kind, state in states.items():
+            assert walk_nested_fields(state, fields) == extract_nested_fields(
+                state, fields
+            )
+            extract = compile_field_extractor(fields)
+
+            walk = timeit(lambda: walk_nested_fields(state, fields), number=1000)
+            cached = timeit(lambda: extract_nested_fields(state, fields), number=1000)
+            compiled = timeit(lambda: extract(state), number=1000)
+            rows.append(
+                [
+                    kind,
+                    field_count,
+                    walk * 1e6,
+                    cached * 1e6,
+                    compiled * 1e6,
+                    f"{walk / compiled:.1f}x",
+                ]
+            )
+
+    # extract_nested_fields looks the extractor up on every call, the hot
+    # paths compile it once and call it directly
+    print_table(
+        [
+            "state",
+            "fields",
+            "walk us",
+            "extract_nested_fields us",
+            "compiled us",
+            "speedup",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Measures how imperative batches scale on a process pool.
+
+Run from the repository root with:
+    python -m benchmarks.bench_imperative_parallel
+"""
+
+import os
+
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import ArgumentsDescription
+from agntcy_iomapper.imperative import (
+    ImperativeIOMapper,
+    ImperativeIOMapperInput,
+    ProcessPoolBatchExecutor,
+)
+from benchmarks.common import print_table, timeit
+
+RECORDS = 50_000
+
+input_schema = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "email": {"type": "string"},
+        "orders": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "total": {"type": "number"},
+                },
+            },
+        },
+    },
+    "required": ["name", "email", "orders"],
+}
+output_schema = {
+    "type": "object",
+    "properties": {
+        "customer": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "email": {"type": "string"},
+            },
+        },
+        "first_order": {"type": "integer"},
+        "first_large_order": {"type": "integer"},
+    },
+}
+field_mapping = {
+    "customer.name": "$.name",
+    "customer.email": "$.email",
+    "first_order": "$.orders[0].id",
+    "first_large_order": "$.orders[?(@.total > 50)].id",
+}
+
+
+def main() -> None:
+    records = [
+        {
+            "name": f"user {i}",
+            "email": f"user{i}@example.com",
+            "orders": [{"id": j, "total": j * 10.0} for j in range(10)],
+        }
+        for i in range(RECORDS)
+    ]
+    mapper = ImperativeIOMapper(
+        input=ImperativeIOMapperInput(
+            input=ArgumentsDescription(json_schema=Schema.model_validate(input_schema)),
+            output=ArgumentsDescription(
+                json_schema=Schema.model_validate(output_schema)
+            ),
+            data=None,
+        ),
+        field_mapping=field_mapping,
+        result_mode="direct",
+    )
+
+    baseline = timeit(lambda: mapper.map_batch(records), repeat=3)
+    rows = [["in process", baseline, RECORDS / baseline, "1.0x"]]
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with ProcessPoolBatchExecutor(
+            max_workers=workers, chunk_size=2000, min_parallel_records=0
+        ) as executor:
+            # warm the pool up, workers are started on first use
+            mapper.map_batch(records[:workers], executor=executor)
+            seconds = timeit(
+                lambda: mapper.map_batch(records, executor=executor), repeat=3
+            )
+        rows.append(
+            [
+                f"{workers} workers",
+                seconds,
+                RECORDS / seconds,
+                f"{baseline / seconds:.1f}x",
+            ]
+        )
+        workers *= 2
+
+    print(f"{RECORDS} records")
+    print_table(["execution", "seconds", "records / s", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
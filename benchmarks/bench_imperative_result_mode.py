@@ -0,0 +1,72 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compares the result modes of the ImperativeIOMapper on large payloads.
+
+The default `json` mode serializes the mapped data and parses it back, the
+other modes skip that round trip.
+
+Run from the repository root with:
+    python -m benchmarks.bench_imperative_result_mode
+"""
+
+import json
+
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import ArgumentsDescription
+from agntcy_iomapper.imperative import ImperativeIOMapper, ImperativeIOMapperInput
+from benchmarks.common import print_table, timeit
+
+RESULT_MODES = ["json", "direct", "copy", "freeze"]
+PAYLOAD_SIZES_MB = [1, 4, 16]
+
+
+def make_payload(size_mb: int) -> dict:
+    record = {
+        "id": 0,
+        "name": "John Doe",
+        "email": "john.doe@example.com",
+        "address": {"street": "123 Elm St", "city": "Springfield"},
+        "tags": ["customer", "newsletter"],
+    }
+    record_size = len(json.dumps(record))
+    count = size_mb * 1024 * 1024 // record_size
+
+    return {
+        "batch": "bench",
+        "records": [dict(record, id=i) for i in range(count)],
+    }
+
+
+def main() -> None:
+    # permissive schemas, the benchmark is about the result handling
+    schema = Schema(type="object")
+    field_mapping = {"name": "$.batch", "data.records": "$.records"}
+
+    rows = []
+    for size_mb in PAYLOAD_SIZES_MB:
+        payload = make_payload(size_mb)
+        input = ImperativeIOMapperInput(
+            input=ArgumentsDescription(json_schema=schema),
+            output=ArgumentsDescription(json_schema=schema),
+            data=payload,
+        )
+
+        baseline = None
+        for result_mode in RESULT_MODES:
+            mapper = ImperativeIOMapper(
+                input=input, field_mapping=field_mapping, result_mode=result_mode
+            )
+            seconds = timeit(lambda: mapper.invoke(data=None), repeat=5)
+            baseline = baseline or seconds
+            rows.append(
+                [size_mb, result_mode, seconds * 1000, f"{baseline / seconds:.1f}x"]
+            )
+
+    print_table(["payload MB", "result mode", "ms / invoke", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
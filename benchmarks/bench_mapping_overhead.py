@@ -0,0 +1,49 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Measures the work done on every LLM mapping besides the LLM call: building
+the mapper input from JSON schemas, rendering the user prompt and
+validating the data, for schemas of growing size. Rendering and validation
+include building the input.
+
+Run from the repository root with:
+    python -m benchmarks.bench_mapping_overhead
+"""
+
+from agntcy_iomapper.base import AgentIOMapperInput, ArgumentsDescription
+from benchmarks.bench_prompt_tokens import _PromptRenderer
+from benchmarks.bench_schema import Scenario, make_data, make_schema
+from benchmarks.common import print_table, timeit
+
+SCENARIOS = [Scenario(depth=2, breadth=breadth, defs=0) for breadth in (4, 32, 128)]
+
+
+def main() -> None:
+    rows = []
+    for scenario in SCENARIOS:
+        schema = make_schema(scenario)
+        data = make_data(scenario)
+
+        def make_input() -> AgentIOMapperInput:
+            return AgentIOMapperInput(
+                input=ArgumentsDescription(json_schema=schema),
+                output=ArgumentsDescription(json_schema=schema),
+                data=data,
+            )
+
+        renderer = _PromptRenderer()
+        functions = {
+            "build input": make_input,
+            "render prompt": lambda: renderer.render(make_input()),
+            "validate input": lambda: renderer._validate_input(make_input()),
+        }
+        for name, func in functions.items():
+            func()
+            rows.append([scenario.breadth, name, timeit(func, number=100) * 1e6])
+
+    print_table(["breadth", "step", "us"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Counts the tokens of the user prompt rendered with the default message
+template in the python and compact prompt formats.
+
+The mappings go from the output of one agent of `tests/data/manifests` to
+the input of another, plus a Pydantic state whose schema carries `$defs`,
+titles and defaults. Tokens are counted with tiktoken when it is installed
+and estimated otherwise.
+
+Run from the repository root with:
+    python -m benchmarks.bench_prompt_tokens
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Optional
+
+from openapi_pydantic import Schema
+from pydantic import BaseModel, Field
+
+from agntcy_iomapper.base import (
+    AgentIOMapperInput,
+    ArgumentsDescription,
+    BaseIOMapper,
+    BaseIOMapperConfig,
+)
+from benchmarks.common import count_tokens, print_table
+
+MANIFESTS = Path(__file__).parent.parent / "tests" / "data" / "manifests"
+
+CONFIGS = {
+    "python": BaseIOMapperConfig(),
+    "compact": BaseIOMapperConfig(prompt_format="compact"),
+    "compact, stripped": BaseIOMapperConfig(
+        prompt_format="compact", prompt_strip_titles=True, prompt_strip_defaults=True
+    ),
+}
+
+
+class _PromptRenderer(BaseIOMapper):
+    def render(self, input: AgentIOMapperInput) -> str:
+        self._check_jinja_env(False)
+        return self.user_template.render(self._get_render_env(input))
+
+    def invoke(self, input, messages, **kwargs) -> str:
+        raise NotImplementedError
+
+    async def ainvoke(self, input, messages, **kwargs) -> str:
+        raise NotImplementedError
+
+
+class Address(BaseModel):
+    street: str = Field(description="Street and number")
+    city: str = Field(default="Paris", description="City name")
+    country: str = Field(default="France")
+
+
+class Contact(BaseModel):
+    name: str
+    email: Optional[str] = None
+    address: Optional[Address] = None
+
+
+class Attachment(BaseModel):
+    filename: str
+    size: int = 0
+
+
+class MailState(BaseModel):
+    sender: Contact
+    recipients: list[Contact] = []
+    subject: str = ""
+    body: str = ""
+    # defined in the schema, not referenced by the projected one
+    attachments: list[Attachment] = []
+
+
+def manifest(name: str) -> dict[str, Any]:
+    return json.loads((MANIFESTS / f"agent_{name}.json").read_text())
+
+
+def scenarios() -> dict[str, AgentIOMapperInput]:
+    mailwriter = manifest("mailwriter")
+    mailreviewer = manifest("mailreviewer")
+
+    state_schema = MailState.model_json_schema()
+    state = MailState(
+        sender=Contact(name="Ann", address=Address(street="1 rue de Rivoli")),
+        recipients=[Contact(name="Bob", email="bob@example.com")],
+        subject="Quarterly report",
+        body="Please find the quarterly report attached.",
+    )
+    # the attachments are not mapped, their definition is left unused
+    state_schema["properties"].pop("attachments")
+
+    return {
+        "mailwriter -> mailreviewer": AgentIOMapperInput(
+            input=ArgumentsDescription(
+                description="Agent that writes emails", agent_manifest=mailwriter
+            ),
+            output=ArgumentsDescription(
+                description="Agent that reviews emails", agent_manifest=mailreviewer
+            ),
+            data={
+                "messages": [
+                    {"type": "assistant", "final_email": "Dear team, ..."},
+                ],
+                "is_completed": True,
+            },
+        ),
+        "mailreviewer -> mailwriter": AgentIOMapperInput(
+            input=ArgumentsDescription(
+                description="Agent that reviews emails", agent_manifest=mailreviewer
+            ),
+            output=ArgumentsDescription(
+                description="Agent that writes emails", agent_manifest=mailwriter
+            ),
+            data={"correct": False, "corrected_email": "Dear team, ..."},
+        ),
+        "state -> mailreviewer": AgentIOMapperInput(
+            input=ArgumentsDescription(json_schema=Schema.model_validate(state_schema)),
+            output=ArgumentsDescription(
+                description="Agent that reviews emails", agent_manifest=mailreviewer
+            ),
+            data=state.model_dump(exclude={"attachments"}),
+        ),
+    }
+
+
+def main() -> None:
+    rows = []
+    for name, input in scenarios().items():
+        tokens = {
+            format: count_tokens(_PromptRenderer(config).render(input))
+            for format, config in CONFIGS.items()
+        }
+        baseline = tokens["python"]
+        for format, count in tokens.items():
+            rows.append([name, format, count, f"{1 - count / baseline:.0%}"])
+
+    print_table(["mapping", "prompt format", "tokens", "saved"], rows)
+
+
+if __name__ == "__main__":
+    main()
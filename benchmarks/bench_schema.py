@@ -0,0 +1,132 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Measures schema projection and field extraction on synthetic schemas.
+
+Each scenario varies one of the depth, the breadth, the number of `$defs`,
+the anyOf fan-out of the schema or the number of json paths, the others
+keep their default. Wall time and peak memory (tracemalloc) are reported
+for `create_type_from_schema`, `get_io_types` with a cold and a warm
+projection cache, and `extract_nested_fields`. Everything is generated
+locally, the suite runs offline.
+
+Run from the repository root with:
+    python -m benchmarks.bench_schema
+"""
+
+import itertools
+from typing import Any, NamedTuple
+
+from agntcy_iomapper.base import IOMappingAgentMetadata, clear_projection_cache
+from agntcy_iomapper.base.utils import (
+    create_type_from_schema,
+    extract_nested_fields,
+    get_io_types,
+)
+from benchmarks.common import peak_memory, print_table, timeit
+
+
+class Scenario(NamedTuple):
+    depth: int = 3
+    breadth: int = 6
+    # definitions besides the ones of the object levels, never referenced
+    defs: int = 10
+    any_of: int = 1
+    paths: int = 10
+
+
+SCENARIOS = (
+    [Scenario(depth=depth) for depth in (2, 4, 6)]
+    + [Scenario(breadth=breadth) for breadth in (4, 16, 32)]
+    + [Scenario(defs=defs) for defs in (100, 1000)]
+    + [Scenario(any_of=any_of) for any_of in (2, 4)]
+    + [Scenario(depth=4, paths=paths) for paths in (1, 100, 500)]
+)
+
+
+def make_schema(scenario: Scenario) -> dict:
+    """Object levels are definitions, each property of a level references
+    the next level, or an anyOf of its variants and null"""
+    defs = {}
+    for level in range(scenario.depth):
+        for variant in range(scenario.any_of):
+            if level == scenario.depth - 1:
+                child = {"type": "string"}
+            elif scenario.any_of == 1:
+                child = {"$ref": f"#/$defs/Level{level + 1}_0"}
+            else:
+                child = {
+                    "anyOf": [
+                        {"$ref": f"#/$defs/Level{level + 1}_{v}"}
+                        for v in range(scenario.any_of)
+                    ]
+                    + [{"type": "null"}]
+                }
+            defs[f"Level{level}_{variant}"] = {
+                "type": "object",
+                "title": f"Level{level}_{variant}",
+                "properties": {f"f{i}": child for i in range(scenario.breadth)},
+            }
+
+    for i in range(scenario.defs):
+        defs[f"Unused{i}"] = {
+            "type": "object",
+            "properties": {"value": {"type": "string"}},
+        }
+
+    return {**defs["Level0_0"], "$defs": defs}
+
+
+def make_data(scenario: Scenario, level: int = 0) -> Any:
+    if level == scenario.depth:
+        return "value"
+    return {f"f{i}": make_data(scenario, level + 1) for i in range(scenario.breadth)}
+
+
+def make_paths(scenario: Scenario) -> list[str]:
+    leaves = itertools.product(
+        *[[f"f{i}" for i in range(scenario.breadth)]] * scenario.depth
+    )
+    return [".".join(leaf) for leaf in itertools.islice(leaves, scenario.paths)]
+
+
+def main() -> None:
+    rows = []
+    for scenario in SCENARIOS:
+        schema = make_schema(scenario)
+        data = make_data(scenario)
+        paths = make_paths(scenario)
+        metadata = IOMappingAgentMetadata(
+            input_fields=paths,
+            output_fields=paths,
+            input_schema=schema,
+            output_schema=schema,
+        )
+
+        def get_io_types_cold():
+            clear_projection_cache()
+            get_io_types(data, metadata)
+
+        functions = {
+            "create_type_from_schema": lambda: create_type_from_schema(schema, paths),
+            "get_io_types (cold)": get_io_types_cold,
+            "get_io_types (warm)": lambda: get_io_types(data, metadata),
+            "extract_nested_fields": lambda: extract_nested_fields(data, paths),
+        }
+        for name, func in functions.items():
+            func()
+            rows.append(
+                [
+                    *scenario,
+                    name,
+                    timeit(func, repeat=5) * 1000,
+                    peak_memory(func) / 1024,
+                ]
+            )
+
+    print_table([*Scenario._fields, "function", "ms", "peak KiB"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Measures the $ref resolution of `create_type_from_schema` on schemas with
+hundreds of `$defs`.
+
+The `jsonref flatten` column is what projecting used to cost before the
+first path was even looked at: the whole schema serialized and loaded with
+jsonref, then the selected field copied. `create_type_from_schema` only
+resolves the definitions reachable from the selected fields.
+
+Run from the repository root with:
+    python -m benchmarks.bench_schema_refs
+"""
+
+import copy
+import json
+
+import jsonref
+
+from agntcy_iomapper.base.utils import create_type_from_schema
+from benchmarks.common import print_table, timeit
+
+DEFS_COUNTS = [100, 300, 1000]
+# definitions reference each other as a tree with this fan-out
+FAN_OUT = 3
+
+
+def make_schema(defs_count: int) -> dict:
+    defs = {}
+    for i in range(defs_count):
+        properties = {f"field_{j}": {"type": "string"} for j in range(8)}
+        for j in range(1, FAN_OUT + 1):
+            child = i * FAN_OUT + j
+            if child < defs_count:
+                properties[f"child_{j}"] = {"$ref": f"#/$defs/Model{child}"}
+        defs[f"Model{i}"] = {
+            "type": "object",
+            "title": f"Model{i}",
+            "properties": properties,
+        }
+
+    return {
+        "type": "object",
+        "properties": {
+            f"model_{i}": {"$ref": f"#/$defs/Model{i}"} for i in range(defs_count)
+        },
+        "$defs": defs,
+    }
+
+
+def jsonref_flatten(schema: dict, fields: list[str]) -> dict:
+    flatten_json = jsonref.loads(json.dumps(schema))
+    properties = flatten_json["properties"]
+    return {field: copy.deepcopy(properties[field.split(".")[0]]) for field in fields}
+
+
+def main() -> None:
+    rows = []
+    for defs_count in DEFS_COUNTS:
+        schema = make_schema(defs_count)
+        # a handful of fields deep in the schema, as in the mapping metadata
+        fields = [f"model_{defs_count // 2}", f"model_{defs_count - 1}.field_0"]
+
+        baseline = timeit(lambda: jsonref_flatten(schema, fields), repeat=5)
+        targeted = timeit(lambda: create_type_from_schema(schema, fields), repeat=5)
+        rows.append(
+            [
+                defs_count,
+                baseline * 1000,
+                targeted * 1000,
+                f"{baseline / targeted:.1f}x",
+            ]
+        )
+
+    print_table(
+        ["$defs", "jsonref flatten ms", "create_type_from_schema ms", "speedup"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
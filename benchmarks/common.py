@@ -0,0 +1,70 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+"""Helpers shared by the benchmarks, they only depend on the standard library
+and, when it is installed, on tiktoken to count tokens"""
+
+import functools
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable
+
+
+def timeit(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> float:
+    """Returns the median wall time in seconds of one call to func"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return statistics.median(timings)
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    """Returns the peak memory in bytes allocated during one call to func"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def count_tokens(text: str) -> int:
+    """Returns the number of tokens of the text with the cl100k_base encoding,
+    or an estimate of 4 characters per token when tiktoken or its encoding
+    files are not available"""
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+@functools.cache
+def _get_encoding() -> Any:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def print_table(headers: list[str], rows: list[list[Any]]) -> None:
+    """Prints rows as a plain text table"""
+    cells = [headers] + [[_format_cell(c) for c in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+
+    for i, row in enumerate(cells):
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+        if i == 0:
+            print("  ".join("-" * width for width in widths))
+
+
+def _format_cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
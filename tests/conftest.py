@@ -1,10 +1,14 @@
 # Copyright AGNTCY Contributors (https://github.com/agntcy)
 # SPDX-License-Identifier: Apache-2.0
 
+from typing import Any, Optional
+
 import pytest
 from dotenv import find_dotenv, load_dotenv
+from langchain_core.language_models import FakeListChatModel
 from langchain_openai.chat_models.azure import AzureChatOpenAI
 
+from agntcy_iomapper.base import AgentIOMapperInput, ArgumentsDescription
 from agntcy_iomapper.langgraph import LangGraphIOMapperConfig
 
 
@@ -32,4 +36,43 @@ def llm_instance() -> AzureChatOpenAI:
     )
 
 
+@pytest.fixture
+def fake_llm_config():
+    """Factory of mapper configs whose LLM answers with the given responses,
+    in order, the LLM is the config llm"""
+
+    def make(responses: list[str], **kwargs) -> LangGraphIOMapperConfig:
+        return LangGraphIOMapperConfig(
+            llm=FakeListChatModel(responses=responses), **kwargs
+        )
+
+    return make
+
+
+@pytest.fixture
+def agent_input():
+    """Factory of mapper inputs, schemas are given as dictionaries and
+    replaced by a description when missing"""
+
+    def describe(json_schema: Optional[dict], description: str):
+        if json_schema is None:
+            return ArgumentsDescription(description=description)
+        return ArgumentsDescription(json_schema=json_schema)
+
+    def make(
+        data: Any,
+        input_schema: Optional[dict] = None,
+        output_schema: Optional[dict] = None,
+        **kwargs,
+    ) -> AgentIOMapperInput:
+        return AgentIOMapperInput(
+            input=describe(input_schema, "The input data"),
+            output=describe(output_schema, "The output data"),
+            data=data,
+            **kwargs,
+        )
+
+    return make
+
+
 load_dotenv(dotenv_path=find_dotenv(usecwd=True))
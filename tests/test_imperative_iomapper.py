@@ -2,12 +2,24 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import json
+import pickle
+from datetime import datetime, timezone
 
 import pytest
+from jsonpath_ng.ext import parse
 from openapi_pydantic import Schema
 
-from agntcy_iomapper.base import ArgumentsDescription
-from agntcy_iomapper.imperative import ImperativeIOMapper, ImperativeIOMapperInput
+from agntcy_iomapper.base import (
+    ArgumentsDescription,
+    BaseIOMapperConfig,
+    InMemoryResponseCache,
+)
+from agntcy_iomapper.imperative import (
+    ImperativeIOMapper,
+    ImperativeIOMapperInput,
+    ProcessPoolBatchExecutor,
+    compile_field_mapping,
+)
 
 
 @pytest.mark.parametrize(
@@ -194,3 +206,231 @@ def test_imperative_iomapp(
         return
 
     assert expected == actual
+
+
+def test_mapping_plan_is_shared_between_mappers() -> None:
+    """Mappers built from the same field mapping share one compiled plan"""
+    schema = Schema.model_validate(
+        {"type": "object", "properties": {"name": {"type": "string"}}}
+    )
+    input = ImperativeIOMapperInput(
+        input=ArgumentsDescription(json_schema=schema),
+        output=ArgumentsDescription(json_schema=schema),
+        data={"name": "John"},
+    )
+    field_mapping = {"name": "$.name"}
+
+    first = ImperativeIOMapper(field_mapping=field_mapping, input=input)
+    second = ImperativeIOMapper(field_mapping=dict(field_mapping), input=input)
+
+    assert first.plan is second.plan
+    assert first.plan is compile_field_mapping(field_mapping)
+    assert first.invoke(data=None) == second.invoke(data=None) == {"name": "John"}
+
+
+def test_mapping_plan_rejects_invalid_mapping_values() -> None:
+    with pytest.raises(TypeError):
+        compile_field_mapping({"name": 42})
+
+
+def test_imperative_batch_mapping() -> None:
+    """Each record of a batch is mapped and failures are reported per record"""
+    input = ImperativeIOMapperInput(
+        input=ArgumentsDescription(
+            json_schema=Schema.model_validate(
+                {
+                    "type": "object",
+                    "properties": {"name": {"type": "string"}},
+                    "required": ["name"],
+                }
+            )
+        ),
+        output=ArgumentsDescription(
+            json_schema=Schema.model_validate(
+                {"type": "object", "properties": {"fullName": {"type": "string"}}}
+            )
+        ),
+        data=None,
+    )
+    io_mapp = ImperativeIOMapper(field_mapping={"fullName": "$.name"}, input=input)
+    records = [{"name": "John Doe"}, {"age": 30}, {"name": "Jane Doe"}]
+
+    results = io_mapp.map_batch(records)
+
+    assert [r.data for r in results] == [
+        {"fullName": "John Doe"},
+        None,
+        {"fullName": "Jane Doe"},
+    ]
+    assert results[0].error is None
+    assert "'name' is a required property" in results[1].error
+
+    lazy_results = io_mapp.imap_batch(iter(records))
+    assert next(lazy_results).data == {"fullName": "John Doe"}
+    assert [r.data for r in lazy_results] == [None, {"fullName": "Jane Doe"}]
+
+
+@pytest.mark.parametrize("result_mode", ["direct", "copy", "freeze"])
+def test_imperative_result_modes(result_mode) -> None:
+    """Non JSON values are returned as is when skipping the JSON round trip"""
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    data = {"name": "John", "created": created, "tags": ["a", "b"]}
+    input = ImperativeIOMapperInput(
+        input=ArgumentsDescription(json_schema=Schema(type="object")),
+        output=ArgumentsDescription(json_schema=Schema(type="object")),
+        data=data,
+    )
+    field_mapping = {"user.name": "$.name", "createdAt": "$.created", "tags": "$.tags"}
+
+    io_mapp = ImperativeIOMapper(
+        field_mapping=field_mapping, input=input, result_mode=result_mode
+    )
+    actual = io_mapp.invoke(data=None)
+
+    assert actual["createdAt"] == created
+    assert actual["user"]["name"] == "John"
+    if result_mode == "direct":
+        assert actual["tags"] is data["tags"]
+    elif result_mode == "copy":
+        assert actual["tags"] == data["tags"]
+        assert actual["tags"] is not data["tags"]
+    else:
+        assert actual["tags"] == ("a", "b")
+        with pytest.raises(TypeError):
+            actual["user"]["name"] = "Jane"
+
+
+def _reference_imperative_map(field_mapping, data) -> dict:
+    """The imperative mapping evaluated entirely with jsonpath_ng"""
+    mapped_output = {}
+    for output_field, json_path_or_func in field_mapping.items():
+        if isinstance(json_path_or_func, str):
+            match = parse(json_path_or_func).find(data)
+            value = match[0].value if match else None
+        else:
+            value = json_path_or_func(data)
+
+        curr = mapped_output
+        parts = output_field.strip("$.").split(".")
+        for part in parts[:-1]:
+            if part not in curr:
+                curr[part] = {}
+            curr = curr[part]
+        curr[parts[-1]] = value
+
+    return mapped_output
+
+
+@pytest.mark.parametrize(
+    "field_mapping, data",
+    [
+        (
+            {"fullName": "$.name", "location.cityName": "$.address.city"},
+            {"name": "John Doe", "address": {"city": "Springfield"}},
+        ),
+        (
+            {"a": "$.missing", "b.c": "$.address.missing", "d": "$.name.first"},
+            {"name": "John Doe", "address": {"city": "Springfield"}},
+        ),
+        (
+            {"a": "$.nothing.city", "b": "$.items.name", "c": "$.nothing"},
+            {"nothing": None, "items": [{"name": "x"}]},
+        ),
+        (
+            {"$.root": "$", "relative": "address.city", "number": "$.count"},
+            {"address": {"city": "Springfield"}, "count": 0},
+        ),
+        (
+            {
+                "first": "$.items[0].name",
+                "all": "$.items[*].name",
+                "expensive": "$.items[?(@.price > 10)].name",
+                "any": "$.*",
+                "split": "$.fullName.`split(' ', 0, 1)`",
+                "func": lambda d: len(d["items"]),
+            },
+            {
+                "fullName": "John Doe",
+                "items": [{"name": "x", "price": 5}, {"name": "y", "price": 20}],
+            },
+        ),
+        ({"a": "$.a.b"}, "not a mapping"),
+        ({"a": "$.a.b"}, [{"a": {"b": 1}}]),
+    ],
+)
+def test_mapping_plan_matches_jsonpath(field_mapping, data) -> None:
+    """The generated fast path gives the same results as plain jsonpath_ng"""
+    plan = compile_field_mapping(field_mapping)
+
+    assert plan.apply(data) == _reference_imperative_map(field_mapping, data)
+
+
+def test_mapping_plan_uses_fast_path_for_dotted_paths() -> None:
+    plan = compile_field_mapping(
+        {"a": "$.x.y", "b": "x", "c": "$.x[*]", "d": "$.x[?(@.y > 1)]"}
+    )
+
+    assert [step.path for step in plan.steps] == [("x", "y"), ("x",), None, None]
+
+
+def test_mapping_plan_pickles_to_the_cached_plan() -> None:
+    plan = compile_field_mapping({"fullName": "$.name"})
+
+    assert pickle.loads(pickle.dumps(plan)) is plan
+
+
+@pytest.mark.parametrize(
+    "field_mapping", [{"fullName": "$.name"}, {"fullName": lambda d: d.get("name")}]
+)
+def test_imperative_batch_on_process_pool(field_mapping) -> None:
+    """Batches mapped by worker processes keep the order of the records"""
+    input = ImperativeIOMapperInput(
+        input=ArgumentsDescription(
+            json_schema=Schema.model_validate(
+                {
+                    "type": "object",
+                    "properties": {"name": {"type": "string"}},
+                    "required": ["name"],
+                }
+            )
+        ),
+        output=ArgumentsDescription(json_schema=Schema(type="object")),
+        data=None,
+    )
+    io_mapp = ImperativeIOMapper(field_mapping=field_mapping, input=input)
+    records = [{"name": f"user {i}"} if i % 7 else {"id": i} for i in range(100)]
+
+    with ProcessPoolBatchExecutor(
+        max_workers=2, chunk_size=8, min_parallel_records=0
+    ) as executor:
+        results = io_mapp.map_batch(records, executor=executor)
+
+    assert results == io_mapp.map_batch(records)
+    assert [r.data for r in results[1:3]] == [
+        {"fullName": "user 1"},
+        {"fullName": "user 2"},
+    ]
+    assert results[7].error is not None
+
+
+def test_process_pool_only_sends_the_validation_config() -> None:
+    input = ImperativeIOMapperInput(
+        input=ArgumentsDescription(json_schema=Schema(type="object")),
+        output=ArgumentsDescription(json_schema=Schema(type="object")),
+        data=None,
+    )
+    config = BaseIOMapperConfig(
+        validate_json_input=True,
+        validation_policy="every_n",
+        response_cache=InMemoryResponseCache(),
+    )
+    io_mapp = ImperativeIOMapper(
+        field_mapping={"fullName": "$.name"}, input=input, config=config
+    )
+
+    chunk_mapper = ProcessPoolBatchExecutor()._chunk_mapper(io_mapp)
+
+    assert chunk_mapper is not None
+    assert chunk_mapper.config.response_cache is None
+    assert chunk_mapper.config.validate_json_input
+    assert chunk_mapper.config.validation_policy == "every_n"
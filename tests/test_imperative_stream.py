@@ -0,0 +1,125 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import io
+import json
+
+import pytest
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import ArgumentsDescription
+from agntcy_iomapper.imperative import (
+    ImperativeIOMapper,
+    ImperativeIOMapperInput,
+    map_json_lines,
+)
+from agntcy_iomapper.imperative.__main__ import main
+
+input_schema = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "city": {"type": "string"}},
+    "required": ["name"],
+}
+output_schema = {
+    "type": "object",
+    "properties": {
+        "fullName": {"type": "string"},
+        "location": {"type": "object", "properties": {"city": {"type": "string"}}},
+    },
+}
+field_mapping = {"fullName": "$.name", "location.city": "$.city"}
+
+records = [
+    {"name": "John Doe", "city": "Springfield"},
+    {"city": "Shelbyville"},
+    {"name": "Jane Doe", "city": "Capital City"},
+]
+
+
+@pytest.fixture
+def mapper() -> ImperativeIOMapper:
+    return ImperativeIOMapper(
+        input=ImperativeIOMapperInput(
+            input=ArgumentsDescription(json_schema=Schema.model_validate(input_schema)),
+            output=ArgumentsDescription(
+                json_schema=Schema.model_validate(output_schema)
+            ),
+            data=None,
+        ),
+        field_mapping=field_mapping,
+    )
+
+
+def _json_lines(values) -> str:
+    return "".join(json.dumps(value) + "\n" for value in values)
+
+
+def test_map_json_lines_skips_failed_records(mapper):
+    source = io.StringIO(_json_lines(records) + "\nnot json\n")
+    sink = io.StringIO()
+
+    stats = map_json_lines(mapper, source, sink)
+
+    assert [json.loads(line) for line in sink.getvalue().splitlines()] == [
+        {"fullName": "John Doe", "location": {"city": "Springfield"}},
+        {"fullName": "Jane Doe", "location": {"city": "Capital City"}},
+    ]
+    assert (stats.records, stats.mapped, stats.errors) == (4, 2, 2)
+    assert stats.records_per_second > 0
+
+
+def test_map_json_lines_include_errors(mapper):
+    sink = io.StringIO()
+
+    map_json_lines(mapper, io.StringIO(_json_lines(records)), sink, on_error="include")
+
+    lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert len(lines) == len(records)
+    assert "'name' is a required property" in lines[1]["error"]
+
+
+def test_map_json_lines_raise_on_error(mapper):
+    with pytest.raises(ValueError, match="line 2"):
+        map_json_lines(
+            mapper, io.StringIO(_json_lines(records)), io.StringIO(), on_error="raise"
+        )
+
+
+def test_map_json_lines_writes_frozen_results(mapper):
+    mapper.result_mode = "freeze"
+    sink = io.StringIO()
+
+    map_json_lines(mapper, io.StringIO(_json_lines(records[:1])), sink)
+
+    assert json.loads(sink.getvalue()) == {
+        "fullName": "John Doe",
+        "location": {"city": "Springfield"},
+    }
+
+
+def test_module_entry_point(tmp_path, capsys):
+    for name, value in [
+        ("mapping.json", field_mapping),
+        ("input_schema.json", input_schema),
+        ("output_schema.json", output_schema),
+    ]:
+        (tmp_path / name).write_text(json.dumps(value))
+    (tmp_path / "records.jsonl").write_text(_json_lines(records))
+
+    exit_code = main(
+        [
+            str(tmp_path / "records.jsonl"),
+            "-o",
+            str(tmp_path / "mapped.jsonl"),
+            "--field-mapping",
+            str(tmp_path / "mapping.json"),
+            "--input-schema",
+            str(tmp_path / "input_schema.json"),
+            "--output-schema",
+            str(tmp_path / "output_schema.json"),
+        ]
+    )
+
+    assert exit_code == 1
+    assert len((tmp_path / "mapped.jsonl").read_text().splitlines()) == 2
+    assert "3 records, 2 mapped, 1 errors" in capsys.readouterr().err
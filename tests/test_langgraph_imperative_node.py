@@ -0,0 +1,79 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Optional
+
+import pytest
+from langgraph.graph import END, StateGraph
+from pydantic import BaseModel, Field
+
+from agntcy_iomapper import IOMappingAgent, IOMappingAgentMetadata
+
+
+class InputQuiz(BaseModel):
+    prof_question: str
+    due_date: str
+
+
+class OverallState(BaseModel):
+    question: Optional[str] = Field(None)
+    quiz: Optional[InputQuiz] = Field(None)
+
+
+def ask_question(state: OverallState):
+    return {"question": "What is the capital of France?"}
+
+
+metadata = IOMappingAgentMetadata(
+    field_mapping={
+        "quiz.prof_question": "$.question",
+        "quiz.due_date": lambda _: "01/01/25",
+    },
+    input_fields=["question"],
+    output_fields=["quiz"],
+)
+
+
+def _build_app(mapping_node):
+    graph = StateGraph(OverallState)
+    graph.add_node("professor_node", ask_question)
+    graph.add_node("mapping_node", mapping_node)
+    graph.add_edge("professor_node", "mapping_node")
+    graph.add_edge("mapping_node", END)
+    graph.set_entry_point("professor_node")
+    return graph.compile()
+
+
+@pytest.mark.parametrize("state_type", [OverallState, None])
+async def test_imperative_node_maps_every_request(state_type):
+    node = IOMappingAgent(metadata=metadata).langgraph_imperative_node(
+        state_type=state_type
+    )
+    app = _build_app(node)
+
+    expected = {
+        "prof_question": "What is the capital of France?",
+        "due_date": "01/01/25",
+    }
+    assert app.invoke({"question": ""})["quiz"] == expected
+    assert app.invoke({"question": "another"})["quiz"] == expected
+    assert (await app.ainvoke({"question": ""}))["quiz"] == expected
+
+
+def test_imperative_node_maps_state_at_invocation():
+    node = IOMappingAgent(metadata=metadata).langgraph_imperative_node(OverallState)
+
+    first = node.invoke(OverallState(question="first"))
+    second = node.invoke(OverallState(question="second"))
+
+    assert first["quiz"]["prof_question"] == "first"
+    assert second["quiz"]["prof_question"] == "second"
+
+
+def test_imperative_node_requires_field_mapping():
+    _metadata = IOMappingAgentMetadata(
+        input_fields=["question"], output_fields=["quiz"]
+    )
+
+    with pytest.raises(ValueError):
+        IOMappingAgent(metadata=_metadata).langgraph_imperative_node()
@@ -0,0 +1,129 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+
+import pytest
+
+from agntcy_iomapper.base import (
+    AgentIOMapperOutput,
+    BaseIOMapper,
+    BaseIOMapperConfig,
+)
+from agntcy_iomapper.langgraph import LangGraphIOMapper
+
+
+class InFlight:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    async def run(self, delay):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.current -= 1
+
+
+class EchoMapper(BaseIOMapper):
+    """Responds with the data after a delay of data seconds, fails on
+    negative delays"""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.in_flight = InFlight()
+
+    def invoke(self, input, messages, **kwargs) -> str:
+        raise NotImplementedError
+
+    async def ainvoke(self, input, messages, **kwargs) -> str:
+        if input.data < 0:
+            raise ValueError("negative delay")
+        await self.in_flight.run(input.data)
+        return str(input.data)
+
+
+async def test_abatch_keeps_the_input_order_and_returns_exceptions(agent_input):
+    mapper = EchoMapper()
+    inputs = [agent_input(data) for data in (0.03, -1, 0.01, 0.02)]
+
+    results = await mapper.abatch(inputs, max_concurrency=2)
+
+    assert [result.data for i, result in enumerate(results) if i != 1] == [
+        "0.03",
+        "0.01",
+        "0.02",
+    ]
+    assert isinstance(results[1], ValueError)
+    assert mapper.in_flight.peak == 2
+
+
+async def test_config_limits_the_concurrency(agent_input):
+    mapper = EchoMapper(BaseIOMapperConfig(max_concurrency=1))
+
+    await mapper.abatch([agent_input(0.01) for _ in range(3)])
+
+    assert mapper.in_flight.peak == 1
+
+
+async def test_abatch_as_completed_yields_the_fastest_first(agent_input):
+    mapper = EchoMapper()
+    inputs = [agent_input(data) for data in (0.05, 0.0)]
+
+    indices = [i async for i, _ in mapper.abatch_as_completed(inputs)]
+
+    assert indices == [1, 0]
+
+
+async def test_stopping_the_iteration_cancels_the_pending_inputs(agent_input):
+    mapper = EchoMapper()
+    results = mapper.abatch_as_completed([agent_input(0.0), agent_input(10)])
+
+    async for i, result in results:
+        assert (i, result) == (0, AgentIOMapperOutput(data="0.0"))
+        break
+    await results.aclose()
+    await asyncio.sleep(0)
+
+    assert mapper.in_flight.current == 0
+
+
+@pytest.fixture
+def runnable_mapper(fake_llm_config):
+    mapper = LangGraphIOMapper(fake_llm_config(["mapped"], max_concurrency=2))
+    in_flight = InFlight()
+
+    async def ainvoke(input, **kwargs):
+        await in_flight.run(input.data)
+        return AgentIOMapperOutput(data=input.data)
+
+    mapper._iomapper._ainvoke = ainvoke
+    return mapper, in_flight
+
+
+async def test_runnable_batches_use_the_mapper_concurrency(
+    agent_input, runnable_mapper
+):
+    mapper, in_flight = runnable_mapper
+    runnable = mapper.as_runnable()
+    states = [{"input": agent_input(0.01)} for _ in range(5)]
+
+    assert await runnable.abatch(states) == [0.01] * 5
+    assert in_flight.peak == 2
+
+    in_flight.peak = 0
+    await runnable.abatch(states, {"max_concurrency": 1})
+    assert in_flight.peak == 1
+
+
+def test_runnable_batch_returns_exceptions(agent_input, fake_llm_config):
+    runnable = LangGraphIOMapper(fake_llm_config(["mapped"])).as_runnable()
+
+    results = runnable.batch(
+        [{"input": agent_input(1)}, {}], {"max_concurrency": 1}, return_exceptions=True
+    )
+
+    assert results[0] == "mapped"
+    assert isinstance(results[1], KeyError)
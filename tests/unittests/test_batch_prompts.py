@@ -0,0 +1,180 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+from agntcy_iomapper.base import InMemoryResponseCache
+from agntcy_iomapper.base.batch import plan_batches
+from agntcy_iomapper.langgraph.langgraph import _LangGraphAgentIOMapper
+
+output_schema = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def test_records_share_a_prompt(agent_input, fake_llm_config):
+    mapper = _LangGraphAgentIOMapper(
+        fake_llm_config(
+            ['```json\n[{"name": "Ann"}, {"name": "Bob"}, {"name": "Eve"}]\n```']
+        )
+    )
+    inputs = [
+        agent_input({"user": name}, output_schema=output_schema)
+        for name in ("Ann", "Bob", "Eve")
+    ]
+
+    outputs = mapper._invoke_batch(inputs)
+
+    assert [output.data for output in outputs] == [
+        {"name": "Ann"},
+        {"name": "Bob"},
+        {"name": "Eve"},
+    ]
+
+
+def test_batches_fit_the_token_budget(agent_input, fake_llm_config):
+    assert plan_batches([10, 10, 10, 10], 50, 70, 10) == [range(0, 2), range(2, 4)]
+    assert plan_batches([10, 10, 10], 50, 70, 1) == [range(i, i + 1) for i in range(3)]
+    # a batch holds at least one record
+    assert plan_batches([100, 10], 50, 70, 10) == [range(0, 1), range(1, 2)]
+
+    responses = [json.dumps([{"name": "Ann"}, {"name": "Bob"}])] * 2
+    mapper = _LangGraphAgentIOMapper(fake_llm_config(responses, batch_max_records=2))
+    outputs = mapper._invoke_batch(
+        [agent_input({"user": name}, output_schema=output_schema) for name in "ABCD"]
+    )
+    assert len(outputs) == 4
+    assert mapper.llm.i == 0
+
+
+def test_failed_records_are_mapped_again(agent_input, fake_llm_config):
+    mapper = _LangGraphAgentIOMapper(
+        fake_llm_config(
+            [
+                '[{"name": "Ann"}, {"other": 1}, {"name": "Eve"}]',
+                '{"name": "Bob"}',
+            ],
+            validate_json_output=True,
+        )
+    )
+    inputs = [
+        agent_input({"user": name}, output_schema=output_schema)
+        for name in ("Ann", "Bob", "Eve")
+    ]
+
+    outputs = mapper._invoke_batch(inputs)
+
+    assert [output.data["name"] for output in outputs] == ["Ann", "Bob", "Eve"]
+    assert mapper.llm.i == 0
+
+
+async def test_responses_without_one_result_per_record_are_retried(
+    agent_input, fake_llm_config
+):
+    mapper = _LangGraphAgentIOMapper(
+        fake_llm_config(
+            [
+                '[{"name": "Ann"}]',
+                '{"name": "Ann"}',
+                '{"name": "Bob"}',
+                '{"name": "Eve"}',
+            ]
+        )
+    )
+    inputs = [
+        agent_input({"user": name}, output_schema=output_schema)
+        for name in ("Ann", "Bob")
+    ]
+    inputs.append(
+        agent_input(
+            {"user": "Eve"},
+            output_schema=output_schema,
+            message_template="Map {{ data }}",
+        )
+    )
+
+    outputs = await mapper._ainvoke_batch(inputs)
+
+    assert [output.data["name"] for output in outputs] == ["Ann", "Bob", "Eve"]
+
+
+def test_valid_batch_responses_are_cached(agent_input, fake_llm_config):
+    cache = InMemoryResponseCache()
+    mapper = _LangGraphAgentIOMapper(
+        fake_llm_config(['[{"name": "Ann"}, {"name": "Bob"}]'], response_cache=cache)
+    )
+    inputs = [
+        agent_input({"user": name}, output_schema=output_schema)
+        for name in ("Ann", "Bob")
+    ]
+
+    mapper._invoke_batch(inputs)
+    mapper._invoke_batch(inputs)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.entries) == (1, 1)
+
+
+def test_invalid_inputs_fail_on_their_own(agent_input, fake_llm_config):
+    mapper = _LangGraphAgentIOMapper(
+        fake_llm_config(
+            ['[{"name": "Ann"}, {"name": "Eve"}]'], validate_json_input=True
+        )
+    )
+    input_schema = {"type": "object", "properties": {"user": {"type": "string"}}}
+    inputs = [
+        agent_input({"user": name}, input_schema, output_schema)
+        for name in ("Ann", 1, "Eve")
+    ]
+
+    outputs = mapper._invoke_batch(inputs)
+
+    assert outputs[0].data == {"name": "Ann"}
+    assert outputs[1].error.startswith("ValidationError: 1 is not of type")
+    assert outputs[2].data == {"name": "Eve"}
+    assert mapper.validation_stats.input.failed == 1
+
+
+def test_batch_results_follow_the_validation_config(agent_input, fake_llm_config):
+    responses = ['[{"name": "Ann"}, {"other": 1}]']
+    mapper = _LangGraphAgentIOMapper(fake_llm_config(responses))
+    inputs = [
+        agent_input({"user": name}, output_schema=output_schema)
+        for name in ("Ann", "Bob")
+    ]
+
+    # output validation is disabled by default
+    assert mapper._invoke_batch(inputs)[1].data == {"other": 1}
+
+    mapper = _LangGraphAgentIOMapper(
+        fake_llm_config(
+            responses,
+            validate_json_output=True,
+            validation_policy="every_n",
+            validation_every_n=1,
+        )
+    )
+    # sampled failures are counted, not retried
+    assert mapper._invoke_batch(inputs)[1].data == {"other": 1}
+    stats = mapper.validation_stats.output
+    assert (stats.validated, stats.failed) == (2, 1)
+
+
+async def test_failed_records_get_an_error(agent_input, fake_llm_config):
+    mapper = _LangGraphAgentIOMapper(
+        fake_llm_config(
+            ['[{"name": "Ann"}, {"other": 1}]', '{"other": 2}'],
+            validate_json_output=True,
+        )
+    )
+    inputs = [
+        agent_input({"user": name}, output_schema=output_schema)
+        for name in ("Ann", "Bob")
+    ]
+
+    outputs = await mapper._ainvoke_batch(inputs)
+
+    assert outputs[0].data == {"name": "Ann"}
+    assert outputs[1].error == "ValidationError: 'name' is a required property"
@@ -0,0 +1,92 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Any, List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from agntcy_iomapper.base import FieldMetadata
+from agntcy_iomapper.base.utils import compile_field_extractor, extract_nested_fields
+
+
+def _reference_get_nested_value(data: Any, field_path: str) -> Optional[Any]:
+    """The per segment walk extract_nested_fields did before compiling"""
+    current = data
+    for part in field_path.split("."):
+        if isinstance(current, dict):
+            current = current[part]
+        elif isinstance(current, list) and part.isdigit():
+            current = current[int(part)]
+        elif hasattr(current, part):
+            current = getattr(current, part)
+        else:
+            current = None
+    return current
+
+
+def _reference_extract_nested_fields(data: Any, fields: List[str]) -> dict:
+    results = {}
+    for field_path in fields:
+        try:
+            results[field_path] = _reference_get_nested_value(data, field_path)
+        except (KeyError, TypeError, AttributeError, ValueError):
+            pass
+    return results
+
+
+class Message(BaseModel):
+    type: str
+    content: str
+
+
+class State(BaseModel):
+    messages: List[Message]
+    query: Optional[str] = None
+    extra: dict = {}
+
+
+dict_state = {
+    "messages": [{"type": "human", "content": "hi"}],
+    "query": None,
+    "extra": {"0": "zero", "nested": {"deep": 1}},
+}
+model_state = State.model_validate(dict_state)
+
+FIELDS = [
+    ["query"],
+    ["messages"],
+    ["messages.0.content"],
+    ["messages.1.content"],
+    ["messages.content"],
+    ["extra.0", "extra.nested.deep"],
+    ["extra.missing", "query", "messages.0.type.upper"],
+    ["missing.path", "query.strip"],
+    ["", "extra."],
+]
+
+
+@pytest.mark.parametrize("state", [dict_state, model_state], ids=["dict", "model"])
+@pytest.mark.parametrize("fields", FIELDS)
+def test_extractor_matches_reference(state, fields):
+    try:
+        expected = _reference_extract_nested_fields(state, fields)
+    except IndexError:
+        with pytest.raises(IndexError):
+            extract_nested_fields(state, fields)
+        return
+
+    assert extract_nested_fields(state, fields) == expected
+
+
+def test_extractors_are_shared():
+    extractor = compile_field_extractor(["query", "messages.0.content"])
+
+    assert (
+        compile_field_extractor(
+            ["query", FieldMetadata(json_path="messages.0.content", description="")]
+        )
+        is extractor
+    )
+    assert extractor(model_state) == {"query": None, "messages.0.content": "hi"}
+    assert extract_nested_fields(model_state, []) == {}
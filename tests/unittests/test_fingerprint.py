@@ -0,0 +1,119 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import (
+    ArgumentsDescription,
+    canonical_schema,
+    clear_fingerprint_memo,
+    schema_fingerprint,
+)
+from agntcy_iomapper.base.fingerprint import _memo
+from agntcy_iomapper.base.utils import SharedSchema
+
+
+@pytest.fixture(autouse=True)
+def clear_memo():
+    clear_fingerprint_memo()
+    yield
+    clear_fingerprint_memo()
+
+
+schema = {
+    "type": "object",
+    "title": "Person",
+    "properties": {
+        "name": {"type": "string", "description": "Full name"},
+        "title": {"type": "string"},
+        "address": {"$ref": "#/$defs/Address"},
+    },
+    "required": ["name"],
+    "$defs": {
+        "Address": {
+            "type": "object",
+            "properties": {"city": {"type": "string", "default": "Paris"}},
+        }
+    },
+}
+
+
+def test_key_order_does_not_matter():
+    reordered = {key: schema[key] for key in reversed(list(schema))}
+
+    assert schema_fingerprint(reordered) == schema_fingerprint(schema)
+
+
+def test_schema_model_and_dict_match():
+    assert schema_fingerprint(Schema.model_validate(schema)) == schema_fingerprint(
+        schema
+    )
+
+
+def test_definitions_spellings_are_kept_apart():
+    # validators and resolvers built for one spelling can't serve the other
+    legacy = {
+        **{key: value for key, value in schema.items() if key != "$defs"},
+        "properties": {
+            **schema["properties"],
+            "address": {"$ref": "#/definitions/Address"},
+        },
+        "definitions": schema["$defs"],
+    }
+
+    assert schema_fingerprint(legacy) != schema_fingerprint(schema)
+    assert canonical_schema({"$ref": "#/$defs/A%20B"}) == {"$ref": "#/$defs/A B"}
+
+
+def test_annotations_can_be_ignored():
+    annotated = {**schema, "title": "Other", "description": "A person"}
+
+    assert schema_fingerprint(annotated) != schema_fingerprint(schema)
+    assert schema_fingerprint(annotated, ignore_annotations=True) == (
+        schema_fingerprint(schema, ignore_annotations=True)
+    )
+    # a property named title is not an annotation
+    assert "title" in canonical_schema(schema, ignore_annotations=True)["properties"]
+
+
+def test_values_are_kept():
+    changed = {**schema, "$defs": {"Address": {"type": "object", "default": "Lyon"}}}
+
+    assert schema_fingerprint(changed) != schema_fingerprint(schema)
+    assert canonical_schema({"enum": [{"title": "x"}]}, ignore_annotations=True) == {
+        "enum": [{"title": "x"}]
+    }
+
+
+def test_fingerprints_are_memoized():
+    model = SharedSchema.model_validate(schema)
+
+    fingerprint = schema_fingerprint(model)
+    assert schema_fingerprint(model) == fingerprint
+    assert _memo.info().hits == 1
+
+
+def test_dictionaries_modified_in_place_are_hashed_again():
+    modified = {"type": "object", "properties": {}}
+    before = ArgumentsDescription(json_schema=modified)
+
+    modified["properties"]["x"] = {"type": "string"}
+    after = ArgumentsDescription(json_schema=modified)
+
+    assert before.json_schema.properties == {}
+    assert list(after.json_schema.properties) == ["x"]
+    assert after.schema_dict == modified
+    assert _memo.info().currsize == 0
+
+
+def test_arguments_description():
+    model = Schema.model_validate(schema)
+    arguments = ArgumentsDescription(json_schema=model)
+
+    fingerprint = schema_fingerprint(arguments)
+    assert schema_fingerprint(arguments) == fingerprint
+    assert schema_fingerprint(ArgumentsDescription(json_schema=model)) == fingerprint
+
+    arguments.description = "A person"
+    assert schema_fingerprint(arguments) != fingerprint
@@ -0,0 +1,213 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+import jsonschema
+import pytest
+
+from agntcy_iomapper.base import ArgumentsDescription
+from agntcy_iomapper.langgraph import LangGraphIOMapper
+
+input_schema = {
+    "type": "object",
+    "properties": {
+        "order": {
+            "type": "object",
+            "properties": {
+                "client": {"type": "string"},
+                "total": {"type": "number"},
+            },
+        }
+    },
+}
+output_schema = {
+    "type": "object",
+    "properties": {
+        "customer": {"type": "string"},
+        "amount": {"type": "number"},
+    },
+    "required": ["customer", "amount"],
+}
+field_mapping = {"customer": "$.order.client", "amount": "$.order.total"}
+
+
+synthesis = {"synthesize_field_mapping": True, "synthesis_verify_samples": 2}
+
+
+@pytest.fixture
+def order_input(agent_input):
+    def make(client, total):
+        order = {"client": client}
+        if total is not None:
+            order["total"] = total
+        return agent_input({"order": order}, input_schema, output_schema)
+
+    return make
+
+
+def test_verified_field_mapping_replaces_the_llm(order_input, fake_llm_config):
+    mapper = LangGraphIOMapper(
+        fake_llm_config(
+            [
+                f"```json\n{json.dumps(field_mapping)}\n```",
+                '{"customer": "Ann", "amount": 10}',
+                '{"customer": "Bob", "amount": 20}',
+                "not called",
+            ],
+            **synthesis,
+        )
+    )
+
+    assert mapper.invoke({"input": order_input("Ann", 10)}, {}) == {
+        "customer": "Ann",
+        "amount": 10,
+    }
+    assert mapper.invoke({"input": order_input("Bob", 20)}, {}) == {
+        "customer": "Bob",
+        "amount": 20,
+    }
+    assert mapper._synthesizer.field_mapping(order_input("Ann", 10)) == field_mapping
+
+    assert mapper.invoke({"input": order_input("Eve", 30)}, {}) == {
+        "customer": "Eve",
+        "amount": 30,
+    }
+    assert mapper._iomapper.llm.i == 3
+    stats = mapper._synthesizer.stats
+    assert (stats.verified, stats.imperative, stats.llm) == (1, 1, 2)
+
+
+async def test_records_the_field_mapping_cannot_map_fall_back_to_the_llm(
+    order_input, fake_llm_config
+):
+    mapper = LangGraphIOMapper(
+        fake_llm_config(
+            [
+                json.dumps(field_mapping),
+                '{"customer": "Ann", "amount": 10}',
+                '{"customer": "Bob", "amount": 20}',
+                '{"customer": "Eve", "amount": 0}',
+            ],
+            **synthesis,
+        )
+    )
+    await mapper.ainvoke({"input": order_input("Ann", 10)}, {})
+    await mapper.ainvoke({"input": order_input("Bob", 20)}, {})
+
+    # the field mapping leaves the required amount out
+    assert await mapper.ainvoke({"input": order_input("Eve", None)}, {}) == {
+        "customer": "Eve",
+        "amount": 0,
+    }
+    assert mapper._synthesizer.stats.fallbacks == 1
+
+
+def test_diverging_field_mappings_are_rejected(order_input, fake_llm_config):
+    mapper = LangGraphIOMapper(
+        fake_llm_config(
+            [
+                json.dumps(field_mapping),
+                '{"customer": "ANN", "amount": 10}',
+                '{"customer": "BOB", "amount": 20}',
+            ],
+            **synthesis,
+        )
+    )
+
+    mapper.invoke({"input": order_input("Ann", 10)}, {})
+    assert mapper.invoke({"input": order_input("Bob", 20)}, {}) == {
+        "customer": "BOB",
+        "amount": 20,
+    }
+    assert mapper._synthesizer.field_mapping(order_input("Ann", 10)) is None
+    assert mapper._synthesizer.stats.rejected == 1
+
+
+def test_invalid_field_mappings_are_rejected(order_input, fake_llm_config):
+    mapper = LangGraphIOMapper(
+        fake_llm_config(["{}", '{"customer": "Ann", "amount": 10}'], **synthesis)
+    )
+
+    assert mapper.invoke({"input": order_input("Ann", 10)}, {}) == {
+        "customer": "Ann",
+        "amount": 10,
+    }
+    assert mapper._synthesizer.stats.rejected == 1
+
+
+async def test_inputs_are_validated_before_the_field_mapping(
+    order_input, fake_llm_config
+):
+    mapper = LangGraphIOMapper(
+        fake_llm_config(
+            [
+                json.dumps(field_mapping),
+                '{"customer": "Ann", "amount": 10}',
+                '{"customer": "Bob", "amount": 20}',
+            ],
+            validate_json_input=True,
+            **synthesis,
+        )
+    )
+    mapper.invoke({"input": order_input("Ann", 10)}, {})
+    mapper.invoke({"input": order_input("Bob", 20)}, {})
+
+    with pytest.raises(jsonschema.ValidationError):
+        mapper.invoke({"input": order_input("Eve", "30")}, {})
+    with pytest.raises(jsonschema.ValidationError):
+        await mapper.ainvoke({"input": order_input("Eve", "30")}, {})
+    stats = mapper._iomapper.validation_stats.input
+    assert (stats.validated, stats.failed) == (4, 2)
+    # rejected before the field mapping is applied
+    assert mapper._synthesizer.stats.fallbacks == 0
+
+
+def test_schemas_differing_by_their_descriptions_are_not_shared(
+    order_input, fake_llm_config
+):
+    mapper = LangGraphIOMapper(
+        fake_llm_config(
+            [
+                json.dumps(field_mapping),
+                '{"customer": "Ann", "amount": 10}',
+                '{"customer": "Bob", "amount": 20}',
+                "{}",
+                '{"customer": "eve@example.com", "amount": 30}',
+            ],
+            **synthesis,
+        )
+    )
+    mapper.invoke({"input": order_input("Ann", 10)}, {})
+    mapper.invoke({"input": order_input("Bob", 20)}, {})
+
+    described = {
+        **output_schema,
+        "properties": {
+            **output_schema["properties"],
+            "customer": {"type": "string", "description": "Email of the client"},
+        },
+    }
+    input = order_input("Eve", 30)
+    input.output = ArgumentsDescription(json_schema=described)
+
+    assert mapper.invoke({"input": input}, {}) == {
+        "customer": "eve@example.com",
+        "amount": 30,
+    }
+    assert mapper._synthesizer.stats.synthesized == 2
+
+
+def test_inputs_with_a_message_template_are_mapped_by_the_llm(
+    order_input, fake_llm_config
+):
+    mapper = LangGraphIOMapper(
+        fake_llm_config(['{"customer": "Ann", "amount": 10}'], **synthesis)
+    )
+    input = order_input("Ann", 10)
+    input.message_template = "Map {{ data }}"
+
+    mapper.invoke({"input": input}, {})
+
+    assert mapper._synthesizer.stats.synthesized == 0
+    assert mapper._synthesizer.stats.llm == 1
@@ -0,0 +1,185 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import gc
+
+import pydantic
+import pytest
+from openapi_pydantic import Schema
+from pydantic import BaseModel
+
+from agntcy_iomapper.base import (
+    FieldMetadata,
+    IOMappingAgentMetadata,
+    ProjectedSchema,
+    clear_projection_cache,
+    project_schema,
+    projection_cache_info,
+    set_projection_cache_size,
+)
+from agntcy_iomapper.base.utils import (
+    _model_schemas,
+    create_type_from_schema,
+    get_io_types,
+    get_model_json_schema,
+)
+
+schema = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "address": {
+            "type": "object",
+            "properties": {
+                "city": {"type": "string"},
+                "street": {"type": "string"},
+            },
+        },
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_projection_cache()
+    yield
+    set_projection_cache_size(256)
+    clear_projection_cache()
+
+
+def test_projection_matches_create_type_from_schema():
+    fields = ["name", "address.city"]
+    projected = project_schema(schema, fields)
+
+    assert isinstance(projected, Schema)
+    assert projected.model_dump() == (
+        Schema.model_validate(create_type_from_schema(schema, fields)).model_dump()
+    )
+
+
+def test_projections_are_shared_and_frozen():
+    projected = project_schema(schema, ["address.city"])
+    # same content, different key order
+    reordered = {"properties": schema["properties"], "type": "object"}
+
+    assert project_schema(reordered, ["address.city"]) is projected
+    assert project_schema(schema, ["name"]) is not projected
+
+    info = projection_cache_info()
+    assert info.hits == 1
+    assert info.misses == 2
+
+    with pytest.raises(pydantic.ValidationError):
+        projected.type = "string"
+
+
+def test_field_metadata_is_part_of_the_key():
+    plain = project_schema(schema, ["name"])
+    described = project_schema(
+        schema, [FieldMetadata(json_path="name", description="Full name")]
+    )
+    other = project_schema(
+        schema, [FieldMetadata(json_path="name", description="Nickname")]
+    )
+
+    assert described is not plain
+    assert described is not other
+    assert described.model_extra["name"]["description"] == "Full name"
+    assert projection_cache_info().misses == 3
+
+
+def test_get_io_types_uses_the_cache():
+    metadata = IOMappingAgentMetadata(
+        input_fields=["name"],
+        output_fields=["address.city"],
+        input_schema=schema,
+        output_schema=schema,
+    )
+
+    input_type, output_type = get_io_types(None, metadata)
+
+    assert isinstance(input_type, ProjectedSchema)
+    assert get_io_types(None, metadata) == (input_type, output_type)
+    assert get_io_types(None, metadata)[0] is input_type
+    assert projection_cache_info().hits == 4
+
+
+def test_cache_size_is_bounded():
+    set_projection_cache_size(1)
+
+    first = project_schema(schema, ["name"])
+    project_schema(schema, ["address"])
+
+    assert projection_cache_info().currsize == 1
+    assert project_schema(schema, ["name"]) is not first
+
+
+class Address(BaseModel):
+    city: str
+    street: str
+
+
+class State(BaseModel):
+    name: str
+    address: Address
+
+
+def test_state_class_schema_is_generated_once(monkeypatch):
+    calls = []
+    generate = State.model_json_schema
+
+    def model_json_schema(cls, *args, **kwargs):
+        calls.append(cls)
+        return generate(*args, **kwargs)
+
+    monkeypatch.setattr(State, "model_json_schema", classmethod(model_json_schema))
+    metadata = IOMappingAgentMetadata(
+        input_fields=["name"], output_fields=["address.city"]
+    )
+    state = State(name="Jane", address=Address(city="Paris", street="Rue"))
+
+    input_type, output_type = get_io_types(state, metadata)
+
+    assert get_io_types(state, metadata)[0] is input_type
+    assert get_io_types(State.model_validate(state), metadata)[1] is output_type
+    assert len(calls) == 1
+    assert get_model_json_schema(State) == generate()
+
+
+def test_state_class_schemas_are_weakly_kept():
+    def state_type():
+        class Dynamic(BaseModel):
+            value: int
+
+        return Dynamic
+
+    state = state_type()(value=1)
+    get_io_types(
+        state, IOMappingAgentMetadata(input_fields=["value"], output_fields=["value"])
+    )
+    assert type(state) in _model_schemas
+
+    del state
+    gc.collect()
+    assert len(_model_schemas) == 0
+
+
+def test_definitions_spellings_are_not_mixed():
+    # both spellings of the definitions, projected after one another
+    defs = {
+        "type": "object",
+        "properties": {"a": {"$ref": "#/$defs/A"}},
+        "$defs": {"A": {"type": "object", "properties": {"c": {"type": "string"}}}},
+    }
+    definitions = {
+        "type": "object",
+        "properties": {"a": {"$ref": "#/definitions/A"}},
+        "definitions": defs["$defs"],
+    }
+
+    project_schema(defs, ["a"])
+    projected = project_schema(definitions, ["a.c"])
+
+    assert projected.model_dump(mode="json", exclude_none=True) == {
+        "a": {"type": "object", "properties": {"c": {"type": "string"}}}
+    }
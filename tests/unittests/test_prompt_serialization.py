@@ -0,0 +1,90 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from jinja2.sandbox import SandboxedEnvironment
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import (
+    AgentIOMapperInput,
+    ArgumentsDescription,
+    BaseIOMapper,
+    BaseIOMapperConfig,
+)
+from agntcy_iomapper.base.prompt import (
+    compact_schema,
+    prune_definitions,
+    to_prompt_json,
+)
+
+LEGACY_TEMPLATE = "The data is described {% if input.json_schema %}by the following JSON schema: {{ input.json_schema.model_dump(exclude_none=True) }}{% else %}as {{ input.description }}{% endif %}, and {%if output.json_schema %} the result must adhere strictly to the following JSON schema: {{ output.json_schema.model_dump(exclude_none=True) }}{% else %}as {{ output.description }}{% endif %}. The data to translate is: {{ data }}. It is absolutely crucial that each field and its type specified in the schema are followed precisely, without introducing any additional fields or altering types. Non-compliance will result in rejection of the output."
+
+schema = {
+    "type": "object",
+    "title": "Order",
+    "properties": {
+        "customer": {"$ref": "#/$defs/Customer"},
+        "title": {"type": "string", "title": "Title", "default": "none"},
+    },
+    "$defs": {
+        "Customer": {
+            "type": "object",
+            "properties": {"address": {"$ref": "#/$defs/Address"}},
+        },
+        "Address": {"type": "object", "title": "Address"},
+        "Unused": {"type": "string"},
+    },
+}
+
+
+class _PromptRenderer(BaseIOMapper):
+    def render(self, input: AgentIOMapperInput) -> str:
+        self._check_jinja_env(False)
+        return self.user_template.render(self._get_render_env(input))
+
+    def invoke(self, input, messages, **kwargs) -> str:
+        raise NotImplementedError
+
+    async def ainvoke(self, input, messages, **kwargs) -> str:
+        raise NotImplementedError
+
+
+@pytest.fixture
+def input():
+    return AgentIOMapperInput(
+        input=ArgumentsDescription(json_schema=Schema.model_validate(schema)),
+        output=ArgumentsDescription(description="A customer name"),
+        data={"customer": {"address": {}}, "title": "l'été"},
+    )
+
+
+def test_unreferenced_definitions_are_pruned():
+    pruned = prune_definitions(schema)
+
+    assert set(pruned["$defs"]) == {"Customer", "Address"}
+    assert "Unused" in schema["$defs"]
+    assert "$defs" not in prune_definitions({**schema, "properties": {}})
+
+
+def test_titles_and_defaults_are_stripped():
+    compact = compact_schema(schema, strip_titles=True, strip_defaults=True)
+
+    assert "title" not in compact
+    assert compact["properties"]["title"] == {"type": "string"}
+    assert compact["$defs"]["Address"] == {"type": "object"}
+
+
+def test_python_format_renders_like_before(input):
+    legacy = SandboxedEnvironment(autoescape=False).from_string(LEGACY_TEMPLATE)
+
+    assert _PromptRenderer().render(input) == legacy.render(
+        input=input.input, output=input.output, data=input.data
+    )
+
+
+def test_compact_format(input):
+    prompt = _PromptRenderer(BaseIOMapperConfig(prompt_format="compact")).render(input)
+
+    assert to_prompt_json(compact_schema(input.input.json_schema)) in prompt
+    assert '{"customer":{"address":{}},"title":"l\'été"}' in prompt
+    assert "Unused" not in prompt
@@ -0,0 +1,114 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from jsonschema.exceptions import ValidationError
+
+from agntcy_iomapper.base import InMemoryResponseCache
+from agntcy_iomapper.langgraph import LangGraphIOMapper
+
+output_schema = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+@pytest.fixture
+def input(agent_input):
+    return agent_input({"name": "Ann"}, output_schema=output_schema)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_identical_prompts_are_answered_from_the_cache(input, fake_llm_config):
+    cache = InMemoryResponseCache()
+    mapper = LangGraphIOMapper(
+        fake_llm_config(['{"name": "Ann"}', '{"name": "Bob"}'], response_cache=cache),
+        input,
+    )
+
+    assert mapper.invoke({}, {}) == {"name": "Ann"}
+    assert mapper.invoke({}, {}) == {"name": "Ann"}
+
+    stats = mapper._iomapper.response_cache_stats
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+async def test_async_calls_share_the_cache(input, fake_llm_config):
+    cache = InMemoryResponseCache()
+    mapper = LangGraphIOMapper(
+        fake_llm_config(['{"name": "Ann"}', '{"name": "Bob"}'], response_cache=cache),
+        input,
+    )
+
+    assert mapper.invoke({}, {}) == {"name": "Ann"}
+    assert await mapper.ainvoke({}, {}) == {"name": "Ann"}
+
+
+def test_models_are_part_of_the_key(input, fake_llm_config):
+    cache = InMemoryResponseCache()
+
+    assert LangGraphIOMapper(
+        fake_llm_config(['{"name": "Ann"}'], response_cache=cache), input
+    ).invoke({}, {}) == {"name": "Ann"}
+    assert LangGraphIOMapper(
+        fake_llm_config(['{"name": "Bob"}'], response_cache=cache), input
+    ).invoke({}, {}) == {"name": "Bob"}
+
+
+def test_invalid_responses_are_not_cached(input, fake_llm_config):
+    cache = InMemoryResponseCache()
+    mapper = LangGraphIOMapper(
+        fake_llm_config(
+            ['{"other": 1}', '{"name": "Ann"}'],
+            response_cache=cache,
+            validate_json_output=True,
+        ),
+        input,
+    )
+
+    with pytest.raises(ValidationError):
+        mapper.invoke({}, {})
+    assert mapper.invoke({}, {}) == {"name": "Ann"}
+    assert cache.stats().entries == 1
+
+
+def test_entries_expire():
+    clock = FakeClock()
+    cache = InMemoryResponseCache(ttl=10, clock=clock)
+    cache.set("key", "value")
+
+    clock.now = 9
+    assert cache.get("key") == "value"
+    clock.now = 10
+    assert cache.get("key") is None
+    assert cache.stats().expired == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = InMemoryResponseCache(max_entries=2, max_bytes=12)
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+    cache.get("a")
+    cache.set("c", "1")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "12345"
+    assert cache.stats().model_dump() == {
+        "hits": 2,
+        "misses": 1,
+        "expired": 0,
+        "evicted": 1,
+        "entries": 2,
+        "size_bytes": 8,
+    }
+
+    cache.set("d", "x" * 20)
+    assert cache.get("d") is None
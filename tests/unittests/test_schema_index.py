@@ -0,0 +1,104 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import List, Optional, Union
+
+import pytest
+from pydantic import BaseModel
+
+from agntcy_iomapper.base import SchemaIndex
+from agntcy_iomapper.base.utils import create_type_from_schema
+
+
+class Address(BaseModel):
+    city: str
+
+
+class Phone(BaseModel):
+    number: str
+
+
+class Contact(BaseModel):
+    name: str
+    addresses: List[Address]
+    primary: Optional[Union[Address, Phone]] = None
+    manager: Optional["Contact"] = None
+
+
+schema = Contact.model_json_schema()
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_paths_resolve_to_sub_schemas(lazy):
+    index = SchemaIndex(schema, lazy=lazy)
+
+    assert index["name"] == {"title": "Name", "type": "string"}
+    # array items are transparent, indexes are ignored
+    assert index["addresses.city"] == {"title": "City", "type": "string"}
+    assert index.get("addresses.0.city") is index["addresses.city"]
+    # anyOf branches are reachable
+    assert index["primary.number"] == {"title": "Number", "type": "string"}
+    assert index["manager.manager.name"] == index["name"]
+
+    assert index.get("missing") is None
+    assert "addresses.street" not in index
+    with pytest.raises(KeyError):
+        index["name.first"]
+
+
+def test_paths_shared_by_branches_are_merged():
+    class Home(BaseModel):
+        city: int
+
+    class Holder(BaseModel):
+        place: Union[Address, Home]
+
+    index = SchemaIndex(Holder.model_json_schema())
+
+    assert index["place.city"] == {
+        "anyOf": [
+            {"title": "City", "type": "string"},
+            {"title": "City", "type": "integer"},
+        ]
+    }
+
+
+def test_eager_index_stops_at_recursion():
+    index = SchemaIndex(schema)
+
+    assert "manager.name" in list(index)
+    assert "manager.manager.name" not in list(index)
+    assert index.memory_usage() > 0
+
+
+def test_lazy_index_only_resolves_looked_up_paths():
+    index = SchemaIndex(schema, lazy=True)
+    assert len(index) == 0
+
+    index.get("primary.number")
+    assert list(index) == ["primary", "primary.number"]
+    small = index.memory_usage()
+
+    index.build()
+    assert "addresses.city" in list(index)
+    assert index.memory_usage() > small
+
+
+def test_projection_reuses_the_index():
+    index = SchemaIndex(schema, lazy=True)
+
+    projected = create_type_from_schema(schema, ["addresses.city"], index)
+    city = projected["addresses"]["items"]["properties"]["city"]
+
+    assert projected == create_type_from_schema(schema, ["addresses.city"])
+    assert city is index["addresses.city"]
+
+
+def test_projection_looks_whole_fields_up():
+    index = SchemaIndex(schema, lazy=True)
+
+    projected = create_type_from_schema(schema, ["name", "addresses.city"], index)
+
+    # fields below arrays and unions are projected branch by branch
+    assert list(index) == ["name"]
+    assert projected["name"] is index["name"]
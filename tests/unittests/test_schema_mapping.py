@@ -208,3 +208,19 @@ def test_two_fields_v2():
     }
 
     assert expected_output == filtered_schema
+
+
+def test_overlapping_paths_are_merged():
+    json_schema = data.model_json_schema()
+
+    assert create_type_from_schema(
+        json_schema, ["io_messages", "io_messages.output.messages"]
+    ) == create_type_from_schema(json_schema, ["io_messages"])
+    assert create_type_from_schema(
+        json_schema, ["io_messages.input.messages", "io_messages.output", "status"]
+    ) == {
+        **create_type_from_schema(
+            json_schema, ["io_messages.input", "io_messages.output"]
+        ),
+        **create_type_from_schema(json_schema, ["status"]),
+    }
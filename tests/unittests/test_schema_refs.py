@@ -0,0 +1,68 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+from agntcy_iomapper.base.schema_index import _RefResolver
+from agntcy_iomapper.base.utils import create_type_from_schema
+
+
+class Address(BaseModel):
+    city: str
+
+
+class Person(BaseModel):
+    name: str
+    home: Address
+    work: Optional[Address]
+    manager: Optional["Person"] = None
+
+
+class Team(BaseModel):
+    lead: Person
+    size: int
+
+
+def test_only_definitions_along_the_paths_are_resolved():
+    schema = Team.model_json_schema()
+    resolver = _RefResolver(schema)
+
+    resolver.resolve(schema["properties"]["size"])
+    assert resolver._definitions == {}
+
+    lead = resolver.resolve(schema["properties"]["lead"])
+    assert lead["properties"]["home"]["properties"]["city"] == {
+        "title": "City",
+        "type": "string",
+    }
+    # definitions are resolved once and shared by every $ref
+    assert lead["properties"]["work"]["anyOf"][0] is lead["properties"]["home"]
+    assert set(resolver._definitions) == {"#/$defs/Person", "#/$defs/Address"}
+
+
+def test_recursive_references_point_back_to_the_definition():
+    schema = Person.model_json_schema()
+    resolver = _RefResolver(schema)
+
+    # recursive models put the root itself behind a $ref
+    person = resolver.target(schema)
+    manager = resolver.resolve(person["properties"]["manager"])
+    assert (
+        manager["anyOf"][0]["properties"]["manager"]["anyOf"][0]
+        is (manager["anyOf"][0])
+    )
+
+
+def test_projection_resolves_references():
+    schema = Team.model_json_schema()
+
+    projected = create_type_from_schema(schema, ["lead.home.city", "size"])
+
+    assert projected["lead"]["properties"]["home"]["properties"]["city"] == {
+        "title": "City",
+        "type": "string",
+    }
+    assert "$ref" not in str(projected)
+    assert projected["size"] == {"title": "Size", "type": "integer"}
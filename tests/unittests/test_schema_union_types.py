@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: Apache-2.0
 
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -186,3 +186,54 @@ def test_when_union_fields_description_is_set_at_correct_level():
         },
     }
     assert filtered_schema == expected_schema
+
+
+class Item(BaseModel):
+    name: str
+    price: float
+
+
+class Order(BaseModel):
+    items: Optional[List[Item]] = None
+    lines: List[Union[Item, Message]] = []
+
+
+def test_optional_list_keeps_item_schema():
+    json_schema = Order.model_json_schema()
+
+    filtered_schema = create_type_from_schema(json_schema, ["items"])
+
+    assert filtered_schema["items"]["anyOf"][0] == {
+        "type": "array",
+        "items": {
+            "properties": {
+                "name": {"title": "Name", "type": "string"},
+                "price": {"title": "Price", "type": "number"},
+            },
+            "required": ["name", "price"],
+            "title": "Item",
+            "type": "object",
+        },
+    }
+
+
+def test_list_of_union_is_projected_on_each_sub_schema():
+    json_schema = Order.model_json_schema()
+
+    filtered_schema = create_type_from_schema(json_schema, ["lines.name"])
+
+    item, message = filtered_schema["lines"]["items"]["anyOf"]
+    assert item["properties"] == {"name": {"title": "Name", "type": "string"}}
+    # paths missing from a sub schema keep all of its properties
+    assert message["properties"] == {
+        "type": {
+            "enum": ["human", "assistant", "ai"],
+            "title": "Type",
+            "type": "string",
+        },
+        "content": {
+            "description": "the content of the message",
+            "title": "Content",
+            "type": "string",
+        },
+    }
@@ -0,0 +1,53 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+from pathlib import Path
+
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import AgentIOMapperInput, ArgumentsDescription
+
+manifest = json.loads(
+    (
+        Path(__file__).parent.parent / "data" / "manifests" / "agent_mailreviewer.json"
+    ).read_text()
+)
+
+schema = {
+    "type": "object",
+    "properties": {"tags": {"not": {"type": "null"}}},
+}
+
+
+def test_dict_schemas_are_shared():
+    first = ArgumentsDescription(json_schema=schema)
+    second = ArgumentsDescription(json_schema=dict(schema))
+
+    assert first.json_schema is second.json_schema
+    assert first.schema_dict is schema
+    assert second.json_schema.properties["tags"].schema_not.type == "null"
+
+
+def test_schema_dict_follows_the_schema():
+    arguments = ArgumentsDescription(json_schema=Schema.model_validate(schema))
+    assert arguments.schema_dict == schema
+
+    arguments.json_schema = Schema(type="string")
+    assert arguments.schema_dict == {"type": "string"}
+
+
+def test_manifest_schemas_are_shared():
+    inputs = [
+        AgentIOMapperInput(
+            input=ArgumentsDescription(description="Anything"),
+            output=ArgumentsDescription(
+                description="Reviewer", agent_manifest=manifest
+            ),
+            data={},
+        )
+        for _ in range(2)
+    ]
+
+    assert inputs[0].output.json_schema is inputs[1].output.json_schema
+    assert inputs[0].output.schema_dict is manifest["specs"]["input"]
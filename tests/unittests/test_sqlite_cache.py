@@ -0,0 +1,146 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import pickle
+import sqlite3
+
+import pytest
+
+from agntcy_iomapper.cache import CacheFormatError, SQLiteResponseCache
+from agntcy_iomapper.cache.__main__ import main
+from agntcy_iomapper.langgraph import LangGraphIOMapper
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "responses.db"
+
+
+def test_entries_are_shared_between_connections(path):
+    writer = SQLiteResponseCache(path)
+    reader = pickle.loads(pickle.dumps(writer))
+    writer.set("key", "value")
+
+    assert reader.get("key") == "value"
+    assert reader.get("other") is None
+    stats = reader.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+    journal_mode = sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()
+    assert journal_mode == ("wal",)
+
+
+def test_large_responses_are_compressed(path):
+    cache = SQLiteResponseCache(path, compress_min_bytes=100)
+    response = json.dumps({"items": ["value"] * 1000})
+    cache.set("key", response)
+
+    assert cache.get("key") == response
+    assert cache.stats().size_bytes < len(response) / 10
+
+
+def test_other_versions_are_not_served(path):
+    SQLiteResponseCache(path, version="v1").set("key", "old")
+    cache = SQLiteResponseCache(path, version="v2")
+
+    assert cache.get("key") is None
+    cache.set("key", "new")
+    assert cache.get("key") == "new"
+
+    assert cache.prune(other_versions=True) == 1
+    assert [usage.version for usage in cache.inspect().versions] == ["v2"]
+
+
+def test_entries_expire(path):
+    clock = FakeClock()
+    cache = SQLiteResponseCache(path, ttl=10, clock=clock)
+    cache.set("key", "value")
+
+    clock.now += 10
+    assert cache.get("key") is None
+    assert cache.stats().model_dump(include={"expired", "entries"}) == {
+        "expired": 1,
+        "entries": 0,
+    }
+
+
+def test_least_recently_used_entries_are_evicted(path):
+    clock = FakeClock()
+    cache = SQLiteResponseCache(path, max_bytes=100, clock=clock)
+    for i in range(4):
+        clock.now += 100
+        cache.set(f"key{i}", "x" * 20)
+    clock.now += 100
+    cache.get("key0")
+    clock.now += 100
+    cache.set("key4", "x" * 20)
+
+    assert cache.get("key1") is None
+    assert cache.get("key0") is not None
+    stats = cache.stats()
+    assert stats.size_bytes <= 90
+    assert stats.evicted == 2
+
+
+def test_cli(path, capsys):
+    cache = SQLiteResponseCache(path, version="v1")
+    cache.set("a", "value")
+    cache.set("b", "value")
+    cache.close()
+
+    assert main(["inspect", str(path)]) == 0
+    inspection = json.loads(capsys.readouterr().out)
+    assert inspection["entries"] == 2
+    assert inspection["versions"][0]["version"] == "v1"
+
+    assert main(["prune", str(path), "--version", "v2", "--vacuum"]) == 0
+    assert SQLiteResponseCache(path).stats().entries == 0
+    assert main(["inspect", str(path.with_name("missing.db"))]) == 2
+
+
+def test_inspect_does_not_write(path):
+    sqlite3.connect(path).execute("CREATE TABLE other (id INTEGER)").connection.close()
+
+    assert main(["inspect", str(path)]) == 2
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT name FROM sqlite_master").fetchall() == [
+        ("other",)
+    ]
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+
+
+def test_other_formats_are_refused_not_dropped(path):
+    cache = SQLiteResponseCache(path)
+    cache.set("key", "value")
+    cache.close()
+    sqlite3.connect(path).execute("PRAGMA user_version = 99").connection.close()
+
+    with pytest.raises(CacheFormatError):
+        SQLiteResponseCache(path).get("key")
+    assert main(["prune", str(path), "--all"]) == 2
+
+    sqlite3.connect(path).execute("PRAGMA user_version = 1").connection.close()
+    assert SQLiteResponseCache(path).get("key") == "value"
+
+
+def test_mapper_uses_the_persistent_cache(path, agent_input, fake_llm_config):
+    input = agent_input("Ann")
+
+    def invoke(response):
+        config = fake_llm_config([response], response_cache=SQLiteResponseCache(path))
+        return LangGraphIOMapper(config, input).invoke({}, {})
+
+    assert invoke("Hello Ann") == "Hello Ann"
+    # the model identity includes its responses, they differ
+    assert invoke("Hi Ann") == "Hi Ann"
+    assert invoke("Hello Ann") == "Hello Ann"
+    assert SQLiteResponseCache(path).stats().entries == 2
@@ -0,0 +1,183 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import pytest
+from jsonschema.exceptions import ValidationError
+
+from agntcy_iomapper.base import (
+    BaseIOMapper,
+    BaseIOMapperConfig,
+    InMemoryResponseCache,
+)
+from agntcy_iomapper.base.json_stream import JSONStreamParser
+from agntcy_iomapper.langgraph import LangGraphIOMapper
+
+output_schema = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "age": {"type": "integer"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+    "additionalProperties": False,
+}
+
+
+@pytest.fixture
+def input(agent_input):
+    return agent_input("Ann, 30 years old", output_schema=output_schema)
+
+
+class ChunkedMapper(BaseIOMapper):
+    """Streams its response in chunks of a few characters"""
+
+    def __init__(self, response, config=None):
+        super().__init__(config)
+        self.response = response
+        self.streamed = 0
+        self.closed = False
+
+    def invoke(self, input, messages, **kwargs) -> str:
+        raise NotImplementedError
+
+    async def ainvoke(self, input, messages, **kwargs) -> str:
+        raise NotImplementedError
+
+    async def astream(self, input, messages, **kwargs):
+        try:
+            for i in range(0, len(self.response), 4):
+                self.streamed = i + 4
+                yield self.response[i : i + 4]
+        finally:
+            self.closed = True
+
+
+def test_parser_reports_members_once_complete():
+    parser = JSONStreamParser()
+    chunks = ["Sure!\n```js", 'on\n{"a": "x,}', '", "b": [1, {"c": 2}]', ", "]
+
+    assert [parser.feed(chunk) for chunk in chunks] == [
+        [],
+        [],
+        [("a", "x,}")],
+        [("b", [1, {"c": 2}])],
+    ]
+    assert parser.feed('"d": null}\n```') == [("d", None)]
+    assert parser.complete
+
+    parser = JSONStreamParser()
+    assert parser.feed(' [1, "a",') == [(0, 1), (1, "a")]
+    assert parser.feed(" {}]") == [(2, {})]
+
+
+async def test_members_are_yielded_as_they_complete(input):
+    mapper = ChunkedMapper('{"name": "Ann", "age": 30, "tags": ["a"]}')
+
+    outputs = [output.data async for output in mapper._astream(input)]
+
+    assert outputs == [
+        {"name": "Ann"},
+        {"name": "Ann", "age": 30},
+        {"name": "Ann", "age": 30, "tags": ["a"]},
+        {"name": "Ann", "age": 30, "tags": ["a"]},
+    ]
+
+
+async def test_generation_stops_on_the_first_invalid_member(input):
+    response = '```json\n{"name": "Ann", "age": "thirty", ' + '"tags": ["x"], ' * 50
+    mapper = ChunkedMapper(
+        response, BaseIOMapperConfig(validate_json_output=True, stream_output=True)
+    )
+
+    with pytest.raises(ValidationError) as e:
+        await mapper._ainvoke(input)
+
+    assert list(e.value.path) == ["age"]
+    assert mapper.streamed < 50
+    assert mapper.closed
+    assert mapper.validation_stats.output.failed == 1
+
+
+async def test_unexpected_members_stop_the_generation(input):
+    mapper = ChunkedMapper(
+        '{"nick": "A", "name": "Ann"}',
+        BaseIOMapperConfig(validate_json_output=True),
+    )
+
+    with pytest.raises(ValidationError, match="'nick' was unexpected"):
+        async for _ in mapper._astream(input):
+            pass
+    assert mapper.streamed < 20
+
+
+async def test_sampled_validation_does_not_stop_the_generation(input):
+    mapper = ChunkedMapper(
+        '{"name": "Ann", "age": "thirty"}',
+        BaseIOMapperConfig(
+            validate_json_output=True,
+            validation_policy="every_n",
+            validation_every_n=2,
+            stream_output=True,
+        ),
+    )
+
+    output = await mapper._ainvoke(input)
+
+    assert output.data == {"name": "Ann", "age": "thirty"}
+    assert mapper.validation_stats.output.failed == 1
+
+
+async def test_langgraph_mapper_streams_the_llm_response(input, fake_llm_config):
+    config = fake_llm_config(
+        ['{"name": "Ann", "age": 30}'], validate_json_output=True, stream_output=True
+    )
+
+    assert await LangGraphIOMapper(config, input).ainvoke({}, {}) == {
+        "name": "Ann",
+        "age": 30,
+    }
+
+
+async def test_root_of_the_wrong_type_stops_the_generation(input):
+    mapper = ChunkedMapper(
+        '["Ann", 30]' + " " * 100, BaseIOMapperConfig(validate_json_output=True)
+    )
+
+    with pytest.raises(ValidationError, match="array is not of type 'object'"):
+        async for _ in mapper._astream(input):
+            pass
+    assert mapper.streamed < 20
+
+
+class IteratorMapper(ChunkedMapper):
+    """Streams its response with a plain async iterator, without aclose"""
+
+    def response_cache_identity(self, input, **kwargs):
+        return "chunks", None
+
+    def astream(self, input, messages, **kwargs):
+        chunks = iter([self.response[:6], self.response[6:]])
+
+        class Chunks:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    return next(chunks)
+                except StopIteration:
+                    raise StopAsyncIteration
+
+        return Chunks()
+
+
+async def test_plain_async_iterators_are_streamed(input):
+    cache = InMemoryResponseCache()
+    config = BaseIOMapperConfig(response_cache=cache, stream_output=True)
+    mapper = IteratorMapper('{"name": "Ann"}', config)
+
+    outputs = [output.data async for output in mapper._astream(input)]
+    assert outputs == [{"name": "Ann"}, {"name": "Ann"}]
+
+    assert (await mapper._ainvoke(input)).data == {"name": "Ann"}
+    assert cache.stats().hits == 1
@@ -0,0 +1,100 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import jsonschema
+import pytest
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import ArgumentsDescription, BaseIOMapperConfig
+from agntcy_iomapper.base.validation import SampledValidator
+from agntcy_iomapper.imperative import ImperativeIOMapper, ImperativeIOMapperInput
+
+schema = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def _config(**kwargs) -> BaseIOMapperConfig:
+    return BaseIOMapperConfig(
+        validate_json_input=True, validate_json_output=True, **kwargs
+    )
+
+
+def test_always_policy_raises_failures():
+    validator = SampledValidator(_config())
+
+    validator.validate_input({"name": "John"}, schema)
+    with pytest.raises(jsonschema.ValidationError):
+        validator.validate_input({}, schema)
+
+    assert validator.stats.input.validated == 2
+    assert validator.stats.input.failed == 1
+
+
+def test_never_policy_skips_validation():
+    validator = SampledValidator(_config(validation_policy="never"))
+
+    validator.validate_input({}, schema)
+    validator.validate_output({}, schema)
+
+    assert validator.stats.input.skipped == 1
+    assert validator.stats.output.skipped == 1
+    assert validator.stats.input.validated == 0
+
+
+def test_every_n_policy_counts_sampled_failures():
+    validator = SampledValidator(
+        _config(validation_policy="every_n", validation_every_n=3)
+    )
+
+    for _ in range(7):
+        validator.validate_output({}, schema)
+
+    assert validator.stats.output.validated == 3
+    assert validator.stats.output.skipped == 4
+    assert validator.stats.output.failed == 3
+    # input and output are sampled independently
+    assert validator.stats.input.validated == 0
+
+
+@pytest.mark.parametrize("rate, validated", [(0.0, 0), (1.0, 10)])
+def test_sample_policy(rate, validated):
+    validator = SampledValidator(
+        _config(validation_policy="sample", validation_sample_rate=rate)
+    )
+
+    for _ in range(10):
+        validator.validate_input({"name": "John"}, schema)
+
+    assert validator.stats.input.validated == validated
+    assert validator.stats.input.skipped == 10 - validated
+
+
+def test_disabled_validation_is_not_run():
+    validator = SampledValidator(BaseIOMapperConfig())
+
+    validator.validate_input({}, schema)
+
+    assert validator.stats.input.validated == validator.stats.input.skipped == 0
+
+
+def test_imperative_mapper_honours_validation_config():
+    input = ImperativeIOMapperInput(
+        input=ArgumentsDescription(json_schema=Schema.model_validate(schema)),
+        output=ArgumentsDescription(json_schema=Schema.model_validate(schema)),
+        data={"fullName": "John"},
+    )
+    field_mapping = {"name": "$.fullName"}
+
+    with pytest.raises(jsonschema.ValidationError):
+        ImperativeIOMapper(input=input, field_mapping=field_mapping).invoke(None)
+
+    trusted = ImperativeIOMapper(
+        input=input,
+        field_mapping=field_mapping,
+        config=_config(validation_policy="never"),
+    )
+    assert trusted.invoke(None) == {"name": "John"}
+    assert trusted.validation_stats.input.skipped == 1
@@ -0,0 +1,68 @@
+# Copyright AGNTCY Contributors (https://github.com/agntcy)
+# SPDX-License-Identifier: Apache-2.0
+
+import jsonschema
+import pytest
+from openapi_pydantic import Schema
+
+from agntcy_iomapper.base import (
+    clear_validator_cache,
+    set_validator_cache_size,
+    validator_cache_info,
+)
+from agntcy_iomapper.base.validation import get_validator, validate
+
+schema = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_validator_cache()
+    yield
+    set_validator_cache_size(128)
+    clear_validator_cache()
+
+
+def test_validators_are_shared_between_equal_schemas():
+    validator = get_validator(schema)
+    # same content, different key order and a Schema model
+    reordered = {"required": ["name"], **{k: schema[k] for k in ("properties", "type")}}
+
+    assert get_validator(reordered) is validator
+    assert get_validator(Schema.model_validate(schema)) is validator
+
+    info = validator_cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+    assert info.currsize == 1
+
+
+def test_validate_raises_like_jsonschema():
+    validate({"name": "John"}, schema)
+
+    with pytest.raises(jsonschema.ValidationError) as e:
+        validate({"age": 30}, schema)
+
+    assert e.value.message == "'name' is a required property"
+
+
+def test_invalid_schema_is_rejected():
+    with pytest.raises(jsonschema.SchemaError):
+        validate({}, {"type": "not-a-type"})
+
+
+def test_least_recently_used_validators_are_evicted():
+    set_validator_cache_size(2)
+
+    first = get_validator({"type": "string"})
+    get_validator({"type": "number"})
+    get_validator({"type": "string"})
+    get_validator({"type": "boolean"})
+
+    assert validator_cache_info().currsize == 2
+    assert get_validator({"type": "string"}) is first
+    assert validator_cache_info().misses == 3